@@ -1,15 +1,39 @@
+"""
+Seeds users and posts into MongoDB and the matching vectors into Qdrant (dual-write, same uuid).
+
+Any size from the demo dataset to production-sized load-test corpora: users and posts are
+generated from the posts_to_seeds.json templates (varied titles, descriptions, hashtags,
+authors and dates, reproducible with --seed), then generation, batched embedding, Mongo
+insert_many and Qdrant upserts run as overlapping pipeline stages joined by bounded queues,
+so memory stays flat whatever --posts is.
+
+    python unified_seeder.py                                   # 10 users, 50 posts, as before
+    python unified_seeder.py --posts 1000000 --users 5000 --writers 4
+    python unified_seeder.py --offline --posts 200000 --fake-embeddings
+
+--offline skips the Picsum image fetch and, unless --mongo-uri / --qdrant-url are given, writes
+to local stand-ins under --out: users.jsonl and posts.jsonl (extended JSON, load them with
+`mongoimport --collection posts --file posts.jsonl`) and an on-disk local Qdrant.
+--fake-embeddings replaces the model with deterministic hash vectors (no model download).
+"""
 import os
-import requests
 import json
+import time
 import uuid
-import bcrypt
+import zlib
+import queue
 import random
-from datetime import datetime, timedelta
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+import bcrypt
+import requests
+import numpy as np
+from bson import ObjectId, json_util
 from dotenv import load_dotenv
 from pymongo import MongoClient
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
-from fastembed import TextEmbedding
+from qdrant_client.models import PointStruct, VectorParams, Distance, CreateAlias, CreateAliasOperation
 
 load_dotenv()
 
@@ -18,15 +42,43 @@ MONGO_URI = f"mongodb+srv://{os.getenv('MONGO_USERNAME')}:{os.getenv('MONGO_PASS
 QDRANT_URL = os.getenv("QDRANT_URL")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME")
+EMBED_MODEL = "BAAI/bge-small-en-v1.5"
+VECTOR_SIZE = 384
 
 # --- Data Templates (Mirroring your Node.js seeder) ---
-with open('posts_to_seeds.json') as f:
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'posts_to_seeds.json')) as f:
     data = json.load(f)
 
 users_base = data['usersBase']
 post_templates = data['postTemplates']
 
-def fetch_image_pool():
+# --- Variation vocabulary: each template yields thousands of distinct posts ---
+TITLE_PREFIXES = [
+    "", "", "", "A Practical Guide to ", "Lessons Learned: ", "Deep Dive: ", "Rethinking ",
+    "Notes on ", "Why We Bet on ", "Debugging ", "The Hidden Costs of ", "Getting Started with ",
+]
+TITLE_SUFFIXES = [
+    "", "", "", " in Production", " at Scale", " for Beginners", " Revisited", " (Part 2)",
+    " on a Budget", " for Small Teams", " After One Year", " Without the Hype",
+]
+DESCRIPTION_CLOSERS = [
+    "", "", "Includes benchmarks and a reference implementation.",
+    "Written from the trenches of a high-traffic production system.",
+    "With code samples you can adapt to your own stack.",
+    "A summary of what worked, what failed and what we would do differently.",
+    "Aimed at engineers moving from prototype to production.",
+]
+HASHTAG_POOL = [
+    "tech", "engineering", "webdev", "backend", "frontend", "devops", "cloud", "ai", "security",
+    "performance", "architecture", "database", "opensource", "career", "testing",
+]
+STOPWORDS = {"the", "and", "with", "for", "from", "into", "your", "how", "why", "what", "when", "vs"}
+
+
+def fetch_image_pool(offline=False):
+    if offline:
+        # Deterministic Picsum URLs, resolved by the browser later, no network call here
+        return [f"https://picsum.photos/seed/postair{i}/800/600" for i in range(50)]
     print("📸 Fetching image pool from Picsum...")
     try:
         # Use the list API to get 50 creative images
@@ -37,96 +89,305 @@ def fetch_image_pool():
         print(f"⚠️ Warning: Could not fetch images: {e}. Using fallback placeholders.")
         return ["https://picsum.photos/seed/picsum/800/600"]
 
-def run_seeder():
-    # 1. Initialize Clients
-    mongo_client = MongoClient(MONGO_URI)
-    db = mongo_client.get_database() # Uses default db from URI
-    qdrant_client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-    embed_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
-
-    print("🚀 Cleaning existing data...")
-    db.users.delete_many({})
-    db.posts.delete_many({})
-    
-    # Reset Qdrant Collection
-    qdrant_client.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=384, distance=Distance.COSINE),
-    )
-
-    # 2. Phase 1: Prepare Image Pool
-    image_pool = fetch_image_pool()
 
-    # 3. Phase 2: Seed Users
-    print("1.Seeding Users...")
-    salt = bcrypt.gensalt(rounds=10)
-    hashed_pw = bcrypt.hashpw("password123".encode('utf-8'), salt).decode('utf-8')
-    user_docs = []
-    for u in users_base:
-        user_data = {
-            **u,
+# --- Generators ---
+def generate_users(count, hashed_pw, rng):
+    """The base users first (same emails, so the demo logins keep working), then name combinations."""
+    for i in range(count):
+        if i < len(users_base):
+            base = users_base[i]
+            name, email, bio = base["name"], base["email"], base["bio"]
+        else:
+            first = users_base[i % len(users_base)]["name"].split()[0]
+            last = users_base[(i // len(users_base)) % len(users_base)]["name"].split()[-1]
+            name = f"{first} {last}"
+            email = f"{first}.{last}.{i}@example.com".lower()
+            bio = rng.choice(users_base)["bio"]
+        yield {
+            "_id": ObjectId(),  # assigned here, posts reference authors without a round trip
+            "name": name,
+            "email": email,
+            "bio": bio,
             "useruuid": str(uuid.uuid4()),
             "password": hashed_pw,
-            "avatarUrl": f"https://api.dicebear.com/7.x/avataaars/svg?seed={u['name']}",
+            "avatarUrl": f"https://api.dicebear.com/7.x/avataaars/svg?seed={name}",
             "status": "active"
         }
-        result = db.users.insert_one(user_data)
-        user_data["_id"] = result.inserted_id # Keep for post referencing
-        user_docs.append(user_data)
-
-    # 4. Phase 3: Prepare Posts & Vectors
-    print("2. Preparing 50 Posts and generating embeddings...")
-    mongo_posts = []
-    qdrant_points = []
-    
-    # Extract texts for batch embedding
-    texts_to_embed = []
-    post_metadata = []
-
-    for i in range(50):
-        author = random.choice(user_docs)
+
+
+def hashtags_for(title, rng):
+    words = [w.strip(":()?,.").lower() for w in title.split()]
+    tags = [w for w in words if len(w) > 3 and w.isalnum() and w not in STOPWORDS][:2]
+    return sorted(set(tags + rng.sample(HASHTAG_POOL, 2)))
+
+
+def generate_posts(count, authors, image_pool, rng, days):
+    """Yields (mongo doc, text to embed, qdrant payload) per post."""
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        author_id, author_name, author_avatar = rng.choice(authors)
         template = post_templates[i % len(post_templates)]
         post_uuid = str(uuid.uuid4()) # THE SOURCE OF TRUTH ID
-        
-        created_at = datetime.utcnow() - timedelta(days=random.randint(0, 30))
-        full_title = f"{template['title']} #{i}"
-        
-        # Data for Mongo
-        mongo_posts.append({
+
+        title = f"{rng.choice(TITLE_PREFIXES)}{template['title']}{rng.choice(TITLE_SUFFIXES)}"
+        description = f"{template['description']} {rng.choice(DESCRIPTION_CLOSERS)}".strip()
+        created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+        hashtags = hashtags_for(title, rng)
+        is_public = rng.random() < 0.9
+
+        mongo_doc = {
             "uuid": post_uuid,
-            "title": full_title,
-            "description": template['description'],
-            "author": author["_id"],
-            "authorName": author["name"],
-            "authorAvatar": author["avatarUrl"],
-            "isPublic": True,
-            "images": [random.choice(image_pool)],
-            "hashtags": ["tech", "engineering"],
+            "title": title,
+            "description": description,
+            "author": author_id,
+            "authorName": author_name,
+            "authorAvatar": author_avatar,
+            "isPublic": is_public,
+            "images": [rng.choice(image_pool)],
+            "hashtags": hashtags,
             "createdAt": created_at
-        })
+        }
+        # Same payload shape as the search API's /embed, so its filters work on seeded data
+        payload = {
+            "uuid": post_uuid, "title": title, "description": description,
+            "authorId": str(author_id), "isPublic": is_public, "hashtags": hashtags,
+            "createdAt": int(created_at.timestamp()), "indexed_at": time.time()
+        }
+        yield mongo_doc, f"{title}. {description}", payload
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Sinks ---
+class JsonlCollection:
+    """Mongo stand-in: insert_many appends extended-JSON lines, the format mongoimport reads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        open(path, "w").close()
+
+    def insert_many(self, docs, ordered=False):
+        lines = "".join(json_util.dumps(doc) + "\n" for doc in docs)
+        with self._lock, open(self.path, "a") as f:
+            f.write(lines)
+
+    def delete_many(self, query):
+        open(self.path, "w").close()
+
+
+class FakeEmbedding:
+    """Deterministic unit vectors keyed on the text, for volume tests without the model."""
+
+    def embed(self, texts, batch_size=None):
+        for text in texts:
+            vector = np.random.default_rng(zlib.crc32(text.encode())).standard_normal(VECTOR_SIZE)
+            yield (vector / np.linalg.norm(vector)).astype(np.float32)
+
+
+# --- Pipeline ---
+class Pipeline:
+    """
+    Threads joined by bounded queues: a full queue blocks its producer, so at most
+    queue_size batches wait between two stages. The first error stops generation; every
+    stage keeps draining its inbox until the end marker so nothing upstream stays blocked.
+    """
+
+    def __init__(self):
+        self.threads = []
+        self.failed = threading.Event()
+        self.errors = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def source(self, name, batches, outboxes):
+        def run():
+            try:
+                for batch in batches:
+                    if self.failed.is_set():
+                        break
+                    for outbox in outboxes:
+                        outbox.put(batch)
+                    self.count(name, len(batch))
+            except Exception as e:
+                self._fail(name, e)
+            finally:
+                for outbox in outboxes:
+                    outbox.put(None)
+        self._start(name, run)
+
+    def stage(self, name, fn, inbox, outboxes=(), workers=1):
+        remaining = [workers]
+
+        def run():
+            try:
+                while True:
+                    batch = inbox.get()
+                    if batch is None:
+                        inbox.put(None)  # end marker for the sibling workers
+                        return
+                    if self.failed.is_set():
+                        continue
+                    try:
+                        result = fn(batch)
+                    except Exception as e:
+                        self._fail(name, e)
+                        continue
+                    for outbox in outboxes:
+                        outbox.put(result)
+                    self.count(name, len(batch))
+            finally:
+                with self._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for outbox in outboxes:
+                        outbox.put(None)
+
+        for i in range(workers):
+            self._start(f"{name}-{i}", run)
+
+    def _start(self, name, target):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def _fail(self, name, error):
+        print(f"❌ Stage {name} failed: {error}")
+        self.errors.append(error)
+        self.failed.set()
+
+    def join(self, total, report_seconds=5):
+        started = time.perf_counter()
+        while any(thread.is_alive() for thread in self.threads):
+            for thread in self.threads:
+                thread.join(timeout=report_seconds)
+                if thread.is_alive():
+                    break
+            elapsed = time.perf_counter() - started
+            progress = ", ".join(f"{name} {n}/{total}" for name, n in self.counters.items())
+            print(f"   {progress} ({self.counters.get('qdrant', 0) / elapsed:.0f} posts/s)")
+        if self.errors:
+            raise self.errors[0]
+        return time.perf_counter() - started
+
+
+def run_seeder(args):
+    rng = random.Random(args.seed)
+
+    # 1. Initialize Clients
+    if args.mongo_uri or not args.offline:
+        mongo_client = MongoClient(args.mongo_uri or MONGO_URI)
+        db = mongo_client.get_database() # Uses default db from URI
+        users_col, posts_col = db.users, db.posts
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        users_col = JsonlCollection(os.path.join(args.out, "users.jsonl"))
+        posts_col = JsonlCollection(os.path.join(args.out, "posts.jsonl"))
+    qdrant_writers = args.writers
+    if args.qdrant_url or not args.offline:
+        qdrant_client = QdrantClient(url=args.qdrant_url or QDRANT_URL, api_key=QDRANT_API_KEY, timeout=60)
+    else:
+        qdrant_client = QdrantClient(path=os.path.join(args.out, "qdrant"))
+        qdrant_writers = 1  # local mode is a single SQLite connection, not thread-safe
+    if args.fake_embeddings:
+        embed_model = FakeEmbedding()
+    else:
+        from fastembed import TextEmbedding
+        embed_model = TextEmbedding(model_name=EMBED_MODEL, threads=args.embed_threads)
+    collection_name = args.collection
+
+    print("🚀 Cleaning existing data...")
+    users_col.delete_many({})
+    posts_col.delete_many({})
+
+    # Reset Qdrant Collection, laid out like the search API creates it: <name>_v1 behind the alias <name>
+    aliases = {a.alias_name: a.collection_name for a in qdrant_client.get_aliases().aliases}
+    for existing in {aliases.get(collection_name, collection_name), f"{collection_name}_v1"}:
+        if qdrant_client.collection_exists(existing):
+            qdrant_client.delete_collection(existing)
+    qdrant_client.create_collection(
+        collection_name=f"{collection_name}_v1",
+        vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+    )
+    qdrant_client.update_collection_aliases(change_aliases_operations=[
+        CreateAliasOperation(create_alias=CreateAlias(collection_name=f"{collection_name}_v1", alias_name=collection_name))
+    ])
+
+    # 2. Phase 1: Prepare Image Pool
+    image_pool = fetch_image_pool(offline=args.offline)
+
+    # 3. Phase 2: Seed Users, in batches (the only fields posts need are kept in memory)
+    print(f"1.Seeding {args.users} Users...")
+    salt = bcrypt.gensalt(rounds=10)
+    hashed_pw = bcrypt.hashpw("password123".encode('utf-8'), salt).decode('utf-8')
+    authors = []
+    for batch in batched(generate_users(args.users, hashed_pw, rng), args.batch_size):
+        users_col.insert_many(batch, ordered=False)
+        authors.extend((u["_id"], u["name"], u["avatarUrl"]) for u in batch)
+
+    # 4. Phase 3: Posts, generation | embedding -> Qdrant and | Mongo, all overlapping
+    print(f"2. Seeding {args.posts} Posts (batches of {args.batch_size}, {args.writers} writers per store)...")
+    to_embed = queue.Queue(maxsize=args.queue_size)
+    to_mongo = queue.Queue(maxsize=args.queue_size)
+    to_qdrant = queue.Queue(maxsize=args.queue_size)
+
+    def embed(batch):
+        vectors = embed_model.embed([text for _, text, _ in batch], batch_size=args.batch_size)
+        return [
+            PointStruct(id=payload["uuid"], vector=vector.tolist(), payload=payload) # Synchronized ID
+            for (_, _, payload), vector in zip(batch, vectors)
+        ]
+
+    def write_mongo(batch):
+        posts_col.insert_many([doc for doc, _, _ in batch], ordered=False)
+
+    def write_qdrant(points):
+        qdrant_client.upsert(collection_name=collection_name, points=points, wait=True)
 
-        # Prep for Qdrant
-        texts_to_embed.append(f"{full_title}. {template['description']}")
-        post_metadata.append({"uuid": post_uuid, "title": full_title, "description": template['description']})
+    pipeline = Pipeline()
+    posts = generate_posts(args.posts, authors, image_pool, rng, args.days)
+    pipeline.source("generated", batched(posts, args.batch_size), [to_embed, to_mongo])
+    pipeline.stage("embedded", embed, to_embed, [to_qdrant])
+    pipeline.stage("mongo", write_mongo, to_mongo, workers=args.writers)
+    pipeline.stage("qdrant", write_qdrant, to_qdrant, workers=qdrant_writers)
+    elapsed = pipeline.join(args.posts)
 
-    # 4. Batch Embedding (FastEmbed is great at this)
-    embeddings = list(embed_model.embed(texts_to_embed))
+    print(f"✅ Success! Seeded {len(authors)} Users and {args.posts} Posts (Synchronized) "
+          f"in {elapsed:.1f}s ({args.posts / elapsed if elapsed else 0:.0f} posts/s).")
 
-    for i, vector in enumerate(embeddings):
-        qdrant_points.append(
-            PointStruct(
-                id=post_metadata[i]["uuid"], # Synchronized ID
-                vector=vector.tolist(),
-                payload=post_metadata[i]
-            )
-        )
 
-    # 5. Execute Dual-Write
-    print("3.Finalizing Dual-Write...")
-    db.posts.insert_many(mongo_posts)
-    qdrant_client.upsert(collection_name=COLLECTION_NAME, points=qdrant_points)
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--users", type=int, default=len(users_base))
+    parser.add_argument("--seed", type=int, help="Random seed, for reproducible datasets")
+    parser.add_argument("--days", type=int, default=30, help="Spread createdAt over the last N days")
+    parser.add_argument("--batch-size", type=int, default=256, help="Posts per batch through every stage")
+    parser.add_argument("--queue-size", type=int, default=4, help="Batches allowed to wait between two stages")
+    parser.add_argument("--writers", type=int, default=2, help="Concurrent writer threads per store")
+    parser.add_argument("--embed-threads", type=int, help="ONNX threads of the embedding model")
+    parser.add_argument("--fake-embeddings", action="store_true", help="Deterministic hash vectors instead of the model")
+    parser.add_argument("--offline", action="store_true", help="No Picsum fetch, local stand-ins unless URLs are given")
+    parser.add_argument("--out", default="seed_output", help="Directory of the offline stand-ins")
+    parser.add_argument("--mongo-uri", help="e.g. mongodb://localhost:27017/postair (default: Atlas from .env)")
+    parser.add_argument("--qdrant-url", help="e.g. http://localhost:6333 (default: QDRANT_URL from .env)")
+    parser.add_argument("--collection", default=COLLECTION_NAME or "posts")
+    return parser.parse_args()
 
-    print(f"✅ Success! Seeded {len(user_docs)} Users and 50 Posts (Synchronized).")
 
 if __name__ == "__main__":
-    run_seeder()
\ No newline at end of file
+    run_seeder(parse_args())
@@ -210,6 +210,70 @@ router.post('/api/search/ai', async (req, res) => {
     }
 });
 
+// Streaming variant: Server-Sent Events piped through as each pipeline stage finishes
+router.post('/api/search/ai/stream', async (req, res) => {
+    const { query, limit = 5 } = req.body;
+
+    if (!query) {
+        return res.status(400).json({ message: "Search query 'query' is required" });
+    }
+
+    if (!AI_SEARCH_ENABLED) {
+        return res.status(503).json({
+            error: 'disabled',
+            message: 'AI search is not available'
+        });
+    }
+
+    const pythonBaseUrl = process.env.NODE_ENV === 'production'
+        ? process.env.PYTHON_SERVICE_URL
+        : 'http://localhost:5000';
+
+    // Stop the Python pipeline when the browser goes away
+    const controller = new AbortController();
+    res.on('close', () => controller.abort());
+
+    try {
+        const pythonResponse = await fetch(`${pythonBaseUrl}/search/ai/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-Internal-Key': process.env.NODE_SHARED_SECURITY_KEY
+            },
+            body: JSON.stringify({ query, limit }),
+            signal: controller.signal
+        });
+
+        if (!pythonResponse.ok) {
+            const errorText = await pythonResponse.text();
+            console.error(`Python AI search stream error ${pythonResponse.status}: ${errorText}`);
+            return res.status(pythonResponse.status).json({
+                message: 'AI search service error'
+            });
+        }
+
+        res.writeHead(200, {
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'X-Accel-Buffering': 'no'
+        });
+        for await (const chunk of pythonResponse.body) {
+            res.write(chunk);
+        }
+        res.end();
+
+    } catch (error) {
+        if (controller.signal.aborted) return;
+        console.error('AI search stream proxy error:', error.message);
+        if (!res.headersSent) {
+            return res.status(500).json({ message: 'AI search temporarily unavailable' });
+        }
+        res.write(`event: error\ndata: ${JSON.stringify({ message: 'AI search temporarily unavailable' })}\n\n`);
+        res.end();
+    }
+});
+
 
 // ==========================================
 // 4. NEWSLETTER
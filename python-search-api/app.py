@@ -1,12 +1,25 @@
 import os
+import json
 import time
 import asyncio
 from functools import wraps
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+from opentelemetry import trace, context as otel_context
+from opentelemetry.trace import Status, StatusCode
 from flask_cors import CORS
-from services.embedding_service import EmbeddingService
+from services.embedding_service import EmbeddingService, SEARCH_MODES, extract_post_metadata, build_search_filter, parse_bool
 from services.inference import InferenceService
+from services.llm_scheduler import BACKGROUND
 from services.websearch import WebSearchService
+from services.async_runner import AsyncRunner
+from services.semantic_cache import SemanticCache
+from services.embedding_cache import EmbeddingCache
+from services.singleflight import SingleFlight
+from services.startup import Initializer
+from services import metrics
+from services.metrics import observe_stage
+from services.tracing import tracer, setup_tracing, start_server_span, set_attributes
+from utilities.worker_memory import process_memory
 import logging
 
 
@@ -14,12 +27,28 @@ import logging
 # Force Flask's internal logger to INFO level
 app = Flask(__name__)
 app.logger.setLevel(logging.INFO)
+setup_tracing()  # no-op unless OTEL_EXPORTER_OTLP_ENDPOINT / PYTHON_OTEL_TRACING / PYTHON_OTEL_FILE is set
 
 
 # --- Security Configuration ---
 # Read the allowed origin from environment variables
 node_origin = os.getenv("NODE_SERVICE_URL", "http://localhost:3000")
 INTERNAL_API_KEY = os.getenv("NODE_SHARED_SECURITY_KEY")
+# Upper bound on posts accepted by a single /embed/batch request
+EMBED_BATCH_MAX_POSTS = int(os.getenv("PYTHON_EMBED_BATCH_MAX_POSTS", "1000"))
+
+# --- AI pipeline configuration ---
+# Speculative mode fires a web search on the raw query in parallel with query expansion
+AI_SPECULATIVE_WEBSEARCH = os.getenv("PYTHON_AI_SPECULATIVE_WEBSEARCH", "0") == "1"
+AI_WEB_RESULTS_LIMIT = 8
+AI_PIPELINE_TIMEOUT = float(os.getenv("PYTHON_AI_PIPELINE_TIMEOUT", "60"))
+# Near-duplicate queries reuse a previous expansion + structured web sources. Off by default (size 0):
+# distinct short queries of one domain ("react vs vue state", "ngrx vs ngxs") can score above the
+# threshold on bge-small, so measure the false-hit rate on real traffic before enabling it.
+# Answers are flagged with "cached_from" when served from the cache.
+SEMANTIC_CACHE_SIZE = int(os.getenv("PYTHON_SEMANTIC_CACHE_SIZE", "0"))
+SEMANTIC_CACHE_TTL = float(os.getenv("PYTHON_SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("PYTHON_SEMANTIC_CACHE_THRESHOLD", "0.92"))
 
 # --- Model setup ---
 # FLASK_DEBUG=0 means production
@@ -47,12 +76,42 @@ CORS(app, resources={
 
 
 # --- Request/Response Logging (Morgan style) ---
+def endpoint_label():
+    """Route pattern rather than raw path, so metric label cardinality stays bounded."""
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
 @app.before_request
 def start_timer():
     request.start_time = time.time()
+    if EAGER_INIT != "off" and not initializer.ready:
+        initializer.start()  # restarts the init thread in a forked worker, no-op otherwise
+    metrics.IN_FLIGHT.labels(endpoint_label()).inc()
+    # One server span per request, continuing node-backend's trace when it sent a traceparent
+    span = start_server_span(f"{request.method} {endpoint_label()}", request.headers)
+    span.set_attributes({"http.request.method": request.method, "http.route": endpoint_label(), "url.path": request.path})
+    g.trace_span = span
+    g.trace_token = otel_context.attach(trace.set_span_in_context(span))
+
+@app.teardown_request
+def end_request(exc):
+    if not g.pop("in_flight_until_close", False):
+        metrics.IN_FLIGHT.labels(endpoint_label()).dec()
+    span = g.pop("trace_span", None)
+    if span is not None:
+        if exc is not None:
+            span.record_exception(exc)
+            span.set_status(Status(StatusCode.ERROR, str(exc)))
+        span.end()
+        otel_context.detach(g.pop("trace_token"))
 
 @app.after_request
 def log_request(response):
+    if response.is_streamed:
+        # Teardown runs before a streamed body (SSE) is sent: stay in flight until the server closes it
+        in_flight = metrics.IN_FLIGHT.labels(endpoint_label())
+        response.call_on_close(in_flight.dec)
+        g.in_flight_until_close = True
+
     if request.path == '/favicon.ico':
         return response
     
@@ -71,6 +130,12 @@ def log_request(response):
     # Format: :method :url :status :res[content-length] - :response-time ms :remote-addr :user-agent
     log_line = f"{method} {path} {status} {content_length} - {duration} ms {ip} {ua}"
     app.logger.info(log_line)
+    metrics.REQUEST_SECONDS.labels(endpoint_label(), method, status).observe(duration / 1000)
+    span = g.get("trace_span")
+    if span is not None:
+        span.set_attribute("http.response.status_code", status)
+        if status >= 500:
+            span.set_status(Status(StatusCode.ERROR))
 
     return response
 
@@ -78,18 +143,200 @@ def log_request(response):
 search_svc = EmbeddingService() # Initialize the model once on startup
 llm_svc = InferenceService() # Initialize the model once on startup
 websearch_svc = WebSearchService() # Initialize the model once on startup
+async_runner = AsyncRunner() # One long-lived event loop shared by every async stage
+answer_cache = SemanticCache(
+    max_size=SEMANTIC_CACHE_SIZE,
+    ttl_seconds=SEMANTIC_CACHE_TTL,
+    threshold=SEMANTIC_CACHE_THRESHOLD
+)
+ai_flight = SingleFlight("ai_pipeline") # Identical concurrent /search/ai requests share one pipeline run
+
+# --- Eager init: connect, load the models and run a test inference before taking traffic ---
+# PYTHON_EAGER_INIT: "background" (default) serves /health at once and /ready 503 until done,
+# "sync" blocks startup until done, "off" keeps the old lazy load on the first request.
+EAGER_INIT = os.getenv("PYTHON_EAGER_INIT", "background").lower()
+
+
+def check_groq():
+    if not async_runner.run(llm_svc.check_readiness(), timeout=15):
+        raise RuntimeError("Groq readiness probe failed")
+
+
+initializer = Initializer(retry_seconds=float(os.getenv("PYTHON_INIT_RETRY_SECONDS", "15")))
+initializer.add_step("qdrant", search_svc.connect)
+initializer.add_step("embedding_model", search_svc.load_models)
+# Optional: a Groq outage degrades /search/ai but must not take /search and /embed out of rotation
+initializer.add_step("groq", check_groq, required=False)
 
-# --- Eager warmup: force all services to fully initialize before accepting requests ---
-# This prevents "Lazy Loading" from happening mid-request and eliminates cold-start failures.
-with app.app_context():
+# gunicorn preload_app (see gunicorn.conf.py): the master loads the models once and the workers
+# share them copy-on-write; connections and the remaining init steps run per worker in post_fork()
+PRELOAD_MODELS = os.getenv("PYTHON_PRELOAD_MODELS", "0") == "1"
+
+
+def post_fork():
+    """Per-worker setup after a preloaded master forked: own clients, then the startup steps."""
+    search_svc.reset_after_fork()
+    llm_svc.reset_after_fork()
+    websearch_svc.reset_after_fork()
+    if EAGER_INIT != "off":
+        initializer.start()
+
+
+if PRELOAD_MODELS:
+    # Synchronous and network-free: no threads or sockets may be live in the master at fork time
+    app.logger.info("Startup: preloading models in the master process...")
     try:
-        app.logger.info("Startup: warming up EmbeddingService...")
-        search_svc.search_similar_post("warmup", limit=1)
-        app.logger.info("Startup: EmbeddingService ready.")
+        search_svc.load_models()
     except Exception as e:
-        app.logger.warning(f"Startup warmup failed (non-fatal): {e}")
+        # Non-fatal: each worker's initializer loads its own copy instead
+        app.logger.warning(f"Startup: model preload failed, workers will load the models: {e}")
+elif EAGER_INIT == "sync":
+    app.logger.info("Startup: initializing services...")
+    if not initializer.run():
+        initializer.start()  # keep retrying the failed steps, /ready reports 503 meanwhile
+    app.logger.info(f"Startup: ready={initializer.ready}")
+elif EAGER_INIT == "background":
+    initializer.start()
+
+
+
+# --- AI Search Pipeline ---
+def format_sse(event, data):
+    """One Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def web_result_text(result):
+    """Text a web result is scored on by the reranker."""
+    return f"{result.get('title') or ''}. {result.get('description') or ''}"
+
+
+def merge_web_results(primary, secondary, limit):
+    """Interleaves two web result lists, dropping duplicate URLs, capped at limit."""
+    merged, seen = [], set()
+    for i in range(max(len(primary), len(secondary))):
+        for results in (primary, secondary):
+            if i < len(results) and results[i].get("url") not in seen:
+                seen.add(results[i].get("url"))
+                merged.append(results[i])
+    return merged[:limit]
+
+
+async def run_ai_pipeline(query, limit, speculative=False, emit=None, endpoint="/search/ai"):
+    """
+    Qdrant Similarity -> LLM Expansion -> SerpAPI Web Search -> LLM Source Structuring,
+    as one coroutine. Near-duplicates of an earlier query skip straight to the
+    semantic cache answer. In speculative mode a web search on the raw query overlaps
+    the similarity + expansion stages and its results are merged with the expanded ones.
+    emit(event, data), if given, is called as each stage finishes (see /search/ai/stream).
+    Stage latencies are recorded under the given endpoint label.
+    """
+    streaming = emit is not None
+    emit = emit or (lambda event, data: None)
+    set_attributes({"search.query_length": len(query), "search.limit": limit, "ai.speculative": speculative})
+
+    # Blocking stages run via asyncio.to_thread, which keeps the trace context (run_in_executor drops it)
+    # 0. Semantic answer cache - the query vector is the one similarity search reuses below
+    with observe_stage(endpoint, "embed"):
+        query_vector = await asyncio.to_thread(search_svc.embed_query, query)
+    # The answer depends on the request options too, not just on the query
+    cache_key = (limit, speculative)
+    with observe_stage(endpoint, "semantic_cache"):
+        cached = answer_cache.lookup(query_vector, key=cache_key)
+    metrics.count_cache_lookup("semantic_answer", cached is not None)
+    if cached is not None:
+        cached_query, answer, similarity = cached
+        app.logger.info(f"Semantic cache hit: '{query}' ~ '{cached_query}' ({similarity:.3f})")
+        set_attributes({"ai.semantic_cache.similarity": similarity})
+        # Tell the caller the expansion and sources were produced for another query
+        cached_from = {"query": cached_query, "similarity": round(similarity, 4)}
+        emit("cached_from", cached_from)
+        with observe_stage(endpoint, "similarity_search"):
+            similar_docs = await search_svc.search_similar_post_async(query, limit=limit)
+        emit("similar_docs", similar_docs)
+        emit("expanded_query", answer["expanded_query"])
+        emit("sources", answer["relevant_ext_docs"])
+        return {
+            "query": query,
+            "expanded_query": answer["expanded_query"],
+            "similar_docs": similar_docs,
+            "relevant_ext_docs": answer["relevant_ext_docs"],
+            "cached_from": cached_from
+        }
+
+    raw_web_task = None
+    if speculative:
+        raw_web_task = asyncio.create_task(websearch_svc.search(query, limit=AI_WEB_RESULTS_LIMIT))
+
+    try:
+        # 1. Similarity Search (Qdrant) - awaited on the async client (PYTHON_QDRANT_ASYNC), else in a thread
+        with observe_stage(endpoint, "similarity_search"):
+            similar_docs = await search_svc.search_similar_post_async(query, limit=limit)
+        emit("similar_docs", similar_docs)
+        set_attributes({"ai.similar_docs.count": len(similar_docs)})
+
+        # 2. Query Expansion (LLM)
+        with observe_stage(endpoint, "expand_query"):
+            expanded_query = await llm_svc.expand_query(query, similar_docs)
+        app.logger.info(f"Expanded query: {expanded_query}")
+        emit("expanded_query", expanded_query)
+
+        # 3. Web Search (SerpAPI)
+        with observe_stage(endpoint, "websearch"):
+            raw_results = None
+            if raw_web_task is not None:
+                try:
+                    raw_results = await raw_web_task
+                except Exception as e:
+                    # The speculative search is best-effort: the expanded query still drives the pipeline
+                    app.logger.warning(f"Speculative web search failed: {e}")
+
+            if raw_results is not None and expanded_query == query:
+                # Expansion fell back to the raw query: the speculative results are the answer
+                web_results = raw_results
+            else:
+                web_results = await websearch_svc.search(expanded_query, limit=AI_WEB_RESULTS_LIMIT)
+                if raw_results:
+                    web_results = merge_web_results(web_results, raw_results, AI_WEB_RESULTS_LIMIT)
+
+        # Local cross-encoder pass so the structuring LLM sees the best results first
+        if search_svc.reranker is not None:
+            with observe_stage(endpoint, "rerank"):
+                web_results = await asyncio.to_thread(search_svc.reranker.rerank, query, web_results, web_result_text)
+        emit("web_results", web_results)
+        set_attributes({"ai.web_results.count": len(web_results)})
+    finally:
+        if raw_web_task is not None and not raw_web_task.done():
+            raw_web_task.cancel()
+
+    # 4. Source Structuring & Reranking (LLM)
+    with observe_stage(endpoint, "structure_sources"):
+        if streaming:
+            # Each source is sent as soon as the completion has produced it
+            relevant_ext_docs = []
+            async for source in llm_svc.stream_relevant_sources(query, web_results):
+                relevant_ext_docs.append(source)
+                emit("source", source)
+        else:
+            relevant_ext_docs = await llm_svc.generate_relevant_sources(query, web_results)
+    emit("sources", relevant_ext_docs)
+    set_attributes({"ai.sources.count": len(relevant_ext_docs)})
+
+    # An empty structuring result usually means an LLM/JSON failure: don't pin it in the cache
+    if relevant_ext_docs:
+        answer_cache.store(query, query_vector, {
+            "expanded_query": expanded_query,
+            "relevant_ext_docs": relevant_ext_docs
+        }, key=cache_key)
+
+    return {
+        "query": query,
+        "expanded_query": expanded_query,
+        "similar_docs": similar_docs,
+        "relevant_ext_docs": relevant_ext_docs,
+        "cached_from": None
+    }
 
-        
 
 # --- Middleware ---
 def require_security_key(f):
@@ -122,7 +369,7 @@ def index():
     """
     return jsonify({
         "message": "PostAir Semantic Search Engine is Active",
-        "documentation": "Endpoints: /health, /search, /embed",
+        "documentation": "Endpoints: /health, /stats, /search, /embed, /embed/batch",
         "status": "online"
     }), 200
 
@@ -137,12 +384,64 @@ def health_check():
     }), 200
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: 200 once Qdrant is connected and the embedding model has run a test
+    inference, 503 with per-dependency state until then. /health stays the cheap liveness check.
+    """
+    status = initializer.status()
+    return jsonify({"status": "ready" if status["ready"] else "initializing", **status}), (
+        200 if status["ready"] else 503
+    )
+
+
+@app.route('/stats', methods=['GET'])
+@require_security_key
+def stats():
+    """Cache and request-coalescing counters for this worker process."""
+    return jsonify({
+        "pid": os.getpid(),
+        "memory": process_memory(os.getpid()) if os.path.exists("/proc/self/smaps_rollup") else None,
+        "caches": {
+            "query_embedding": search_svc.query_cache.stats(),
+            "semantic_answer": answer_cache.stats(),
+        },
+        "embedding_model": {
+            "variant": search_svc.model_variant,
+            "name": search_svc.model_name,
+            "parity_check": search_svc.variant_check,
+        },
+        "embedding_batches": search_svc.batcher.stats(),
+        "vector_mirror": search_svc.mirror.stats() if search_svc.mirror is not None else None,
+        "reranker": search_svc.reranker.stats() if search_svc.reranker is not None else None,
+        "llm_scheduler": llm_svc.scheduler.stats(),
+        "coalescing": {
+            "similarity_search": search_svc.search_flight.stats(),
+            "ai_pipeline": ai_flight.stats(),
+            "websearch": websearch_svc.flight.stats(),
+        }
+    }), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus exposition: request, per-stage and dependency latency histograms, cache,
+    upstream error and LLM token counters. Aggregates every gunicorn worker when
+    PROMETHEUS_MULTIPROC_DIR is set, otherwise reports this process only.
+    """
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+
 @app.route('/embed', methods=['POST'])
 @require_security_key
 def embed_post():
     """
     Receive a post data logs its and embeds it.
     Expected JSON :{"postuuid":"...", "title":"...", "description":"..."}
+    Optional filterable metadata: "authorId", "isPublic", "hashtags": [...], "createdAt" (ISO 8601 or epoch)
     """
     data = request.get_json()
 
@@ -154,22 +453,69 @@ def embed_post():
     title = data.get("title", "")
     description = data.get("description", "")
 
+    try:
+        metadata = extract_post_metadata(data)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid metadata: {e}"}), 400
+
     try:
         app.logger.info(f"Processing embedding for post: {postuuid} | Title: {title}")
-        search_svc.store_post(postuuid, title, description)
+        if metadata:
+            search_svc.store_post(postuuid, title, description, metadata=metadata)
+        else:
+            search_svc.store_post(postuuid, title, description)
         return jsonify({"status": "success", "uuid": postuuid}), 201
     except Exception as e:
         app.logger.error(f"Error logging post {postuuid}: {e}")
         return jsonify({"error": f"Error logging post {postuuid}: {e}"}), 500
 
-   
+
+@app.route('/embed/batch', methods=['POST'])
+@require_security_key
+def embed_posts_batch():
+    """
+    Bulk variant of /embed for backfills and imports: one model pass, chunked Qdrant upserts.
+    Expected JSON: {"posts": [{"postuuid":"...", "title":"...", "description":"..."}, ...]}
+    Returns 201 when every post is stored, 207 with per-item status when some failed.
+    """
+    data = request.get_json()
+    posts = data.get("posts") if data else None
+
+    #Basic validation
+    if not isinstance(posts, list) or not posts:
+        return jsonify({"error": "Missing posts list"}), 400
+    if len(posts) > EMBED_BATCH_MAX_POSTS:
+        return jsonify({"error": f"Too many posts: max {EMBED_BATCH_MAX_POSTS} per request"}), 413
+
+    try:
+        app.logger.info(f"Processing batch embedding for {len(posts)} posts")
+        results = search_svc.store_posts(posts)
+    except Exception as e:
+        app.logger.error(f"Error logging post batch: {e}")
+        return jsonify({"error": f"Error logging post batch: {e}"}), 500
+
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    failed = len(results) - succeeded
+    if failed:
+        app.logger.warning(f"Batch embedding: {failed}/{len(results)} posts failed")
+
+    return jsonify({
+        "status": "success" if not failed else ("partial" if succeeded else "failed"),
+        "count": len(results),
+        "succeeded": succeeded,
+        "failed": failed,
+        "results": results
+    }), 201 if not failed else 207
+
+
 @app.route('/search', methods=['POST'])
 @require_security_key
 def search():
     """
     Search for posts semantically.
-    Expected JSON: {"query": "...", "limit": 5}
-    Default to top 5 if limit isn't provided
+    Expected JSON: {"query": "...", "limit": 5, "mode": "dense" | "hybrid", "filter": {...}}
+    Default to top 5 if limit isn't provided, mode defaults to PYTHON_HYBRID_SEARCH
+    filter: {"authorId": "..." | [...], "isPublic": bool, "hashtags": [...], "createdAfter": ts, "createdBefore": ts}
     """
     data = request.get_json()
     query = data.get("query")
@@ -178,8 +524,29 @@ def search():
     if not query:
         return jsonify({"error": "Missing query string"}), 400
 
+    # Optional search options are only forwarded when present
+    search_options = {}
+    if "mode" in data:
+        if data["mode"] not in SEARCH_MODES:
+            return jsonify({"error": f"Invalid mode: expected one of {', '.join(SEARCH_MODES)}"}), 400
+        search_options["mode"] = data["mode"]
+    if data.get("filter"):
+        try:
+            build_search_filter(data["filter"])
+        except ValueError as e:
+            return jsonify({"error": f"Invalid filter: {e}"}), 400
+        search_options["filter"] = data["filter"]
+
     try:
-        results = search_svc.search_similar_post(query, limit=limit)
+        with observe_stage("/search", "similarity_search"):
+            if search_svc.async_enabled:
+                # The request thread waits, but the Qdrant call shares the loop's pooled async client
+                results = async_runner.run(
+                    search_svc.search_similar_post_async(query, limit=limit, **search_options),
+                    timeout=search_svc.search_timeout + 5
+                )
+            else:
+                results = search_svc.search_similar_post(query, limit=limit, **search_options)
         return jsonify({
             "query": query,
             "count": len(results),
@@ -207,8 +574,9 @@ def search_augmented():
 
     try:
         results = search_svc.search_similar_post(query, limit=limit)
-        relevant_sources = asyncio.run(
-            llm_svc.generate_relevant_sources(query, results)
+        # Deprecated endpoint: queued behind the /search/ai completions when the LLM quota is short
+        relevant_sources = async_runner.run(
+            llm_svc.generate_relevant_sources(query, results, priority=BACKGROUND)
         )
 
         return jsonify({
@@ -222,13 +590,20 @@ def search_augmented():
         return jsonify({"error": "Failed to perform search"}), 500
 
 
+def speculative_option(data):
+    """The request's "speculative" flag, PYTHON_AI_SPECULATIVE_WEBSEARCH when absent; bool("false") is True."""
+    value = data.get("speculative")
+    return AI_SPECULATIVE_WEBSEARCH if value is None else parse_bool(value, "speculative")
+
+
 @app.route('/search/ai', methods=['POST'])
 @require_security_key
 def search_ai():
     """
     Full AI Search Pipeline: 
     Qdrant Similarity -> LLM Expansion -> SerpAPI Web Search -> LLM Source Structuring.
-    Expected JSON: {"query": "...", "limit": 5}
+    Expected JSON: {"query": "...", "limit": 5, "speculative": false}
+    "speculative" overrides PYTHON_AI_SPECULATIVE_WEBSEARCH for this request.
     """
     data = request.get_json()
     query = data.get("query")
@@ -238,35 +613,20 @@ def search_ai():
 
     if not query:
         return jsonify({"error": "Missing query string"}), 400
+    try:
+        speculative = speculative_option(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         app.logger.info(f"AI Search starting for query: {query}")
-
-        # 1. Similarity Search (Qdrant)
-        similar_docs = search_svc.search_similar_post(query, limit=limit)
-        
-        # 2. Query Expansion (LLM)
-        expanded_query = asyncio.run(
-            llm_svc.expand_query(query, similar_docs)
-        )
-        app.logger.info(f"Expanded query: {expanded_query}")
-
-        # 3. Web Search (SerpAPI)
-        web_results = asyncio.run(
-             websearch_svc.search(expanded_query, limit=8)
-        )
-
-        # 4. Source Structuring & Reranking (LLM)
-        relevant_ext_docs = asyncio.run(
-            llm_svc.generate_relevant_sources(query, web_results)
-        )
-
-        return jsonify({
-            "query": query,
-            "expanded_query": expanded_query,
-            "similar_docs": similar_docs,
-            "relevant_ext_docs": relevant_ext_docs
-        }), 200
+        key = (EmbeddingCache.normalize(query), limit, speculative)
+        result = ai_flight.do(key, lambda: async_runner.run(
+            run_ai_pipeline(query, limit, speculative=speculative),
+            timeout=AI_PIPELINE_TIMEOUT
+        ))
+        # Coalesced callers may differ in casing/spacing: echo each caller's own query
+        return jsonify({**result, "query": query}), 200
 
     except Exception as e:
         app.logger.error(f"AI Search Pipeline failed: {e}")
@@ -276,6 +636,56 @@ def search_ai():
         }), 500
 
 
+@app.route('/search/ai/stream', methods=['POST'])
+@require_security_key
+def search_ai_stream():
+    """
+    Streaming variant of /search/ai (Server-Sent Events): each stage is sent as soon as it finishes.
+    Events: similar_docs -> expanded_query -> web_results -> source (one per structured source,
+    as the LLM completes it) -> sources (the full list), then done (or error).
+    An answer from the semantic cache starts with cached_from ({"query", "similarity"} of the
+    query it was produced for) and skips web_results and source.
+    Expected JSON: {"query": "...", "limit": 5, "speculative": false}
+    """
+    data = request.get_json()
+    query = data.get("query") if data else None
+    limit = data.get("limit", 5) if data else 5
+
+    if not query:
+        return jsonify({"error": "Missing query string"}), 400
+    try:
+        speculative = speculative_option(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The body is produced after the request span has ended: parent its own span on the request's
+    request_trace_context = otel_context.get_current()
+
+    def generate():
+        app.logger.info(f"AI Search stream starting for query: {query}")
+        with tracer.start_as_current_span("ai_pipeline.stream", context=request_trace_context) as span:
+            span.set_attribute("search.query_length", len(query))
+            try:
+                events = async_runner.stream(
+                    lambda emit: run_ai_pipeline(query, limit, speculative=speculative, emit=emit, endpoint="/search/ai/stream"),
+                    timeout=AI_PIPELINE_TIMEOUT
+                )
+                for event, payload in events:
+                    yield format_sse(event, payload)
+                yield format_sse("done", {"query": query})
+            except Exception as e:
+                app.logger.error(f"AI Search stream failed: {e}")
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                yield format_sse("error", {"error": "Failed to perform AI search", "message": str(e)})
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop reverse proxies (nginx) from buffering the stream
+        "X-Accel-Buffering": "no",
+    })
+
+
 @app.route('/web-search', methods=['POST'])
 @require_security_key
 def web_search():
@@ -293,7 +703,7 @@ def web_search():
     try:
         app.logger.info(f"Web search for: {query}")
         # results = await websearch_svc.search(query, limit=limit)
-        result  = asyncio.run(websearch_svc.search(query, limit=limit))
+        result  = async_runner.run(websearch_svc.search(query, limit=limit))
         return jsonify({
             "query": query,
             "count": len(result),
@@ -305,4 +715,4 @@ def web_search():
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=True)
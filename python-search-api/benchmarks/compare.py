@@ -0,0 +1,53 @@
+"""
+Compares two benchmarks/stages.py result files case by case.
+
+    python benchmarks/compare.py benchmarks/results/stages_<old>.json benchmarks/results/stages_<new>.json
+
+Prints the p50 of every case in both runs and the relative change; exits with status 1
+when any case got slower than --threshold (default 10%), so it can gate CI.
+"""
+import sys
+import json
+import argparse
+
+
+def flatten(report, metric):
+    return {
+        f"{stage}.{case}": values[metric]
+        for stage, result in report["stages"].items()
+        for case, values in result.get("cases", {}).items()
+        if metric in values
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_ms")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    old, new = flatten(baseline, args.metric), flatten(candidate, args.metric)
+
+    print(f"{baseline['commit']} -> {candidate['commit']} ({args.metric})")
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(f"{key:45} {old[key]:>12.4f} {new[key]:>12.4f} {change:>+8.1f}%{flag}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key:45} only in {'baseline' if key in old else 'candidate'}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Local stand-ins for Groq and SerpAPI with configurable latency, so benchmarks measure
+our client-side overhead (SDK, prompt, parsing) without network variance or API quota.
+Both run a ThreadingHTTPServer on a random localhost port in a daemon thread.
+"""
+import json
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FAKE_SOURCES = [
+    {
+        "source_name": f"Source {i}",
+        "source_url": f"https://example{i}.dev/article",
+        "source_small_headline": f"How example {i} handles backpressure in Node.js streams",
+        "source_small_description": "A practical walkthrough of pipe(), highWaterMark and async iterators.",
+        "favicon": f"https://www.google.com/s2/favicons?domain=example{i}.dev&sz=64",
+    }
+    for i in range(5)
+]
+FAKE_EXPANSION = "nodejs streams backpressure highwatermark pipe async-iterators"
+
+
+class _FakeServer:
+    def __init__(self, latency_ms=0.0):
+        self.latency_seconds = latency_ms / 1000
+        self.requests = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests += 1
+                fake.handle_get(self)
+
+            def do_POST(self):
+                fake.requests += 1
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fake.handle_post(self, json.loads(body or b"{}"))
+
+        return Handler
+
+    @staticmethod
+    def _send_json(handler, payload, status=200):
+        body = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+class FakeGroqServer(_FakeServer):
+    """
+    OpenAI-compatible /openai/v1/chat/completions. latency_ms is the time to first token;
+    streamed completions then send one ~4 character chunk every token_ms.
+    Point AsyncGroq(base_url=server.url) at it.
+    """
+
+    def __init__(self, latency_ms=0.0, token_ms=0.0):
+        super().__init__(latency_ms)
+        self.token_seconds = token_ms / 1000
+
+    def handle_post(self, handler, body):
+        time.sleep(self.latency_seconds)
+        system = body["messages"][0]["content"]
+        content = json.dumps(FAKE_SOURCES) if "JSON" in system else FAKE_EXPANSION
+        base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": body.get("model", "bench")}
+
+        if not body.get("stream"):
+            self._send_json(handler, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop", "logprobs": None}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.end_headers()
+        try:
+            for start in range(0, len(content), 4):
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": content[start:start + 4]}, "finish_reason": None}]}
+                handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                handler.wfile.flush()
+                if self.token_seconds:
+                    time.sleep(self.token_seconds)
+            handler.wfile.write(b"data: [DONE]\n\n")
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading early, e.g. after the first source
+
+
+class FakeSerpApiServer(_FakeServer):
+    """GET /search returning num Google organic results. Point serpapi.Client.BASE_DOMAIN at it."""
+
+    def handle_get(self, handler):
+        time.sleep(self.latency_seconds)
+        params = parse_qs(urlparse(handler.path).query)
+        num = int(params.get("num", ["10"])[0])
+        self._send_json(handler, {
+            "search_metadata": {"status": "Success"},
+            "organic_results": [
+                {
+                    "position": i + 1,
+                    "title": f"Result {i} for {params.get('q', [''])[0]}",
+                    "link": f"https://example{i}.dev/article",
+                    "snippet": "A practical walkthrough of pipe(), highWaterMark and async iterators.",
+                }
+                for i in range(num)
+            ],
+        })
@@ -0,0 +1,150 @@
+"""
+Recall and latency of quantized Qdrant collections against the unquantized baseline.
+
+Needs a real Qdrant server: local (`:memory:`) mode always searches brute-force and
+ignores quantization. For example:
+    docker run -p 6333:6333 qdrant/qdrant
+    python benchmarks/quantization_recall.py --url http://localhost:6333 --points 20000
+
+Vectors are synthetic clustered 384-dim vectors by default, or copied from an existing
+collection with --from-collection. Ground truth is an exact NumPy top-k.
+Results are printed and written as JSON to benchmarks/results/.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, SearchParams, QuantizationSearchParams, CollectionStatus,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DIM = 384
+
+CONFIGS = {
+    "none": None,
+    "scalar": ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)),
+    "binary": BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+}
+
+# (collection config, rescore, oversampling) combinations to measure
+RUNS = [
+    ("none", None, None),
+    ("scalar", False, 1.0),
+    ("scalar", True, 2.0),
+    ("binary", False, 1.0),
+    ("binary", True, 2.0),
+    ("binary", True, 4.0),
+]
+
+
+def unit_rows(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def synthetic_vectors(n, clusters=64, seed=42):
+    """Clustered vectors: closer to real embedding distributions than i.i.d. noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, DIM))
+    labels = rng.integers(0, clusters, n)
+    return unit_rows(centers[labels] + 0.35 * rng.standard_normal((n, DIM))).astype(np.float32)
+
+
+def collection_vectors(client, collection_name, n):
+    vectors, offset = [], None
+    while len(vectors) < n:
+        points, offset = client.scroll(collection_name, limit=1024, offset=offset, with_vectors=True, with_payload=False)
+        vectors.extend(p.vector for p in points)
+        if offset is None:
+            break
+    return unit_rows(np.asarray(vectors[:n], dtype=np.float32))
+
+
+def build_collection(client, name, quantization_config, vectors):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=DIM, distance=Distance.COSINE),
+        quantization_config=quantization_config,
+    )
+    for start in range(0, len(vectors), 512):
+        client.upsert(name, points=[
+            PointStruct(id=start + i, vector=v.tolist()) for i, v in enumerate(vectors[start:start + 512])
+        ], wait=True)
+
+    # Wait for the HNSW / quantized index build so latency reflects steady state
+    while client.get_collection(name).status != CollectionStatus.GREEN:
+        time.sleep(0.5)
+
+
+def measure(client, name, queries, truth, limit, rescore, oversampling):
+    params = None
+    if rescore is not None:
+        params = SearchParams(quantization=QuantizationSearchParams(rescore=rescore, oversampling=oversampling))
+
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = client.query_points(name, query=query.tolist(), limit=limit, search_params=params).points
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len({h.id for h in hits} & set(expected.tolist())) / limit)
+
+    return {
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"))
+    parser.add_argument("--api-key", default=os.getenv("QDRANT_API_KEY"))
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--from-collection", help="Copy vectors from this collection instead of generating them")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections afterwards")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+    if args.from_collection:
+        vectors = collection_vectors(client, args.from_collection, args.points)
+    else:
+        vectors = synthetic_vectors(args.points)
+
+    # Queries are perturbed corpus vectors so every query has true near neighbours
+    rng = np.random.default_rng(7)
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = unit_rows(vectors[picks] + 0.05 * rng.standard_normal((len(picks), DIM))).astype(np.float32)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.limit]
+
+    report = {"points": len(vectors), "queries": len(queries), "limit": args.limit, "runs": []}
+    for mode in CONFIGS:
+        name = f"bench_quantization_{mode}"
+        print(f"Building {name} ({len(vectors)} points)...")
+        build_collection(client, name, CONFIGS[mode], vectors)
+        for run_mode, rescore, oversampling in RUNS:
+            if run_mode != mode:
+                continue
+            result = {"quantization": mode, "rescore": rescore, "oversampling": oversampling,
+                      **measure(client, name, queries, truth, args.limit, rescore, oversampling)}
+            print(json.dumps(result))
+            report["runs"].append(result)
+        if not args.keep:
+            client.delete_collection(name)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"quantization_recall_{int(time.time())}.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
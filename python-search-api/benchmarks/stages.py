@@ -0,0 +1,276 @@
+"""
+Per-stage microbenchmarks for the search pipeline, comparable across commits.
+
+Every stage runs on its own against local stand-ins:
+  embedding      real fastembed model (PYTHON_EMBED_MODEL_VARIANT) at several batch sizes
+  qdrant         query_points on a local Qdrant (`:memory:` or --qdrant-path) at several corpus sizes
+  prompt         InferenceService source-structuring prompt building
+  json_parse     JsonArrayStream over token-sized chunks vs one json.loads
+  serialization  Flask JSON response and SSE framing of a full /search/ai result
+  llm            InferenceService against a fake Groq server (--groq-latency-ms, --token-ms)
+  websearch      WebSearchService against a fake SerpAPI server (--serpapi-latency-ms)
+
+For example, from python-search-api/:
+    python benchmarks/stages.py --stages qdrant json_parse --corpus-sizes 1000 10000
+    python benchmarks/compare.py benchmarks/results/stages_<old>.json benchmarks/results/stages_<new>.json
+
+Results are printed and written as JSON to benchmarks/results/, tagged with the git commit.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import subprocess
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The app and services read these at import time, the fakes never check them
+os.environ.setdefault("GROQ_API_KEY", "bench")
+os.environ.setdefault("SERPAPI_API_KEY", "bench")
+os.environ.setdefault("PYTHON_WEBSEARCH_CACHE_TTL", "0")
+os.environ.setdefault("PYTHON_EAGER_INIT", "off")
+# No LLM rate limits: the llm stage times the calls, not the scheduler waiting out the Groq quota
+os.environ.setdefault("PYTHON_LLM_RPM", "0")
+os.environ.setdefault("PYTHON_LLM_TPM", "0")
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from benchmarks.fakes import FakeGroqServer, FakeSerpApiServer, FAKE_SOURCES
+from benchmarks.quantization_recall import synthetic_vectors, DIM
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+STAGES = ("embedding", "qdrant", "prompt", "json_parse", "serialization", "llm", "websearch")
+
+QUERY = "how to handle backpressure in node streams"
+WEB_RESULTS = [
+    {
+        "title": f"Result {i}: Node.js streams and backpressure",
+        "url": f"https://example{i}.dev/article",
+        "description": "A practical walkthrough of pipe(), highWaterMark and async iterators.",
+        "favicon": f"https://www.google.com/s2/favicons?domain=example{i}.dev&sz=64",
+    }
+    for i in range(8)
+]
+SIMILAR_DOCS = [
+    {"uuid": f"00000000-0000-0000-0000-{i:012d}", "title": f"Post {i} about streams",
+     "description": "Readable, writable and transform streams explained with examples. " * 3, "score": 0.8}
+    for i in range(10)
+]
+
+
+def measure(fn, repeat, warmup=3):
+    """Wall-clock latency of fn() over `repeat` runs, after `warmup` discarded runs."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def summarize(samples):
+    return {
+        "n": len(samples),
+        "mean_ms": round(float(np.mean(samples)), 4),
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+    }
+
+
+def post_texts(n):
+    return [f"Post {i}: Designing idempotent APIs. Strategies for retries and consistency in service {i}."
+            for i in range(n)]
+
+
+# --- Stages ---
+def bench_embedding(args):
+    from fastembed import TextEmbedding
+    from services.embedding_models import resolve_model_name
+
+    variant = os.getenv("PYTHON_EMBED_MODEL_VARIANT", "optimized")
+    model = TextEmbedding(
+        model_name=resolve_model_name(variant),
+        threads=int(os.getenv("PYTHON_EMBED_THREADS", "1")),
+        cache_dir=os.getenv("PYTHON_FASTEMBED_CACHE_DIR"),
+    )
+    cases = {}
+    for batch_size in args.batch_sizes:
+        texts = post_texts(batch_size)
+        result = measure(lambda: list(model.embed(texts, batch_size=batch_size)), args.repeat)
+        result["texts_per_s"] = round(batch_size / (result["mean_ms"] / 1000), 1)
+        cases[f"batch_{batch_size}"] = result
+    return {"model_variant": variant, "cases": cases}
+
+
+def bench_qdrant(args):
+    client = QdrantClient(path=args.qdrant_path) if args.qdrant_path else QdrantClient(":memory:")
+    rng = np.random.default_rng(7)
+    cases = {}
+    for size in args.corpus_sizes:
+        name = f"bench_stages_{size}"
+        if client.collection_exists(name):
+            client.delete_collection(name)
+        client.create_collection(name, vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+        vectors = synthetic_vectors(size)
+        for start in range(0, size, 1024):
+            client.upsert(name, points=[
+                PointStruct(id=start + i, vector=v.tolist(), payload={"authorId": f"user-{(start + i) % 50}"})
+                for i, v in enumerate(vectors[start:start + 1024])
+            ])
+
+        queries = iter(vectors[rng.integers(0, size, args.repeat + 3)].tolist())
+        cases[f"dense_{size}"] = measure(
+            lambda: client.query_points(name, query=next(queries), limit=10, with_payload=True), args.repeat
+        )
+        queries = iter(vectors[rng.integers(0, size, args.repeat + 3)].tolist())
+        only_author = Filter(must=[FieldCondition(key="authorId", match=MatchValue(value="user-7"))])
+        cases[f"filtered_{size}"] = measure(
+            lambda: client.query_points(name, query=next(queries), query_filter=only_author, limit=10), args.repeat
+        )
+        client.delete_collection(name)
+    return {"backend": args.qdrant_path or ":memory:", "cases": cases}
+
+
+def bench_prompt(args):
+    from services.inference import InferenceService
+
+    svc = InferenceService()
+    return {"cases": {
+        f"sources_{len(WEB_RESULTS)}_results": measure(lambda: svc._sources_messages(QUERY, WEB_RESULTS), args.repeat),
+    }}
+
+
+def bench_json_parse(args):
+    from services.json_stream import JsonArrayStream
+
+    text = "```json\n" + json.dumps(FAKE_SOURCES, indent=2) + "\n```"
+    tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def incremental():
+        parser = JsonArrayStream()
+        for token in tokens:
+            parser.feed(token)
+
+    return {"cases": {
+        "json_loads": measure(lambda: json.loads(text.strip("`").removeprefix("json")), args.repeat),
+        "json_array_stream": measure(incremental, args.repeat),
+    }}
+
+
+def bench_serialization(args):
+    import app as search_app
+
+    result = {
+        "query": QUERY,
+        "expanded_query": "nodejs streams backpressure highwatermark",
+        "similar_docs": SIMILAR_DOCS,
+        "relevant_ext_docs": FAKE_SOURCES,
+    }
+
+    def json_response():
+        with search_app.app.app_context():
+            search_app.jsonify(result).get_data()
+
+    def sse_frames():
+        for event in ("similar_docs", "expanded_query", "relevant_ext_docs"):
+            search_app.format_sse(event, result[event])
+
+    return {"cases": {
+        "json_response": measure(json_response, args.repeat),
+        "sse_frames": measure(sse_frames, args.repeat),
+    }}
+
+
+def bench_llm(args):
+    from groq import AsyncGroq
+    from services.inference import InferenceService
+
+    with FakeGroqServer(latency_ms=args.groq_latency_ms, token_ms=args.token_ms) as server:
+        svc = InferenceService()
+        svc.client = AsyncGroq(api_key="bench", base_url=server.url)
+        loop = asyncio.new_event_loop()
+        try:
+            async def time_to_first_source():
+                started = time.perf_counter()
+                sources = svc.stream_relevant_sources(QUERY, WEB_RESULTS)
+                try:
+                    async for _ in sources:
+                        return (time.perf_counter() - started) * 1000
+                finally:
+                    await sources.aclose()
+
+            cases = {
+                "expand_query": measure(lambda: loop.run_until_complete(svc.expand_query(QUERY, SIMILAR_DOCS)), args.repeat),
+                "generate_relevant_sources": measure(
+                    lambda: loop.run_until_complete(svc.generate_relevant_sources(QUERY, WEB_RESULTS)), args.repeat
+                ),
+            }
+            # Streaming structuring: when the first source is usable vs the whole list above
+            cases["first_source"] = summarize([
+                loop.run_until_complete(time_to_first_source()) for _ in range(args.repeat)
+            ])
+        finally:
+            loop.close()
+    return {"groq_latency_ms": args.groq_latency_ms, "token_ms": args.token_ms, "cases": cases}
+
+
+def bench_websearch(args):
+    from services.websearch import WebSearchService
+
+    with FakeSerpApiServer(latency_ms=args.serpapi_latency_ms) as server:
+        svc = WebSearchService()
+        svc.client.BASE_DOMAIN = server.url
+        cases = {"search_8": measure(lambda: svc._search_sync(QUERY, 8), args.repeat)}
+    return {"serpapi_latency_ms": args.serpapi_latency_ms, "cases": cases}
+
+
+# --- Report ---
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"]) != 0
+        return f"{commit}-dirty" if dirty else commit
+    except Exception:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--qdrant-path", help="Local on-disk Qdrant directory instead of :memory:")
+    parser.add_argument("--groq-latency-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=2)
+    parser.add_argument("--serpapi-latency-ms", type=float, default=400)
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": args.repeat,
+        "stages": {},
+    }
+    for stage in args.stages:
+        print(f"Running {stage}...")
+        report["stages"][stage] = globals()[f"bench_{stage}"](args)
+        print(json.dumps(report["stages"][stage]))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"stages_{report['commit']}_{report['timestamp']}.json")
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+# gunicorn reads ./gunicorn.conf.py automatically: `gunicorn app:app` from python-search-api/
+import gc
+import os
+from services.metrics import mark_worker_dead
+
+# Pre-fork model sharing: PYTHON_PRELOAD_MODELS=1 imports the app (and loads the ONNX models)
+# once in the master, workers inherit the weights copy-on-write instead of each loading a copy.
+# Measure it with `python utilities/worker_memory.py <master pid>` (PSS per worker).
+preload_app = os.getenv("PYTHON_PRELOAD_MODELS", "0") == "1"
+
+
+def pre_fork(server, worker):
+    # Move the master's objects out of the collector's reach: a GC pass in a worker would
+    # otherwise write to every object header and un-share their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app  # already imported by the master, this is the inherited module
+        app.post_fork()
+
+
+def child_exit(server, worker):
+    # Prometheus multiprocess mode: stop reporting the in-flight gauge of a dead worker
+    mark_worker_dead(worker.pid)
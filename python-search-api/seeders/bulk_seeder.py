@@ -0,0 +1,252 @@
+"""
+Bulk ingest of posts into the Qdrant collection, for corpora too large for run_seeder.py.
+
+Posts are read as a stream from JSONL (one object per line) or a JSON array, embedded in
+batches and uploaded with Qdrant upload_points(parallel=N), window by window: embedding the
+next window overlaps the upload of the previous one, and memory stays bounded by a few windows
+whatever the corpus size. Each post needs a title and description; postuuid (or uuid) is used
+as the point id when present, otherwise an id derived from the text, so re-seeding a post
+overwrites its point instead of duplicating it. Metadata fields (authorId, isPublic, hashtags,
+createdAt) are stored like /embed stores them.
+
+After every uploaded window the progress is written to a checkpoint file (default
+<input>.checkpoint.json); running the same command again resumes after the last uploaded
+window. --restart ignores the checkpoint.
+
+From python-search-api/:
+    python seeders/bulk_seeder.py posts.jsonl --batch-size 256 --workers 4
+    python seeders/bulk_seeder.py seeders/posts_data.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.embedding_service import EmbeddingService, extract_post_metadata, post_text
+from services.json_stream import JsonArrayStream
+
+READ_CHUNK_BYTES = 1 << 16
+# Namespace of the text-derived point ids of posts that carry no postuuid
+POST_ID_NAMESPACE = uuid.UUID("5b0e7c7e-3f5a-4c39-9a43-6f1d9f2f6a51")
+
+
+# --- Input ---
+def is_jsonl(path):
+    """JSONL by extension, otherwise by the first non-blank character ('[' starts a JSON array)."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return True
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_BYTES)
+            if not chunk:
+                return True
+            stripped = chunk.lstrip()
+            if stripped:
+                return not stripped.startswith(b"[")
+
+
+def read_posts(path, skip=0, offset=None):
+    """
+    Yields (post, offset) without loading the file: offset is the byte position after the post
+    in a JSONL file (a resume seeks straight there), None for a JSON array, where a resume
+    re-reads and drops the first `skip` posts. Unparseable JSONL lines yield (None, offset).
+    """
+    if is_jsonl(path):
+        with open(path, "rb") as f:
+            if offset:
+                f.seek(offset)
+            else:
+                offset = 0
+            for line in f:
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line), offset
+                except json.JSONDecodeError:
+                    yield None, offset
+        return
+
+    stream = JsonArrayStream()
+    seen = 0
+    with open(path, "r", encoding="utf-8") as f:
+        while not stream.done:
+            chunk = f.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            for post in stream.feed(chunk):
+                seen += 1
+                if seen > skip:
+                    yield post, None
+
+
+def post_id(post):
+    return str(post.get("postuuid") or post.get("uuid") or uuid.uuid5(
+        POST_ID_NAMESPACE, f"{post.get('title', '')}\n{post.get('description', '')}"
+    ))
+
+
+# --- Checkpoint ---
+def load_checkpoint(checkpoint_path, source):
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != source:
+        raise SystemExit(
+            f"{checkpoint_path} belongs to {checkpoint.get('source')}, use --checkpoint or --restart"
+        )
+    return checkpoint
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    """Atomic replace, an interrupted write never leaves a truncated checkpoint behind."""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({**checkpoint, "updated_at": time.time()}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+# --- Pipeline ---
+def build_points(svc, posts):
+    """One batched dense (and sparse, when hybrid is on) pass over a window of posts."""
+    texts = [post_text(post) for post in posts]
+    vectors = svc._get_embeddings(texts)
+    sparse_vectors = svc._get_sparse_embeddings(texts)
+    return [
+        svc._build_point(post_id(post), post.get("title", ""), post.get("description", ""),
+                         vector, sparse_vector, extract_post_metadata(post))
+        for post, vector, sparse_vector in zip(posts, vectors, sparse_vectors)
+    ]
+
+
+def windows(posts, window_size):
+    """Groups the (post, offset) stream into (valid posts, records read, last offset, invalid count)."""
+    batch, records, invalid, offset = [], 0, 0, None
+    for post, offset in posts:
+        records += 1
+        try:
+            if not isinstance(post, dict) or not (post.get("title") or post.get("description")):
+                raise ValueError("not a post object")
+            extract_post_metadata(post)
+            batch.append(post)
+        except ValueError:
+            invalid += 1
+        if records == window_size:
+            yield batch, records, offset, invalid
+            batch, records, invalid = [], 0, 0
+    if records:
+        yield batch, records, offset, invalid
+
+
+def seed(path, svc=None, batch_size=256, window_size=2048, workers=2, upload_batch_size=256,
+         checkpoint_path=None, restart=False):
+    """Ingests every post of path not covered by the checkpoint. Returns the final checkpoint."""
+    source = os.path.abspath(path)
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint.json"
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, source)
+    if checkpoint is None:
+        checkpoint = {"source": source, "records": 0, "offset": None, "uploaded": 0, "invalid": 0}
+    elif checkpoint.get("done"):
+        print(f"{path} already seeded ({checkpoint['uploaded']} posts), use --restart to seed again")
+        return checkpoint
+    else:
+        print(f"Resuming after {checkpoint['records']} records ({checkpoint['uploaded']} posts uploaded)")
+
+    if svc is None:
+        svc = EmbeddingService()
+        svc.mirror = None  # nothing to serve here, don't start a sync thread
+    svc.embed_batch_size = batch_size
+    svc.connect()  # collection and payload indexes
+    svc.load_models()
+
+    # One upload window in flight while the next one is embedded, a third one may wait queued
+    uploads = queue.Queue(maxsize=1)
+    failure = []
+    started = time.perf_counter()
+    seeded = 0
+
+    def upload_loop():
+        nonlocal seeded
+        while True:
+            item = uploads.get()
+            if item is None:
+                return
+            points, records, offset, invalid = item
+            try:
+                if points:
+                    svc.client.upload_points(
+                        collection_name=svc.collection_name, points=points, batch_size=upload_batch_size,
+                        parallel=workers, max_retries=3, wait=True,
+                    )
+            except Exception as e:
+                failure.append(e)
+                return
+            checkpoint["records"] += records
+            checkpoint["uploaded"] += len(points)
+            checkpoint["invalid"] += invalid
+            if offset is not None:
+                checkpoint["offset"] = offset
+            save_checkpoint(checkpoint_path, checkpoint)
+            seeded += len(points)
+            elapsed = time.perf_counter() - started
+            print(f"{checkpoint['uploaded']} posts uploaded, {checkpoint['invalid']} invalid "
+                  f"({seeded / elapsed:.1f} posts/s)")
+
+    def enqueue(item):
+        """Blocks while the uploader is busy, gives up once it has failed."""
+        while not failure:
+            try:
+                uploads.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    uploader = threading.Thread(target=upload_loop, name="bulk-seeder-upload", daemon=True)
+    uploader.start()
+    try:
+        posts = read_posts(path, skip=checkpoint["records"], offset=checkpoint["offset"])
+        for batch, records, offset, invalid in windows(posts, window_size):
+            points = build_points(svc, batch) if batch else []
+            if not enqueue((points, records, offset, invalid)):
+                break
+    finally:
+        enqueue(None)
+        uploader.join()
+
+    if failure:
+        raise RuntimeError(
+            f"Upload failed after {checkpoint['records']} records, re-run to resume: {failure[0]}"
+        ) from failure[0]
+
+    checkpoint["done"] = True
+    save_checkpoint(checkpoint_path, checkpoint)
+    elapsed = time.perf_counter() - started
+    print(f"--- Seeded {seeded} posts in {elapsed:.1f}s ({seeded / elapsed if elapsed else 0:.1f} posts/s), "
+          f"{checkpoint['invalid']} invalid records skipped ---")
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file or JSON array of posts")
+    parser.add_argument("--batch-size", type=int, default=256, help="Posts per embedding model pass")
+    parser.add_argument("--window", type=int, default=2048, help="Posts per checkpointed upload window")
+    parser.add_argument("--workers", type=int, default=2, help="Parallel upload processes (upload_points parallel)")
+    parser.add_argument("--upload-batch-size", type=int, default=256, help="Points per upsert request")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default <path>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and seed from the start")
+    args = parser.parse_args()
+
+    seed(args.path, batch_size=args.batch_size, window_size=args.window, workers=args.workers,
+         upload_batch_size=args.upload_batch_size, checkpoint_path=args.checkpoint, restart=args.restart)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Zero-downtime collection migration: re-embeds every post into a new versioned collection and
+switches the QDRANT_COLLECTION_NAME alias to it atomically. Use it for any change that needs a
+new collection: model variant, vector size, quantization, HNSW settings (PYTHON_QDRANT_HNSW_M,
+PYTHON_QDRANT_HNSW_EF_CONSTRUCT), sparse vectors. Run it with the environment of the target
+configuration; the running API keeps serving from the old collection until the switch.
+
+  1. Creates <alias>_v<N+1> with the configured settings and payload indexes.
+  2. Copies the old collection in indexed_at order, re-embedding title + description in batches.
+     The payload, indexed_at included, is kept as is.
+  3. Catch-up passes copy what /embed wrote to the old collection meanwhile (indexed_at at or
+     after the last pass, minus --clock-skew), until a pass copies fewer than --max-lag posts.
+  4. Switches the alias in one update_collection_aliases call, waits --grace seconds for writes
+     still in flight, then runs a last catch-up pass from the old collection.
+A post already newer in the new collection is never overwritten by an older copy.
+
+The old collection is kept for rollback (--rollback-to <collection>) unless --drop-old is given.
+Re-running after an interruption resumes from the newest indexed_at already copied.
+
+A plain collection (created before aliases were used) can't share its name with an alias: the
+switch deletes it right before creating the alias, so writes in that sub-second gap fail. This
+only happens once and needs --replace-legacy. Re-embedding with a different model also needs the
+API redeployed with the same model at the switch, since queries and posts must share a vector
+space (the variants of services/embedding_models.py share one and need no coordination).
+
+From python-search-api/:
+    PYTHON_QDRANT_QUANTIZATION=binary python seeders/migrate_collection.py
+    python seeders/migrate_collection.py --rollback-to posts_v1
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from qdrant_client.models import (
+    Filter, FieldCondition, Range, IsEmptyCondition, PayloadField, OrderBy, Direction,
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation
+)
+from services.embedding_service import EmbeddingService, post_text
+
+INDEXED_AT = "indexed_at"
+
+
+def next_version_name(alias, source):
+    """posts -> posts_v2, posts_v2 -> posts_v3 (a plain collection counts as version 1)."""
+    match = re.fullmatch(rf"{re.escape(alias)}_v(\d+)", source)
+    return f"{alias}_v{int(match.group(1)) + 1 if match else 2}"
+
+
+class CollectionMigration:
+    def __init__(self, svc, source, target, batch_size=256, clock_skew=5.0):
+        self.svc = svc
+        self.client = svc.client
+        self.source = source
+        self.target = target
+        self.batch_size = batch_size
+        self.clock_skew = clock_skew
+        self.copied = 0
+        self.skipped = 0
+
+    # --- Copy ---
+    def copy_records(self, records):
+        """Re-embeds and upserts records into the target, unless the target already has them newer."""
+        existing = {
+            record.id: (record.payload or {}).get(INDEXED_AT, 0)
+            for record in self.client.retrieve(self.target, ids=[r.id for r in records], with_payload=[INDEXED_AT])
+        }
+        fresh = [r for r in records if r.id not in existing or existing[r.id] < (r.payload or {}).get(INDEXED_AT, 0)]
+        self.skipped += len(records) - len(fresh)
+        if not fresh:
+            return
+        texts = [post_text(r.payload) for r in fresh]
+        vectors = self.svc._get_embeddings(texts)
+        sparse_vectors = self.svc._get_sparse_embeddings(texts)
+        points = []
+        for record, vector, sparse_vector in zip(fresh, vectors, sparse_vectors):
+            point = self.svc._build_point(record.id, record.payload.get("title"), record.payload.get("description"),
+                                          vector, sparse_vector)
+            point.payload = dict(record.payload)  # same payload, indexed_at included
+            points.append(point)
+        self.client.upsert(collection_name=self.target, points=points, wait=True)
+        self.copied += len(points)
+
+    def copy_unstamped(self):
+        """Posts written before indexed_at existed: id-ordered scroll, they can't change without getting one."""
+        unstamped = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key=INDEXED_AT))])
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                self.source, scroll_filter=unstamped, limit=self.batch_size, offset=offset, with_payload=True
+            )
+            if records:
+                self.copy_records(records)
+            if offset is None:
+                return
+
+    def copy_since(self, watermark):
+        """
+        Copies every post with indexed_at >= watermark in indexed_at order and returns how many were
+        read and the newest indexed_at seen. Posts sharing the last value of a page are read with an
+        exact-match scroll before moving past it, so ties never split across pages.
+        """
+        read, newest = 0, watermark
+        condition = Range(gte=watermark)
+        while True:
+            records, _ = self.client.scroll(
+                self.source, scroll_filter=Filter(must=[FieldCondition(key=INDEXED_AT, range=condition)]),
+                order_by=OrderBy(key=INDEXED_AT, direction=Direction.ASC), limit=self.batch_size, with_payload=True,
+            )
+            if not records:
+                return read, newest
+            last_value = records[-1].payload[INDEXED_AT]
+            page = [r for r in records if r.payload[INDEXED_AT] != last_value]
+            page.extend(self._scroll_exact(last_value))
+            self.copy_records(page)
+            read += len(page)
+            newest = max(newest, last_value)
+            condition = Range(gt=last_value)
+
+    def _scroll_exact(self, value):
+        exact = Filter(must=[FieldCondition(key=INDEXED_AT, range=Range(gte=value, lte=value))])
+        records, offset = [], None
+        while True:
+            page, offset = self.client.scroll(
+                self.source, scroll_filter=exact, limit=self.batch_size, offset=offset, with_payload=True
+            )
+            records.extend(page)
+            if offset is None:
+                return records
+
+    def resume_watermark(self):
+        """Newest indexed_at already in the target, so an interrupted run doesn't start over."""
+        records, _ = self.client.scroll(
+            self.target, order_by=OrderBy(key=INDEXED_AT, direction=Direction.DESC), limit=1, with_payload=[INDEXED_AT]
+        )
+        return records[0].payload[INDEXED_AT] if records else 0.0
+
+    def catch_up(self, watermark, max_lag, max_passes):
+        """Repeats copy passes until one reads fewer than max_lag posts. Returns the watermark."""
+        for attempt in range(1, max_passes + 1):
+            started = time.perf_counter()
+            read, newest = self.copy_since(max(watermark - self.clock_skew, 0.0))
+            watermark = max(watermark, newest)
+            print(f"Catch-up pass {attempt}: {read} posts read in {time.perf_counter() - started:.1f}s "
+                  f"({self.copied} copied, {self.skipped} already current)")
+            if read < max_lag:
+                break
+        return watermark
+
+
+def switch_alias(client, alias, target, current=None):
+    """Points alias at target in one atomic aliases update (delete + create)."""
+    operations = []
+    if current is not None:
+        operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=alias)))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"Alias {alias} -> {target}")
+
+
+def migrate(svc=None, batch_size=256, max_lag=100, max_passes=10, clock_skew=5.0, grace=2.0,
+            switch=True, drop_old=False, replace_legacy=False):
+    """Runs the whole migration. Returns the name of the new collection."""
+    if svc is None:
+        svc = EmbeddingService()
+        svc.mirror = None
+    svc.embed_batch_size = batch_size
+    if svc.client is None:
+        # Not connect(): it would apply the new settings to the old collection in place
+        svc.client = svc._new_client()
+    svc.load_models()
+
+    alias = svc.collection_name
+    source = svc.resolve_collection()
+    if not svc.client.collection_exists(source):
+        raise SystemExit(f"Nothing to migrate, collection {alias} does not exist")
+    legacy = source == alias
+    if legacy and switch and not replace_legacy:
+        raise SystemExit(f"{alias} is a plain collection, not an alias: the switch has to delete it "
+                         f"right before creating the alias. Re-run with --replace-legacy to accept that.")
+
+    target = next_version_name(alias, source)
+    if not svc.client.collection_exists(target):
+        svc.create_collection(target)
+    migration = CollectionMigration(svc, source, target, batch_size=batch_size, clock_skew=clock_skew)
+    started = time.perf_counter()
+    print(f"Migrating {source} -> {target} (alias {alias})")
+
+    migration.copy_unstamped()
+    watermark = migration.catch_up(migration.resume_watermark(), max_lag, max_passes)
+    if not switch:
+        print(f"{target} is ready, re-run without --no-switch to catch up and switch {alias} to it")
+        return target
+
+    if legacy:
+        # Last chance to copy: the old collection is gone once the alias takes its name
+        migration.copy_since(max(watermark - clock_skew, 0.0))
+        svc.client.delete_collection(source)
+        switch_alias(svc.client, alias, target)
+    else:
+        switch_alias(svc.client, alias, target, current=source)
+        time.sleep(grace)  # /embed requests resolved to the old collection before the switch
+        migration.copy_since(max(watermark - clock_skew, 0.0))
+        if drop_old:
+            svc.client.delete_collection(source)
+            print(f"Dropped {source}")
+        else:
+            print(f"Kept {source}, roll back with --rollback-to {source}")
+
+    print(f"--- Migrated to {target} in {time.perf_counter() - started:.1f}s: {migration.copied} posts copied, "
+          f"{svc.client.count(target).count} in the collection ---")
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=256, help="Posts per scroll page and embedding pass")
+    parser.add_argument("--max-lag", type=int, default=100, help="Switch once a catch-up pass reads fewer posts")
+    parser.add_argument("--max-passes", type=int, default=10)
+    parser.add_argument("--clock-skew", type=float, default=5.0, help="Seconds of indexed_at overlap between passes")
+    parser.add_argument("--grace", type=float, default=2.0, help="Seconds to wait after the switch")
+    parser.add_argument("--no-switch", action="store_true", help="Build and catch up, leave the alias alone")
+    parser.add_argument("--drop-old", action="store_true", help="Delete the old collection after the switch")
+    parser.add_argument("--replace-legacy", action="store_true", help="Allow replacing a plain collection by the alias")
+    parser.add_argument("--rollback-to", metavar="COLLECTION", help="Only point the alias back at COLLECTION")
+    args = parser.parse_args()
+
+    if args.rollback_to:
+        svc = EmbeddingService()
+        svc.client = svc._new_client()
+        current = svc.resolve_collection()
+        switch_alias(svc.client, svc.collection_name, args.rollback_to,
+                     current=current if current != svc.collection_name else None)
+        return
+
+    migrate(batch_size=args.batch_size, max_lag=args.max_lag, max_passes=args.max_passes,
+            clock_skew=args.clock_skew, grace=args.grace, switch=not args.no_switch,
+            drop_old=args.drop_old, replace_legacy=args.replace_legacy)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
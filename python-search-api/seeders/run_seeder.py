@@ -1,42 +1,29 @@
-import json
-import uuid
+"""
+Seeds the Qdrant collection with seeders/posts_data.json, from scratch on every run.
+
+Point ids are derived from each post's title + description (see bulk_seeder.post_id), so
+re-seeding overwrites the same points. Versions of this script before bulk_seeder used a
+random uuid4 per post and run: a collection seeded by them gets each post once more on the
+next run. Delete that collection before re-seeding it with this version.
+"""
 import sys
 import os
 
-# Add the parent directory to the path so we can import SearchService
+# Add the parent directory to the path so we can import the seeders package
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from services.embedding_service import EmbeddingService as SearchService
+from seeders.bulk_seeder import seed
 
 def seed_database():
-    # Initialize our existing service
-    search_svc = SearchService()
-    
     # Path to our data
     data_path = os.path.join(os.path.dirname(__file__), 'posts_data.json')
-    
+
     try:
-        with open(data_path, 'r') as f:
-            posts = json.load(f)
-            
-        print(f"--- Starting seeding for {len(posts)} posts ---")
-        
-        for post in posts:
-            # Generate a real random UUID for each seed post
-            post_uuid = str(uuid.uuid4())
-            title = post['title']
-            description = post['description']
-            
-            print(f"Seeding: {title}...")
-            
-            # Use our existing service logic
-            search_svc.store_post(post_uuid, title, description)
-            
-        print("--- Seeding completed successfully ---")
-        
+        # Always a full re-seed: the checkpoint only matters for bulk_seeder.py's large, resumable runs
+        seed(data_path, restart=True)
     except FileNotFoundError:
         print(f"Error: Could not find {data_path}")
     except Exception as e:
         print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    seed_database()
\ No newline at end of file
+    seed_database()
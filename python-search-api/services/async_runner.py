@@ -0,0 +1,83 @@
+import os
+import time
+import queue
+import asyncio
+import contextvars
+import threading
+import concurrent.futures
+
+
+class AsyncRunner:
+    """
+    Owns one long-lived asyncio event loop running on a daemon thread.
+    Sync Flask handlers submit coroutines to it instead of calling asyncio.run(),
+    so async clients (AsyncGroq's httpx pool, executors) survive across requests.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        """Starts the loop thread on first use, and again in a forked child (threads don't survive fork)."""
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-runner", daemon=True)
+                thread.start()
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            return self._loop
+
+    @property
+    def loop(self):
+        return self._ensure_loop()
+
+    def _submit(self, coro):
+        """
+        Schedules coro on the loop thread under a copy of the caller's contextvars,
+        so per-request context (e.g. the current trace span) carries over into it.
+        """
+        caller_context = contextvars.copy_context()
+
+        async def in_caller_context():
+            return await asyncio.get_running_loop().create_task(coro, context=caller_context)
+
+        return asyncio.run_coroutine_threadsafe(in_caller_context(), self._ensure_loop())
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine on the shared loop and blocks the calling thread until it completes."""
+        future = self._submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Async task did not complete within {timeout}s")
+
+    def stream(self, coro_fn, timeout=None):
+        """
+        Runs coro_fn(emit) on the shared loop and yields each emit(event, data) call to the
+        calling thread as it happens. Re-raises the coroutine's exception once the events
+        before it have been yielded. Closing the generator early cancels the coroutine.
+        """
+        events = queue.Queue()
+        finished = object()
+        future = self._submit(coro_fn(lambda event, data: events.put((event, data))))
+        future.add_done_callback(lambda _: events.put(finished))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        try:
+            while True:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                try:
+                    item = events.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"Async task did not complete within {timeout}s")
+                if item is finished:
+                    future.result()
+                    return
+                yield item
+        finally:
+            if not future.done():
+                future.cancel()
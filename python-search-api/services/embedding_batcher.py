@@ -0,0 +1,83 @@
+import os
+import time
+import queue
+import threading
+import concurrent.futures
+import numpy as np
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching scheduler for query embeddings.
+    Texts submitted by concurrent request threads are gathered for up to window_ms
+    (or until max_batch_size is reached) and run through the model as one batch;
+    each caller gets its own vector back. Batched ONNX inference amortizes the
+    per-call session overhead that dominates at batch size 1.
+    """
+
+    def __init__(self, embed_fn, window_ms=2, max_batch_size=32):
+        self.embed_fn = embed_fn  # list[str] -> iterable of vectors, in order
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_observed_batch = 0
+
+    def _ensure_worker(self):
+        """Starts the batching thread on first use, and again in a forked child."""
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def embed(self, text, timeout=None):
+        """Blocks until the batch holding text has been embedded, returns its float32 vector."""
+        self._ensure_worker()
+        future = concurrent.futures.Future()
+        self._queue.put((text, future))
+        return future.result(timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Identical texts in the same window are embedded once
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vectors = dict(zip(unique_texts, (np.asarray(v, dtype=np.float32) for v in self.embed_fn(unique_texts))))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.max_observed_batch = max(self.max_observed_batch, len(batch))
+            for text, future in batch:
+                future.set_result(vectors[text])
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_observed_batch,
+        }
@@ -0,0 +1,68 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Bounded in-process cache of query embeddings, keyed on the normalized query text.
+    Entries expire after ttl_seconds and the least recently used entry is evicted
+    once max_size is reached. Vectors are kept as float32 arrays (1.5 KB for 384 dims).
+    """
+
+    def __init__(self, max_size=2048, ttl_seconds=3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(text):
+        """Case and whitespace insensitive key: the bge tokenizer is uncased anyway."""
+        return " ".join(text.lower().split())
+
+    def get(self, text):
+        """Returns the cached float32 vector for text, or None on a miss or an expired entry."""
+        key = self.normalize(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, text, vector):
+        if self.max_size <= 0:
+            return
+        key = self.normalize(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.setflags(write=False)  # shared between callers, never mutated in place
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
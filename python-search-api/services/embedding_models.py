@@ -0,0 +1,79 @@
+import numpy as np
+from fastembed import TextEmbedding
+from fastembed.common.model_description import PoolingType, ModelSource
+
+# PYTHON_EMBED_MODEL_VARIANT -> fastembed model name. All variants are bge-small-en-v1.5
+# (384 dims, CLS pooling), so vectors stay comparable with what is already stored in Qdrant.
+EMBEDDING_VARIANTS = {
+    # fastembed's default: Qdrant's graph-optimized, int8-quantized ONNX export
+    "optimized": "BAAI/bge-small-en-v1.5",
+    # Full-precision export, the reference the quantized variants are checked against
+    "fp32": "postair/bge-small-en-v1.5-fp32",
+    # Dynamic int8 quantization of the fp32 export (onnxruntime quantize_dynamic)
+    "int8": "postair/bge-small-en-v1.5-int8",
+}
+REFERENCE_VARIANT = "fp32"
+
+_CUSTOM_MODEL_FILES = {
+    "postair/bge-small-en-v1.5-fp32": ("onnx/model.onnx", 0.13),
+    "postair/bge-small-en-v1.5-int8": ("onnx/model_quantized.onnx", 0.034),
+}
+
+# Representative short queries and post texts used by the startup parity check
+PARITY_PROBES = [
+    "react state management",
+    "How do I fix a memory leak in Node.js?",
+    "Designing Idempotent APIs for Distributed Systems. Strategies for ensuring consistency.",
+    "kubernetes horizontal pod autoscaling on custom metrics",
+    "CQRS vs CRUD: When to Separate Read and Write Paths",
+    "what is rest",
+]
+
+_registered = False
+
+
+def register_variants():
+    """Registers the non-builtin variants with fastembed (once per process)."""
+    global _registered
+    if _registered:
+        return
+    for model_name, (model_file, size_in_gb) in _CUSTOM_MODEL_FILES.items():
+        try:
+            TextEmbedding.add_custom_model(
+                model=model_name,
+                pooling=PoolingType.CLS,
+                normalization=True,
+                sources=ModelSource(hf="Xenova/bge-small-en-v1.5"),
+                dim=384,
+                model_file=model_file,
+                size_in_gb=size_in_gb,
+            )
+        except ValueError:
+            pass  # already registered by an earlier import in this process
+    _registered = True
+
+
+def resolve_model_name(variant):
+    """Maps a variant to its fastembed model name; unknown values are taken as a model name."""
+    register_variants()
+    return EMBEDDING_VARIANTS.get(variant, variant)
+
+
+def check_variant_parity(model, cache_dir, threads=1):
+    """
+    Embeds PARITY_PROBES with the loaded model and the fp32 reference and compares them.
+    Returns {"reference", "min_cosine", "mean_cosine"}; the reference model is discarded afterwards.
+    """
+    reference = TextEmbedding(model_name=resolve_model_name(REFERENCE_VARIANT), threads=threads, cache_dir=cache_dir)
+    expected = np.asarray(list(reference.embed(PARITY_PROBES)), dtype=np.float32)
+    actual = np.asarray(list(model.embed(PARITY_PROBES)), dtype=np.float32)
+    del reference
+
+    cosines = np.sum(expected * actual, axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    return {
+        "reference": REFERENCE_VARIANT,
+        "min_cosine": round(float(cosines.min()), 4),
+        "mean_cosine": round(float(cosines.mean()), 4),
+    }
@@ -1,11 +1,122 @@
 import os
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct 
-from fastembed import TextEmbedding 
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Disabled, SearchParams, QuantizationSearchParams,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, BinaryQuantization, BinaryQuantizationConfig,
+    SparseVectorParams, SparseVector, Modifier, Prefetch, FusionQuery, Fusion,
+    PayloadSchemaType, Filter, FieldCondition, MatchValue, MatchAny, Range,
+    HnswConfigDiff, CreateAlias, CreateAliasOperation
+)
+from fastembed import TextEmbedding, SparseTextEmbedding
 from dotenv import load_dotenv
+from services.embedding_cache import EmbeddingCache
+from services.singleflight import SingleFlight
+from services.embedding_batcher import EmbeddingBatcher
+from services.vector_mirror import VectorMirror
+from services.reranker import Reranker
+from services.metrics import observe_dependency, count_cache_lookup
+from services.tracing import tracer, set_attributes
+from services.embedding_models import resolve_model_name, check_variant_parity, EMBEDDING_VARIANTS, REFERENCE_VARIANT
 
 load_dotenv()
 
+SPARSE_VECTOR_NAME = "bm25"
+SEARCH_MODES = ("dense", "hybrid")
+
+# Filterable payload fields and their Qdrant payload index types
+PAYLOAD_INDEXES = {
+    "authorId": PayloadSchemaType.KEYWORD,
+    "isPublic": PayloadSchemaType.BOOL,
+    "hashtags": PayloadSchemaType.KEYWORD,
+    "createdAt": PayloadSchemaType.INTEGER,   # epoch seconds
+    "indexed_at": PayloadSchemaType.FLOAT,    # incremental sync of read replicas
+}
+SEARCH_FILTER_KEYS = ("authorId", "isPublic", "hashtags", "createdAfter", "createdBefore")
+
+
+def to_epoch_seconds(value):
+    """Accepts epoch seconds, epoch milliseconds (JS Date.now()) or an ISO 8601 string."""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        return int(value / 1000) if value > 1e11 else int(value)
+    if isinstance(value, str):
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    raise ValueError(f"Invalid timestamp: {value!r}")
+
+
+def parse_bool(value, name):
+    """A JSON boolean, or its "true"/"false" string form; bool("false") would make a private post public."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise ValueError(f"{name} must be a boolean")
+
+
+def extract_post_metadata(data):
+    """Picks the filterable metadata (author, visibility, hashtags, createdAt) out of an /embed body."""
+    metadata = {}
+    if data.get("authorId") is not None:
+        metadata["authorId"] = str(data["authorId"])
+    if data.get("isPublic") is not None:
+        metadata["isPublic"] = parse_bool(data["isPublic"], "isPublic")
+    if data.get("hashtags") is not None:
+        if not isinstance(data["hashtags"], list):
+            raise ValueError("hashtags must be a list of strings")
+        metadata["hashtags"] = [str(tag).lstrip("#").lower() for tag in data["hashtags"]]
+    if data.get("createdAt") is not None:
+        metadata["createdAt"] = to_epoch_seconds(data["createdAt"])
+    return metadata
+
+
+def post_text(doc):
+    """Text a post is scored on by the reranker, same fields the embedding is built from."""
+    return f"{doc.get('title') or ''}. {doc.get('description') or ''}"
+
+
+def build_search_filter(spec):
+    """
+    Translates the /search "filter" object into a Qdrant Filter, evaluated inside the ANN search:
+    {"authorId": "id" | ["id", ...], "isPublic": bool, "hashtags": [...] (any of),
+     "createdAfter": ts, "createdBefore": ts}. Raises ValueError on unknown keys or bad values.
+    """
+    if not spec:
+        return None
+    if not isinstance(spec, dict):
+        raise ValueError("filter must be an object")
+    unknown = set(spec) - set(SEARCH_FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown filter keys: {', '.join(sorted(unknown))}")
+
+    must = []
+    author = spec.get("authorId")
+    if author is not None:
+        match = MatchAny(any=[str(a) for a in author]) if isinstance(author, list) else MatchValue(value=str(author))
+        must.append(FieldCondition(key="authorId", match=match))
+    if spec.get("isPublic") is not None:
+        if not isinstance(spec["isPublic"], bool):
+            raise ValueError("isPublic must be a boolean")
+        must.append(FieldCondition(key="isPublic", match=MatchValue(value=spec["isPublic"])))
+    if spec.get("hashtags"):
+        if not isinstance(spec["hashtags"], list):
+            raise ValueError("hashtags must be a list of strings")
+        tags = [str(tag).lstrip("#").lower() for tag in spec["hashtags"]]
+        must.append(FieldCondition(key="hashtags", match=MatchAny(any=tags)))
+    if spec.get("createdAfter") is not None or spec.get("createdBefore") is not None:
+        must.append(FieldCondition(key="createdAt", range=Range(
+            gte=to_epoch_seconds(spec["createdAfter"]) if spec.get("createdAfter") is not None else None,
+            lte=to_epoch_seconds(spec["createdBefore"]) if spec.get("createdBefore") is not None else None,
+        )))
+    return Filter(must=must) if must else None
+
 class EmbeddingService:
     def __init__(self):
         # We only set the configuration strings on init.
@@ -13,86 +124,627 @@ class EmbeddingService:
         self.qdrant_url = os.getenv("QDRANT_URL")
         self.qdrant_api_key = os.getenv("QDRANT_API_KEY")
         self.collection_name = os.getenv("QDRANT_COLLECTION_NAME")
+        # Transport: gRPC (binary vectors, one multiplexed HTTP/2 channel) or REST with a keep-alive pool
+        self.prefer_grpc = os.getenv("PYTHON_QDRANT_PREFER_GRPC", "0") == "1"
+        self.grpc_port = int(os.getenv("PYTHON_QDRANT_GRPC_PORT", "6334"))
+        self.pool_size = int(os.getenv("PYTHON_QDRANT_POOL_SIZE", "20"))
+        # Per-operation timeouts (seconds): searches fail fast, bulk writes and admin calls may take longer
+        self.timeout = int(os.getenv("PYTHON_QDRANT_TIMEOUT", "60"))
+        self.search_timeout = int(os.getenv("PYTHON_QDRANT_SEARCH_TIMEOUT", "10"))
+        # Searches awaited on AsyncQdrantClient from the event loop instead of a blocked thread
+        self.async_enabled = os.getenv("PYTHON_QDRANT_ASYNC", "0") == "1"
         self.cache_dir = os.getenv("PYTHON_FASTEMBED_CACHE_DIR")
-        
+        # Model variant (see services/embedding_models.py), downloaded once under cache_dir
+        self.model_variant = os.getenv("PYTHON_EMBED_MODEL_VARIANT", "optimized")
+        self.model_name = resolve_model_name(self.model_variant)
+        # On by default: a swapped ONNX file must prove it still matches the fp32 vectors before serving
+        self.variant_check_enabled = os.getenv("PYTHON_EMBED_VARIANT_CHECK", "1") == "1"
+        self.variant_min_cosine = float(os.getenv("PYTHON_EMBED_VARIANT_MIN_COSINE", "0.99"))
+        self.variant_check = None
+        # Bulk ingest tuning: texts per ONNX forward pass / points per Qdrant upsert request
+        self.embed_batch_size = int(os.getenv("PYTHON_EMBED_BATCH_SIZE", "64"))
+        self.upsert_chunk_size = int(os.getenv("PYTHON_QDRANT_UPSERT_CHUNK_SIZE", "256"))
+        # Query embeddings are reused across /search, /search-augmented and /search/ai (size 0 disables)
+        self.query_cache = EmbeddingCache(
+            max_size=int(os.getenv("PYTHON_EMBED_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("PYTHON_EMBED_CACHE_TTL", "3600"))
+        )
+        # Concurrent identical searches share one embedding + Qdrant query
+        self.search_flight = SingleFlight("similarity_search")
+        # Query texts from concurrent requests are embedded together. Off by default (window 0):
+        # every query pays the window plus a thread hand-off, which only pays off under sustained
+        # concurrent /search traffic; measure at the expected concurrency before enabling it
+        self.embed_threads = int(os.getenv("PYTHON_EMBED_THREADS", "1"))
+        self.batch_window_ms = float(os.getenv("PYTHON_EMBED_BATCH_WINDOW_MS", "0"))
+        self.batcher = EmbeddingBatcher(
+            embed_fn=lambda texts: self.model.embed(texts, batch_size=len(texts)),
+            window_ms=self.batch_window_ms,
+            max_batch_size=int(os.getenv("PYTHON_EMBED_BATCH_MAX_QUERIES", "32"))
+        )
+        # Vector quantization: "scalar" (int8), "binary" or "none"; unset leaves the collection as is
+        self.quantization = os.getenv("PYTHON_QDRANT_QUANTIZATION", "").lower()
+        self.quantization_rescore = os.getenv("PYTHON_QDRANT_QUANTIZATION_RESCORE", "1") == "1"
+        self.quantization_oversampling = float(os.getenv("PYTHON_QDRANT_QUANTIZATION_OVERSAMPLING", "2.0"))
+        # Hybrid retrieval: BM25 sparse vectors stored next to the dense one, fused with RRF inside Qdrant
+        self.hybrid_enabled = os.getenv("PYTHON_HYBRID_SEARCH", "0") == "1"
+        self.sparse_model_name = os.getenv("PYTHON_SPARSE_MODEL", "Qdrant/bm25")
+        self.hybrid_prefetch_limit = int(os.getenv("PYTHON_HYBRID_PREFETCH_LIMIT", "20"))
+        self.hybrid_available = False  # set once the collection is known to carry the sparse vector
+        # Optional local read replica of the collection, Qdrant stays the source of truth
+        self.mirror = None
+        if os.getenv("PYTHON_VECTOR_MIRROR", "0") == "1":
+            self.mirror = VectorMirror(
+                sync_interval_seconds=float(os.getenv("PYTHON_VECTOR_MIRROR_SYNC_INTERVAL", "60")),
+                full_resync_seconds=float(os.getenv("PYTHON_VECTOR_MIRROR_FULL_RESYNC", "3600"))
+            )
+        # Optional cross-encoder reranking of an oversampled candidate set, under a latency budget
+        self.reranker = None
+        self.rerank_oversampling = int(os.getenv("PYTHON_RERANK_OVERSAMPLING", "3"))
+        if os.getenv("PYTHON_RERANKER", "0") == "1":
+            self.reranker = Reranker(
+                model_name=os.getenv("PYTHON_RERANKER_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2"),
+                budget_ms=float(os.getenv("PYTHON_RERANK_BUDGET_MS", "80")),
+                batch_size=int(os.getenv("PYTHON_RERANK_BATCH_SIZE", "16"))
+            )
+
         # Placeholders for lazy-loaded resources
         self.client = None
+        self.async_client = None
+        self._async_client_loop = None
         self.model = None
+        self.sparse_model = None
+        self.collection_ready = False
+        self._init_lock = threading.RLock()
 
     def _initialize_resources(self):
         """
-        Internal gateway. Only runs once when the first request hits.
-        This moves the 'Download and Load' delay away from deployment boot.
+        Internal gateway, used lazily by the first request when the startup init (see app.py)
+        is disabled or has not finished. Idempotent and safe to call from several threads.
         """
-        if self.client is None:
-            print("Lazy Loading: Connecting to Qdrant Cloud...")
-            self.client = QdrantClient(
-                url=self.qdrant_url,
-                api_key=self.qdrant_api_key,
-                timeout=60
-            )
+        self.connect()
+        self.load_models()
+
+    def connect(self):
+        """Opens the Qdrant client and makes sure the collection and its payload indexes exist."""
+        with self._init_lock:
+            if self.client is None:
+                print("Lazy Loading: Connecting to Qdrant Cloud...")
+                self.client = self._new_client()
+            if not self.collection_ready:
+                self._ensure_collection()
+                self.collection_ready = True
 
-        if self.model is None:
-            print("Lazy Loading: Initializing FastEmbed model (BAAI/bge-small-en-v1.5)...")
-            # threads=1 is critical for Render's Free Tier to prevent OOM/CPU spikes
+        if self.mirror is not None:
+            self.mirror.start(self.client, self.collection_name)
+
+    def _client_options(self, timeout):
+        return dict(
+            url=self.qdrant_url, api_key=self.qdrant_api_key, timeout=timeout,
+            prefer_grpc=self.prefer_grpc, grpc_port=self.grpc_port,
+            # qdrant-client turns keep-alive off for localhost, pooled connections are reused across requests
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+
+    def _new_client(self):
+        return QdrantClient(**self._client_options(self.timeout))
+
+    def _get_async_client(self):
+        """
+        AsyncQdrantClient for searches, bound to the running loop (the AsyncRunner's): its
+        connections belong to that loop, so it is recreated when the loop changes, e.g. after fork.
+        """
+        loop = asyncio.get_running_loop()
+        if self.async_client is None or self._async_client_loop is not loop:
+            # The sync client already checked the server version at connect()
+            self.async_client = AsyncQdrantClient(**self._client_options(self.search_timeout), check_compatibility=False)
+            self._async_client_loop = loop
+        return self.async_client
+
+    def load_models(self):
+        """Loads the embedding model (plus the optional sparse model and reranker) and runs a test inference."""
+        with self._init_lock:
+            if self.model is not None:
+                return
+            print(f"Lazy Loading: Initializing FastEmbed model ({self.model_name})...")
+            # threads=1 (PYTHON_EMBED_THREADS default) is critical for Render's Free Tier to prevent OOM/CPU spikes
             # self.model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5", threads=1)
-            self.model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5", threads=1, cache_dir=self.cache_dir)
-            self._ensure_collection()
-            list(self.model.embed(['warmup']))  # triggers download/load, result discarded
+            model = TextEmbedding(model_name=self.model_name, threads=self.embed_threads, cache_dir=self.cache_dir)
+            if self.hybrid_enabled:
+                print(f"Lazy Loading: Initializing sparse model ({self.sparse_model_name})...")
+                self.sparse_model = SparseTextEmbedding(
+                    model_name=self.sparse_model_name, threads=self.embed_threads, cache_dir=self.cache_dir
+                )
+            if self.reranker is not None:
+                self.reranker.load(cache_dir=self.cache_dir, threads=self.embed_threads)
+            list(model.embed(['warmup']))  # test inference: builds the ONNX session, result discarded
+            if self.variant_check_enabled and self.model_variant in EMBEDDING_VARIANTS \
+                    and self.model_variant != REFERENCE_VARIANT:
+                model = self._check_model_variant(model)
+            # Published last: search_similar_post treats a set model as "ready to serve"
+            self.model = model
+
+    def reset_after_fork(self):
+        """
+        gunicorn post_fork (preload_app): drops the Qdrant client so this worker opens its own
+        connections instead of sharing the master's sockets. With PYTHON_EMBED_THREADS=1 the ONNX
+        sessions are kept, their weights stay shared copy-on-write with the master and only the
+        inference arena is per worker. Intra-op thread pools don't survive fork, so multi-threaded
+        sessions are rebuilt from the local cache_dir instead, without the memory saving.
+        """
+        self._init_lock = threading.RLock()
+        self.client = None
+        self.async_client = None
+        if self.embed_threads > 1 and self.model is not None:
+            print(f"Worker {os.getpid()}: PYTHON_EMBED_THREADS={self.embed_threads}, reloading the models after fork")
+            self.model = None
+            self.sparse_model = None
+            if self.reranker is not None:
+                self.reranker.model = None
+
+    def _quantization_config(self):
+        """Maps PYTHON_QDRANT_QUANTIZATION to a Qdrant quantization config (None when unmanaged)."""
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        if self.quantization == "none":
+            return Disabled.DISABLED
+        return None
+
+    def _search_params(self):
+        """Query-time rescore/oversampling for quantized collections."""
+        if self.quantization not in ("scalar", "binary"):
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(
+                rescore=self.quantization_rescore,
+                oversampling=self.quantization_oversampling
+            )
+        )
+
+    def _check_model_variant(self, model):
+        """
+        Startup parity check of the configured variant against fp32 vectors. Returns the model to
+        serve: the variant when it passes, otherwise the fp32 reference. Raises when the check
+        can't run, so the embedding_model init step fails and /ready stays 503 until it can.
+        """
+        try:
+            result = check_variant_parity(model, self.cache_dir, threads=self.embed_threads)
+        except Exception as e:
+            raise RuntimeError(f"Model variant parity check failed to run: {e}") from e
+        result["passed"] = result["min_cosine"] >= self.variant_min_cosine
+        self.variant_check = result
+        if result["passed"]:
+            print(f"Model variant '{self.model_variant}' parity OK: {result}")
+            return model
+
+        print(f"WARNING: model variant '{self.model_variant}' drifts from fp32 vectors: {result}, "
+              f"serving the {REFERENCE_VARIANT} reference instead")
+        reference_name = resolve_model_name(REFERENCE_VARIANT)
+        reference = TextEmbedding(model_name=reference_name, threads=self.embed_threads, cache_dir=self.cache_dir)
+        list(reference.embed(['warmup']))
+        result["fallback"] = REFERENCE_VARIANT
+        self.model_variant, self.model_name = REFERENCE_VARIANT, reference_name
+        return reference
+
+    def resolve_collection(self):
+        """
+        Physical collection behind QDRANT_COLLECTION_NAME: the target of the alias of that name
+        (see seeders/migrate_collection.py), or the collection itself for a plain collection.
+        """
+        for alias in self.client.get_aliases().aliases:
+            if alias.alias_name == self.collection_name:
+                return alias.collection_name
+        return self.collection_name
 
     def _ensure_collection(self):
         """Create the collection in Qdrant cloud if not exists."""
         # Note: self.client is guaranteed to exist by _initialize_resources call
         collections = self.client.get_collections().collections
-        exists = any(c.name == self.collection_name for c in collections)
+        # Searches and writes go through the alias, collection settings are managed on its target
+        target = self.resolve_collection()
+        exists = any(c.name == target for c in collections)
+        quantization_config = self._quantization_config()
 
         if not exists:
-            print(f"Creating collection: {self.collection_name}")
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE),
+            # New deployments start versioned behind an alias, so a migration can switch atomically.
+            # <name>_v1 may already exist without the alias (a first start interrupted between the
+            # two calls, a manual create): it is kept, only the alias is added
+            target = f"{self.collection_name}_v1"
+            created = not any(c.name == target for c in collections)
+            if created:
+                self.create_collection(target)
+            else:
+                print(f"Collection {target} has no {self.collection_name} alias, adding it")
+            self.client.update_collection_aliases(change_aliases_operations=[
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=target, alias_name=self.collection_name))
+            ])
+            if created:
+                return
+
+        info = self.client.get_collection(target)
+        if quantization_config is not None:
+            self._migrate_quantization(info, quantization_config, target)
+        if self.hybrid_enabled:
+            self._ensure_sparse_vectors(info, target)
+        self._ensure_payload_indexes(info.payload_schema or {}, target)
+
+    def create_collection(self, name):
+        """Creates a collection with the configured vectors, quantization, HNSW and payload indexes."""
+        print(f"Creating collection: {name}")
+        quantization_config = self._quantization_config()
+        self.client.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=384, distance=Distance.COSINE),
+            sparse_vectors_config=self._sparse_vectors_config() if self.hybrid_enabled else None,
+            quantization_config=quantization_config if quantization_config != Disabled.DISABLED else None,
+            hnsw_config=self._hnsw_config(),
+        )
+        self.hybrid_available = self.hybrid_enabled
+        self._ensure_payload_indexes({}, name)
+
+    def _hnsw_config(self):
+        """PYTHON_QDRANT_HNSW_M / PYTHON_QDRANT_HNSW_EF_CONSTRUCT for new collections (None keeps Qdrant's defaults)."""
+        m = os.getenv("PYTHON_QDRANT_HNSW_M")
+        ef_construct = os.getenv("PYTHON_QDRANT_HNSW_EF_CONSTRUCT")
+        if m is None and ef_construct is None:
+            return None
+        return HnswConfigDiff(
+            m=int(m) if m is not None else None,
+            ef_construct=int(ef_construct) if ef_construct is not None else None,
+        )
+
+    def _ensure_payload_indexes(self, existing_schema, collection_name):
+        """Indexes the filterable payload fields so filters run inside the ANN search."""
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field in existing_schema:
+                continue
+            print(f"Creating payload index: {collection_name}.{field} ({schema.value})")
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=schema,
             )
 
+    def _sparse_vectors_config(self):
+        # IDF is computed by Qdrant at query time, so BM25 weights stay correct as the corpus grows
+        return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+    def _ensure_sparse_vectors(self, info, collection_name):
+        """Adds the BM25 sparse vector to an existing collection when the server allows it."""
+        if SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+            try:
+                print(f"Adding sparse vector '{SPARSE_VECTOR_NAME}' to collection {collection_name}")
+                self.client.update_collection(
+                    collection_name=collection_name,
+                    sparse_vectors_config=self._sparse_vectors_config(),
+                )
+            except Exception as e:
+                print(f"WARNING: hybrid search unavailable, collection has no '{SPARSE_VECTOR_NAME}' vector "
+                      f"and it could not be added ({e}). Migrate the collection (seeders/migrate_collection.py) to enable it.")
+                return
+        self.hybrid_available = True
+
+    def _migrate_quantization(self, info, quantization_config, collection_name):
+        """
+        Migration path for existing collections: applies the configured quantization in place.
+        Qdrant builds the quantized vectors in the background, searches keep working meanwhile.
+        """
+        current = info.config.quantization_config
+        current_mode = (
+            "scalar" if isinstance(current, ScalarQuantization)
+            else "binary" if isinstance(current, BinaryQuantization)
+            else "none" if current is None
+            else type(current).__name__
+        )
+        if current_mode == self.quantization:
+            return
+
+        print(f"Migrating collection {collection_name} quantization: {current_mode} -> {self.quantization}")
+        self.client.update_collection(
+            collection_name=collection_name,
+            quantization_config=quantization_config,
+        )
+
     def _get_embedding(self, text):
         """Internal helper to vectorize text. Triggers lazy initialization."""
         self._initialize_resources()
         embeddings = list(self.model.embed([text]))
         return embeddings[0].tolist()
 
-    def store_post(self, post_uuid, title, description):
+    def embed_query(self, query_text):
+        """Returns the float32 query vector, served from the query cache when possible."""
+        vector = self.query_cache.get(query_text)
+        count_cache_lookup("query_embedding", vector is not None)
+        if vector is None:
+            self._initialize_resources()
+            normalized = EmbeddingCache.normalize(query_text)
+            with observe_dependency("fastembed", "embed_query"):
+                if self.batch_window_ms > 0:
+                    vector = self.batcher.embed(normalized)
+                else:
+                    vector = np.asarray(next(iter(self.model.embed([normalized]))), dtype=np.float32)
+            self.query_cache.put(query_text, vector)
+        return vector
+
+    def _get_embeddings(self, texts):
+        """Vectorizes a list of texts in one batched model pass. Triggers lazy initialization."""
+        self._initialize_resources()
+        embeddings = self.model.embed(texts, batch_size=self.embed_batch_size)
+        return [vector.tolist() for vector in embeddings]
+
+    def _get_sparse_embeddings(self, texts):
+        """BM25 document vectors for hybrid search, or None per text when hybrid is off."""
+        if not self.hybrid_available:
+            return [None] * len(texts)
+        return [
+            SparseVector(indices=e.indices.tolist(), values=e.values.tolist())
+            for e in self.sparse_model.embed(texts, batch_size=self.embed_batch_size)
+        ]
+
+    def _build_point(self, post_uuid, title, description, vector, sparse_vector=None, metadata=None):
+        """Shapes a post, its vector(s) and its filterable metadata into the Qdrant point stored for it."""
+        if sparse_vector is not None:
+            # "" is the collection's default (unnamed) dense vector
+            vector = {"": vector, SPARSE_VECTOR_NAME: sparse_vector}
+        return PointStruct(
+            id=post_uuid,
+            vector=vector,
+            # indexed_at lets read replicas pull only what changed since their last sync
+            payload={
+                "uuid": post_uuid, "title": title, "description": description,
+                **(metadata or {}),
+                "indexed_at": time.time()
+            }
+        )
+
+    def store_post(self, post_uuid, title, description, metadata=None):
         """Upserts a post into Qdrant after semantic vectorization."""
         combined_text = f"{title}. {description}"
         print(f"Embedding and storing post: {post_uuid}")
+        set_attributes({"post.text_length": len(combined_text)})
+
+        with observe_dependency("fastembed", "embed_posts"):
+            vector = self._get_embedding(combined_text)
+            sparse_vector = self._get_sparse_embeddings([combined_text])[0]
         
-        vector = self._get_embedding(combined_text)
-        
-        self.client.upsert(
-            collection_name=self.collection_name,
-            points=[
-                PointStruct(
-                    id=post_uuid, 
-                    vector=vector,
-                    payload={"uuid": post_uuid, "title": title, "description": description}    
-                )
-            ],
-        )
+        with observe_dependency("qdrant", "upsert"):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=[self._build_point(post_uuid, title, description, vector, sparse_vector, metadata)],
+            )
+        if self.mirror is not None:
+            self.mirror.upsert(post_uuid, title, description, vector)
         return True
 
-    def search_similar_post(self, query_text, limit=10):
-        """Retrieves Top-K results using similarity scores."""
+    def store_posts(self, posts):
+        """
+        Bulk variant of store_post: one batched embedding pass, then chunked multi-point upserts.
+        Expects a list of {"postuuid", "title", "description"[, metadata fields]} dicts.
+        Returns one {"uuid", "status"[, "error"]} entry per input post, in input order.
+        """
+        results = [None] * len(posts)
+        pending = []  # (input index, uuid, title, description) for posts that passed validation
+        metadata = []  # filterable metadata, aligned with pending
+
+        for i, post in enumerate(posts):
+            post_uuid = post.get("postuuid") if isinstance(post, dict) else None
+            if not post_uuid:
+                results[i] = {"uuid": post_uuid, "status": "error", "error": "Missing postuuid"}
+                continue
+            try:
+                post_metadata = extract_post_metadata(post)
+            except ValueError as e:
+                results[i] = {"uuid": post_uuid, "status": "error", "error": f"Invalid metadata: {e}"}
+                continue
+            pending.append((i, post_uuid, post.get("title", ""), post.get("description", "")))
+            metadata.append(post_metadata)
+
+        if not pending:
+            return results
+
+        print(f"Embedding and storing {len(pending)} posts in batches of {self.embed_batch_size}")
+        try:
+            texts = [f"{title}. {description}" for _, _, title, description in pending]
+            with observe_dependency("fastembed", "embed_posts"):
+                vectors = self._get_embeddings(texts)
+                sparse_vectors = self._get_sparse_embeddings(texts)
+        except Exception as e:
+            # A failed model pass leaves nothing to upsert: every pending post fails with the same cause
+            for i, post_uuid, _, _ in pending:
+                results[i] = {"uuid": post_uuid, "status": "error", "error": f"Embedding failed: {e}"}
+            return results
+
+        for start in range(0, len(pending), self.upsert_chunk_size):
+            chunk = pending[start:start + self.upsert_chunk_size]
+            chunk_vectors = vectors[start:start + self.upsert_chunk_size]
+            chunk_sparse = sparse_vectors[start:start + self.upsert_chunk_size]
+            chunk_metadata = metadata[start:start + self.upsert_chunk_size]
+            try:
+                with observe_dependency("qdrant", "upsert"):
+                    self.client.upsert(
+                        collection_name=self.collection_name,
+                        points=[
+                            self._build_point(post_uuid, title, description, vector, sparse_vector, post_metadata)
+                            for (_, post_uuid, title, description), vector, sparse_vector, post_metadata
+                            in zip(chunk, chunk_vectors, chunk_sparse, chunk_metadata)
+                        ],
+                    )
+                outcome = {"status": "success"}
+                if self.mirror is not None:
+                    for (_, post_uuid, title, description), vector in zip(chunk, chunk_vectors):
+                        self.mirror.upsert(post_uuid, title, description, vector)
+            except Exception as e:
+                # Qdrant rejects a request as a whole, so the failure applies to the full chunk
+                outcome = {"status": "error", "error": f"Upsert failed: {e}"}
+
+            for i, post_uuid, _, _ in chunk:
+                results[i] = {"uuid": post_uuid, **outcome}
+
+        set_attributes({
+            "posts.count": len(posts),
+            "posts.failed": sum(1 for r in results if r["status"] != "success")
+        })
+        return results
+
+    def search_similar_post(self, query_text, limit=10, mode=None, filter=None):
+        """
+        Retrieves Top-K results using similarity scores.
+        mode: "dense" (cosine only) or "hybrid" (dense + BM25 fused with RRF); defaults to PYTHON_HYBRID_SEARCH.
+        filter: optional metadata filter (see build_search_filter), applied inside the ANN search.
+        """
         # Guard: return empty list instead of None if not ready
         if self.model is None or self.client is None:
             return []
 
-        query_vector = self._get_embedding(query_text)
+        mode, query_filter, key = self._search_plan(query_text, limit, mode, filter)
+        with tracer.start_as_current_span("embedding_service.search_similar_post") as span:
+            span.set_attributes({
+                "search.query_length": len(query_text), "search.limit": limit,
+                "search.mode": mode, "search.filtered": query_filter is not None
+            })
+            results = self.search_flight.do(key, lambda: self._query_similar(query_text, limit, mode, query_filter))
+            span.set_attribute("search.result_count", len(results))
+            return results
+
+    async def search_similar_post_async(self, query_text, limit=10, mode=None, filter=None):
+        """
+        search_similar_post for code running on the event loop: Qdrant is awaited on the pooled
+        AsyncQdrantClient, so no thread waits on the network; the embedding and reranking (CPU)
+        run in worker threads. Without PYTHON_QDRANT_ASYNC the sync search runs in a thread.
+        """
+        if not self.async_enabled:
+            return await asyncio.to_thread(self.search_similar_post, query_text, limit, mode, filter)
+        if self.model is None or self.client is None:
+            return []
+
+        mode, query_filter, key = self._search_plan(query_text, limit, mode, filter)
+        with tracer.start_as_current_span("embedding_service.search_similar_post") as span:
+            span.set_attributes({
+                "search.query_length": len(query_text), "search.limit": limit,
+                "search.mode": mode, "search.filtered": query_filter is not None, "search.async": True
+            })
+            results = await self.search_flight.do_async(
+                key, lambda: self._query_similar_async(query_text, limit, mode, query_filter)
+            )
+            span.set_attribute("search.result_count", len(results))
+            return results
+
+    def _search_plan(self, query_text, limit, mode, filter):
+        """Resolves the search mode and filter, and the key identical concurrent searches share."""
+        mode = mode or ("hybrid" if self.hybrid_enabled else "dense")
+        if mode == "hybrid" and not self.hybrid_available:
+            mode = "dense"
+        query_filter = build_search_filter(filter)
+        key = (EmbeddingCache.normalize(query_text), limit, mode, json.dumps(filter, sort_keys=True))
+        return mode, query_filter, key
+
+    def _query_similar(self, query_text, limit, mode="dense", query_filter=None):
+        if self.reranker is None:
+            return self._retrieve(query_text, limit, mode, query_filter)
+
+        candidates = self._retrieve(query_text, limit * self.rerank_oversampling, mode, query_filter)
+        return self.reranker.rerank(query_text, candidates, post_text)[:limit]
+
+    async def _query_similar_async(self, query_text, limit, mode="dense", query_filter=None):
+        if self.reranker is None:
+            return await self._retrieve_async(query_text, limit, mode, query_filter)
+
+        candidates = await self._retrieve_async(query_text, limit * self.rerank_oversampling, mode, query_filter)
+        reranked = await asyncio.to_thread(self.reranker.rerank, query_text, candidates, post_text)
+        return reranked[:limit]
+
+    def _retrieve(self, query_text, limit, mode="dense", query_filter=None):
+        query_vector = self.embed_query(query_text)
+
+        if mode == "hybrid":
+            return self._query_hybrid(query_text, query_vector, limit, query_filter)
 
-        search_result = self.client.query_points(
+        local_hits = self._search_mirror(query_vector, limit, query_filter)
+        if local_hits is not None:
+            return local_hits
+
+        with observe_dependency("qdrant", "query"):
+            search_result = self.client.query_points(**self._dense_request(query_vector, limit, query_filter))
+        return self._format_hits(search_result.points)
+
+    async def _retrieve_async(self, query_text, limit, mode="dense", query_filter=None):
+        query_vector = await asyncio.to_thread(self.embed_query, query_text)
+
+        if mode == "hybrid":
+            request = await asyncio.to_thread(self._hybrid_request, query_text, query_vector, limit, query_filter)
+            operation = "query_hybrid"
+        else:
+            if self.mirror is not None:
+                local_hits = await asyncio.to_thread(self._search_mirror, query_vector, limit, query_filter)
+                if local_hits is not None:
+                    return local_hits
+            request, operation = self._dense_request(query_vector, limit, query_filter), "query"
+
+        with observe_dependency("qdrant", operation):
+            search_result = await self._get_async_client().query_points(**request)
+        return self._format_hits(search_result.points)
+
+    def _search_mirror(self, query_vector, limit, query_filter):
+        """Hits from the local read replica, or None when the search has to go to Qdrant."""
+        # The mirror only holds title/description, filtered searches go to Qdrant's payload indexes
+        if self.mirror is not None and self.mirror.ready and query_filter is None:
+            try:
+                set_attributes({"search.backend": "vector_mirror"})
+                return self.mirror.search(query_vector, limit)
+            except Exception as e:
+                self.mirror.fallbacks += 1
+                print(f"Vector mirror search failed, falling back to Qdrant: {e}")
+        return None
+
+    def _dense_request(self, query_vector, limit, query_filter=None):
+        return dict(
+            collection_name=self.collection_name,
+            query=query_vector.tolist(),
+            query_filter=query_filter,
+            limit=limit,
+            search_params=self._search_params(),
+            with_payload=True,
+            timeout=self.search_timeout,
+        )
+
+    def _query_hybrid(self, query_text, query_vector, limit, query_filter=None):
+        """
+        Dense + BM25 candidates fused with Reciprocal Rank Fusion, in one Qdrant round trip.
+        Scores are RRF scores, not cosine similarities.
+        """
+        with observe_dependency("qdrant", "query_hybrid"):
+            search_result = self.client.query_points(**self._hybrid_request(query_text, query_vector, limit, query_filter))
+        return self._format_hits(search_result.points)
+
+    def _hybrid_request(self, query_text, query_vector, limit, query_filter=None):
+        sparse = next(iter(self.sparse_model.query_embed(query_text)))
+        prefetch_limit = max(self.hybrid_prefetch_limit, limit)
+        return dict(
             collection_name=self.collection_name,
-            query=query_vector,
+            prefetch=[
+                Prefetch(
+                    query=query_vector.tolist(),
+                    filter=query_filter,
+                    limit=prefetch_limit,
+                    params=self._search_params()
+                ),
+                Prefetch(
+                    query=SparseVector(indices=sparse.indices.tolist(), values=sparse.values.tolist()),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=query_filter,
+                    limit=prefetch_limit
+                ),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
             limit=limit,
-            with_payload=True
+            with_payload=True,
+            timeout=self.search_timeout,
         )
 
+    def _format_hits(self, points):
         return [
             {
                 "uuid": hit.payload.get("uuid"),
@@ -100,6 +752,6 @@ class EmbeddingService:
                 "description": hit.payload.get("description"),
                 "score": round(hit.score, 4)
             }
-            for hit in search_result.points
+            for hit in points
         ]
 
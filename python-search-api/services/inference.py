@@ -1,11 +1,63 @@
 import os
-import json
 from groq import AsyncGroq
+from services.json_stream import JsonArrayStream
+from services.llm_scheduler import LLMScheduler, LLMUnavailable, INTERACTIVE
+from services.metrics import observe_dependency, count_llm_tokens, UPSTREAM_ERRORS
+from services.tracing import set_attributes
+
+# Completion tokens reserved in the tokens-per-minute bucket until the real usage is known
+EXPAND_COMPLETION_TOKENS = 64
+SOURCES_COMPLETION_TOKENS = 800
+
+
+def estimate_tokens(messages, completion_tokens):
+    """About 4 characters per token for the prompt, plus the expected completion."""
+    return sum(len(message["content"]) for message in messages) // 4 + completion_tokens
+
 
 class InferenceService:
     def __init__(self):
-        self.client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = self._new_client()
         self.model = os.getenv("PYTHON_LLM_MODEL", "llama-3.3-70b-versatile")
+        # Groq quotas are per API key: with several workers, divide them by the worker count
+        # (the x-ratelimit-* headers still pull every worker back to the shared remaining budget)
+        self.scheduler = LLMScheduler(
+            max_concurrency=int(os.getenv("PYTHON_LLM_CONCURRENCY", "8")),
+            requests_per_minute=int(os.getenv("PYTHON_LLM_RPM", "30")),
+            tokens_per_minute=int(os.getenv("PYTHON_LLM_TPM", "12000")),
+            max_retries=int(os.getenv("PYTHON_LLM_MAX_RETRIES", "4")),
+            deadline_seconds=float(os.getenv("PYTHON_LLM_DEADLINE", "20")),
+        )
+
+    def _new_client(self):
+        # Retries are the scheduler's: it knows the deadline and holds back the other requests
+        return AsyncGroq(api_key=os.getenv("GROQ_API_KEY"), max_retries=0)
+
+    def reset_after_fork(self):
+        """gunicorn post_fork: a fresh httpx pool, the master's one is bound to its sockets and event loop."""
+        self.client = self._new_client()
+
+    async def _complete(self, operation, messages, priority, completion_tokens, **kwargs):
+        """
+        Sends a chat completion through the scheduler. Returns (parsed response or stream, the
+        token estimate to settle with record_usage, release). The concurrency slot is held until
+        release() is called: once a stream is closed. Raises LLMUnavailable past the deadline.
+        """
+        estimate = estimate_tokens(messages, completion_tokens)
+
+        async def call():
+            with observe_dependency("groq", operation):
+                set_attributes({"gen_ai.request.model": self.model})
+                return await self.client.chat.completions.with_raw_response.create(
+                    model=self.model, messages=messages, temperature=0.0, **kwargs
+                )
+
+        raw, release = await self.scheduler.run_held(call, estimate, priority=priority)
+        try:
+            return await raw.parse(), estimate, release
+        except BaseException:
+            release()
+            raise
 
     async def check_readiness(self):
         """Probes the AI provider for a minimal response to confirm API key/quota."""
@@ -18,7 +70,7 @@ class InferenceService:
             return False
 
 
-    async def expand_query(self, query: str, context_docs: list[dict]) -> str:
+    async def expand_query(self, query: str, context_docs: list[dict], priority=INTERACTIVE) -> str:
         """
         Detects user intent and dominant topic from Qdrant snippets to produce a refined web search query.
         Constraints: Strictly tech/engineering domain.
@@ -51,14 +103,20 @@ Similar documents from our platform (use for context):
 
 Expand this query into 5–8 technical keywords relevant to software engineering."""
 
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.0,
-        )
+        set_attributes({"search.query_length": len(query)})
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        try:
+            response, estimate, release = await self._complete("expand_query", messages, priority, EXPAND_COMPLETION_TOKENS)
+            release()
+        except LLMUnavailable as e:
+            # Rate limited past the deadline: search with the raw query rather than fail the pipeline
+            print(f"Query expansion skipped: {e}")
+            return query
+        count_llm_tokens("expand_query", getattr(response, "usage", None))
+        self.scheduler.record_usage(estimate, getattr(response, "usage", None))
 
         expanded = response.choices[0].message.content.strip().strip('"')
         
@@ -69,48 +127,9 @@ Expand this query into 5–8 technical keywords relevant to software engineering
         return expanded
 
 
-    async def generate_relevant_sources(self, query: str, web_results: list[dict]) -> list[dict]:
-        """
-        Filters and reranks web results from SerpAPI for relevance.
-        """
-        if not web_results:
-            return []
-
-        formatted_results = "\n\n".join(
-            f"Index: {i}\n"
-            f"Title: {res.get('title')}\n"
-            f"Desc: {res.get('description')}\n"
-            f"URL: {res.get('url')}"
-            for i, res in enumerate(web_results)
-        )
-
-        prompt = f"""You are a research assistant filtering web search results.
-        Original Goal: {query}
-        
-        Web Results:
-        {formatted_results}
-
-        Task: Select the top 3-5 most relevant sources from the provided list. 
-        Return them as a JSON array of objects with this EXACT schema:
-        {{
-            "source_name": "Site name or short title",
-            "source_url": "Full URL",
-            "source_small_headline": "Compelling headline from the result",
-            "source_small_description": "Brief 1-sentence summary of why this is relevant",
-            "favicon": "Use the favicon URL provided in the input if available, or stay empty"
-        }}
-
-        Rules:
-        1. Only include high-quality, relevant results.
-        2. Match the "favicon" field by looking up the corresponding index in the input data.
-        3. Return ONLY valid JSON. No markdown fences.
-        """
-
-        # Map back favicons after LLM returns indices or just rely on URL matching if needed.
-        # However, to be safer, we can pass favicons in the prompt or just re-map them by URL in post-processing.
-        # Let's pass the favicons in the prompt to make it easier for the LLM to include them.
-        
-        # Revised prompt formatting to include index and favicon
+    def _sources_messages(self, query: str, web_results: list[dict]) -> list[dict]:
+        """Prompt asking the LLM to pick and describe the most relevant web results as a JSON array."""
+        # Index and favicon are passed along so the LLM can carry the favicon over
         formatted_results_with_metadata = []
         for i, res in enumerate(web_results):
             formatted_results_with_metadata.append(
@@ -120,7 +139,7 @@ Expand this query into 5–8 technical keywords relevant to software engineering
                 f"Favicon: {res.get('favicon')}\n"
                 f"Snippet: {res.get('description')}"
             )
-        
+
         prompt = f"""You are a research assistant filtering web search results.
         Goal: {query}
         
@@ -139,23 +158,65 @@ Expand this query into 5–8 technical keywords relevant to software engineering
         Return ONLY valid JSON.
         """
 
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are a precise JSON extractor. Return only a JSON array."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.0,
-        )
+        return [
+            {"role": "system", "content": "You are a precise JSON extractor. Return only a JSON array."},
+            {"role": "user", "content": prompt}
+        ]
+
+
+    async def stream_relevant_sources(self, query: str, web_results: list[dict], priority=INTERACTIVE):
+        """
+        Streaming variant of generate_relevant_sources: yields each source object as soon as
+        the completion has produced it. If the stream breaks off or the JSON goes bad midway,
+        the sources already completed are kept.
+        """
+        if not web_results:
+            return
 
-        raw = response.choices[0].message.content.strip()
-        if raw.startswith("```"):
-            raw = raw.split("```")[1]
-            if raw.startswith("json"):
-                raw = raw[4:]
+        # The dependency span times each attempt to first byte; the streamed body is covered by
+        # the structure_sources stage
+        set_attributes({"ai.web_results.count": len(web_results)})
+        try:
+            stream, estimate, release = await self._complete(
+                "structure_sources", self._sources_messages(query, web_results), priority,
+                SOURCES_COMPLETION_TOKENS, stream=True,
+            )
+        except LLMUnavailable as e:
+            print(f"Source structuring skipped: {e}")
+            return
 
+        parser = JsonArrayStream()
         try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            # Fallback or cleanup if LLM fails
-            return []
+            async for chunk in stream:
+                # Groq reports usage on the last chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                count_llm_tokens("structure_sources", getattr(x_groq, "usage", None))
+                self.scheduler.record_usage(estimate, getattr(x_groq, "usage", None))
+                if not chunk.choices:
+                    continue
+                for source in parser.feed(chunk.choices[0].delta.content or ""):
+                    if isinstance(source, dict):
+                        yield source
+                if chunk.choices[0].finish_reason == "length":
+                    print(f"Source structuring truncated at max tokens for query: {query}")
+                if parser.done:
+                    break
+        except Exception as e:
+            # Fallback: keep the sources parsed before the failure
+            UPSTREAM_ERRORS.labels("groq", "structure_sources").inc()
+            print(f"Source structuring stream failed: {e}")
+        finally:
+            try:
+                await stream.close()
+            finally:
+                release()  # the completion holds its concurrency slot until the stream is done
+
+        if parser.skipped:
+            print(f"Source structuring: skipped {parser.skipped} malformed source(s)")
+
+
+    async def generate_relevant_sources(self, query: str, web_results: list[dict], priority=INTERACTIVE) -> list[dict]:
+        """
+        Filters and reranks web results from SerpAPI for relevance.
+        """
+        return [source async for source in self.stream_relevant_sources(query, web_results, priority)]
@@ -0,0 +1,68 @@
+import json
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array arriving in arbitrary chunks (e.g. LLM tokens).
+    feed() returns the elements completed by the chunk, so the first one is usable long
+    before the closing bracket arrives. Text before the first '[' (Markdown fences, prose)
+    and after the matching ']' is ignored; an element that fails to parse is skipped
+    without affecting the others, and a truncated stream keeps every complete element.
+    Only object and array elements are returned.
+    """
+
+    def __init__(self):
+        self._started = False
+        self.done = False
+        self._depth = 0          # nesting depth, 1 = directly inside the top-level array
+        self._in_string = False
+        self._escape = False
+        self._element = []       # characters of the element being read
+        self.skipped = 0         # elements that were not valid JSON
+
+    def feed(self, chunk):
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._depth > 1:
+                self._element.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 1:
+                    self._element = [char]
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    element = self._parse("".join(self._element))
+                    if element is not None:
+                        completed.append(element)
+                    self._element = []
+                elif self._depth == 0:
+                    self.done = True
+        return completed
+
+    def _parse(self, text):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return None
@@ -0,0 +1,288 @@
+import re
+import time
+import heapq
+import random
+import asyncio
+import itertools
+import email.utils
+import groq
+
+# Lower runs first: interactive searches go ahead of background work waiting for the same quota
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Worth another attempt: the provider is throttling, overloaded or unreachable
+RETRYABLE_ERRORS = (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+
+class LLMUnavailable(Exception):
+    """The completion could not be sent or completed before its deadline."""
+
+
+def parse_duration(value):
+    """Groq's x-ratelimit-reset-* format ("7.66s", "2m59.56s", "120ms") in seconds, None if absent."""
+    if not value:
+        return None
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers):
+    """Seconds asked by retry-after-ms / retry-after (seconds or an HTTP date), None if absent."""
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1)):
+        try:
+            return max(float(headers.get(name)) * scale, 0.0)
+        except (TypeError, ValueError):
+            pass
+    date = email.utils.parsedate_tz(headers.get("retry-after") or "")
+    return max(email.utils.mktime_tz(date) - time.time(), 0.0) if date else None
+
+
+class TokenBucket:
+    """
+    A per-minute quota refilled continuously. An amount larger than what is left may be taken
+    once the bucket is full, leaving the level negative: later callers wait out the debt.
+    """
+
+    def __init__(self, per_minute, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount can be taken (0 if it can be taken now)."""
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount):
+        """Gives back (positive) or charges (negative) the difference between an estimate and the real cost."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def limit_to(self, remaining):
+        """The provider counts every process sharing the API key: never assume more than it reports."""
+        self._refill()
+        self.level = min(self.level, float(remaining))
+
+
+class LLMScheduler:
+    """
+    Admission control for LLM completions of one process: at most max_concurrency requests in
+    flight, within the requests-per-minute and tokens-per-minute token buckets (0 disables one),
+    granted in priority order (FIFO within a priority). Rate-limit headers of every response keep
+    the buckets in line with the provider's own count, a 429 pauses admission for its
+    Retry-After, and retryable failures are retried with jittered backoff inside the deadline.
+    Queueing ahead of the quota, instead of sending into it, keeps throughput close to the limit.
+
+    Bound to the event loop that first uses it (the app's AsyncRunner loop).
+    """
+
+    def __init__(self, max_concurrency=8, requests_per_minute=30, tokens_per_minute=12000,
+                 max_retries=4, deadline_seconds=20.0, backoff_base=0.5, backoff_max=8.0,
+                 clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute, clock) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.deadline_seconds = deadline_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self._loop = None
+        self._waiters = []  # heap of [priority, seq, tokens, future]
+        self._seq = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0
+        self._wakeup = None
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.timed_out = 0
+        self.queued_seconds = 0.0
+
+    async def run(self, call, estimated_tokens, priority=INTERACTIVE, deadline_seconds=None):
+        """
+        Awaits call() (a coroutine function returning a raw response with .headers) once admitted,
+        retrying retryable errors. Raises LLMUnavailable when the deadline passes first.
+        """
+        response, release = await self.run_held(call, estimated_tokens, priority, deadline_seconds)
+        release()
+        return response
+
+    async def run_held(self, call, estimated_tokens, priority=INTERACTIVE, deadline_seconds=None):
+        """
+        Like run(), for streamed completions: call() returns once the headers arrive, so the
+        concurrency slot stays taken until the caller has read or closed the body and calls the
+        returned release() (idempotent). Returns (response, release).
+        """
+        deadline = self.clock() + (deadline_seconds or self.deadline_seconds)
+        attempt = 0
+        while True:
+            await self._acquire(estimated_tokens, priority, deadline)
+            try:
+                response = await call()
+            except RETRYABLE_ERRORS as e:
+                self._release()
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                delay = self._retry_delay(headers, attempt)
+                if isinstance(e, groq.RateLimitError):
+                    self.rate_limited += 1
+                    # Everyone waits: the next requests would only hit the same limit
+                    self._pause(delay)
+                attempt += 1
+                if attempt > self.max_retries or self.clock() + delay >= deadline:
+                    self.timed_out += 1
+                    raise LLMUnavailable(f"LLM unavailable after {attempt} attempt(s): {e}") from e
+                self.retries += 1
+            except BaseException:
+                self._release()
+                raise
+            else:
+                self.observe_headers(getattr(response, "headers", None))
+                return response, self._releaser()
+            await asyncio.sleep(delay)
+
+    def _releaser(self):
+        """One-shot release of the slot granted on the current loop (a rebound loop starts from zero)."""
+        loop = self._loop
+        released = False
+
+        def release():
+            nonlocal released
+            if not released and self._loop is loop:
+                self._release()
+            released = True
+
+        return release
+
+    def _retry_delay(self, headers, attempt):
+        """Retry-After when the provider sent one, otherwise full-jitter exponential backoff."""
+        asked = retry_after(headers)
+        if asked is not None:
+            # A little jitter so the waiting requests don't all come back in the same instant
+            return asked + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def observe_headers(self, headers):
+        """
+        Syncs the buckets with Groq's x-ratelimit-* headers: remaining-tokens is the per-minute
+        budget, remaining-requests the daily one, so its exhaustion pauses until its reset.
+        """
+        if not headers:
+            return
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if self.tokens is not None and remaining_tokens is not None:
+            try:
+                self.tokens.limit_to(float(remaining_tokens))
+            except ValueError:
+                pass
+        if headers.get("x-ratelimit-remaining-requests") == "0":
+            reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                self._pause(reset)
+
+    def record_usage(self, estimated_tokens, usage):
+        """Settles the estimate taken at admission against the usage the provider reported."""
+        if self.tokens is None or usage is None:
+            return
+        actual = getattr(usage, "total_tokens", None) or (
+            (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+        )
+        if actual:
+            self.tokens.adjust(estimated_tokens - actual)
+
+    # --- Admission ---
+    def _bind(self, loop):
+        """A new loop (first use, a forked worker, a test's asyncio.run) starts from an empty queue."""
+        if self._loop is not loop:
+            self._loop = loop
+            self._waiters = []
+            self._active = 0
+            self._wakeup = None
+
+    async def _acquire(self, tokens, priority, deadline):
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        future = loop.create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), tokens, future])
+        queued = self.clock()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, timeout=max(deadline - self.clock(), 0.0))
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LLMUnavailable("LLM request still queued at its deadline") from None
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # granted just before the caller gave up
+            raise
+        finally:
+            self.queued_seconds += self.clock() - queued
+        self.calls += 1
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _pause(self, seconds):
+        self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def _dispatch(self):
+        """Grants waiters in priority order while a slot and both buckets allow it, else sets a wakeup."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            priority, _, tokens, future = self._waiters[0]
+            if future.done():  # timed out or cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if self._active >= self.max_concurrency:
+                return  # the next _release dispatches again
+            wait = max(
+                self._paused_until - self.clock(),
+                self.requests.wait_time(1) if self.requests is not None else 0.0,
+                self.tokens.wait_time(tokens) if self.tokens is not None else 0.0,
+            )
+            if wait > 0:
+                self._wakeup = self._loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self._active += 1
+            future.set_result(None)
+
+    def stats(self):
+        return {
+            "active": self._active,
+            "queued": sum(1 for waiter in self._waiters if not waiter[3].done()),
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "timed_out": self.timed_out,
+            "avg_queue_ms": round(self.queued_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+            "requests_available": round(self.requests.level, 1) if self.requests is not None else None,
+            "tokens_available": round(self.tokens.level, 1) if self.tokens is not None else None,
+        }
@@ -0,0 +1,104 @@
+import os
+import time
+from contextlib import contextmanager
+from opentelemetry.trace import SpanKind
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from services.tracing import tracer, set_attributes
+
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR (an empty directory, wiped on deploy) so every
+# worker writes its samples to mmap files there and /metrics aggregates all workers.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# Sub-millisecond cache hits up to minute-long LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_SECONDS = Histogram(
+    "search_api_request_duration_seconds", "HTTP request latency",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "search_api_requests_in_flight", "Requests currently being handled",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+STAGE_SECONDS = Histogram(
+    "search_api_stage_duration_seconds", "Latency of each pipeline stage",
+    ["endpoint", "stage"], buckets=LATENCY_BUCKETS
+)
+DEPENDENCY_SECONDS = Histogram(
+    "search_api_dependency_duration_seconds", "Latency of calls to external dependencies and local models",
+    ["dependency", "operation"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter(
+    "search_api_upstream_errors_total", "Failed calls to external dependencies",
+    ["dependency", "operation"]
+)
+CACHE_LOOKUPS = Counter(
+    "search_api_cache_lookups_total", "Cache lookups by outcome",
+    ["cache", "result"]
+)
+LLM_TOKENS = Counter(
+    "search_api_llm_tokens_total", "LLM tokens reported by the provider",
+    ["operation", "kind"]
+)
+
+
+@contextmanager
+def observe_stage(endpoint, stage):
+    """Times a pipeline stage (sync or across awaits) into STAGE_SECONDS, inside a span of the same name."""
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"stage.{stage}", attributes={"stage": stage}):
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.labels(endpoint, stage).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def observe_dependency(dependency, operation):
+    """
+    Times a call to a dependency inside a client span, counting it in UPSTREAM_ERRORS when it raises.
+    The span is current inside the block, so callers can attach result attributes to it.
+    """
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"{dependency}.{operation}", kind=SpanKind.CLIENT,
+                                      attributes={"peer.service": dependency}):
+        try:
+            yield
+        except Exception:
+            UPSTREAM_ERRORS.labels(dependency, operation).inc()
+            raise
+        finally:
+            DEPENDENCY_SECONDS.labels(dependency, operation).observe(time.perf_counter() - started)
+
+
+def count_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+    set_attributes({f"cache.{cache}.hit": hit})
+
+
+def count_llm_tokens(operation, usage):
+    """Records a Groq/OpenAI usage object (prompt_tokens, completion_tokens); None is ignored."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    LLM_TOKENS.labels(operation, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(operation, "completion").inc(completion_tokens)
+    set_attributes({"gen_ai.usage.input_tokens": prompt_tokens, "gen_ai.usage.output_tokens": completion_tokens})
+
+
+def render():
+    """Exposition body and content type for /metrics, aggregated across workers in multiprocess mode."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """gunicorn child_exit hook: drops the live gauges of a worker that exited."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,68 @@
+import time
+import threading
+from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+
+class Reranker:
+    """
+    Local ONNX cross-encoder that reorders retrieval candidates by scoring (query, doc) pairs.
+    Scoring runs in batches under a per-call time budget: when the budget runs out before
+    every candidate is scored, the input (cosine / RRF / SerpAPI) order is returned unchanged.
+    """
+
+    def __init__(self, model_name="Xenova/ms-marco-MiniLM-L-6-v2", budget_ms=80, batch_size=16):
+        self.model_name = model_name
+        self.budget_seconds = budget_ms / 1000
+        self.batch_size = batch_size
+        self.model = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.reranked = 0
+        self.over_budget = 0
+        self.total_ms = 0.0
+
+    def load(self, cache_dir=None, threads=None):
+        if self.model is None:
+            print(f"Lazy Loading: Initializing cross-encoder ({self.model_name})...")
+            self.model = TextCrossEncoder(model_name=self.model_name, cache_dir=cache_dir, threads=threads)
+            list(self.model.rerank("warmup", ["warmup"]))
+
+    def rerank(self, query, docs, text_fn):
+        """
+        Returns docs sorted by cross-encoder relevance, each with a "rerank_score",
+        or docs unchanged if the model is not loaded or the budget was exceeded.
+        text_fn(doc) gives the text the query is scored against.
+        """
+        if self.model is None or len(docs) < 2:
+            return docs
+
+        started = time.perf_counter()
+        texts = [text_fn(doc) for doc in docs]
+        scores = []
+        # onnxruntime sessions are not run concurrently: keeps per-call latency predictable on small CPUs
+        with self._lock:
+            for start in range(0, len(texts), self.batch_size):
+                if time.perf_counter() - started > self.budget_seconds:
+                    break
+                scores.extend(self.model.rerank(query, texts[start:start + self.batch_size], batch_size=self.batch_size))
+
+        elapsed = time.perf_counter() - started
+        self.calls += 1
+        self.total_ms += elapsed * 1000
+        if len(scores) < len(docs) or elapsed > self.budget_seconds:
+            self.over_budget += 1
+            return docs
+
+        self.reranked += 1
+        ranked = sorted(zip(scores, range(len(docs))), key=lambda pair: -pair[0])
+        return [{**docs[i], "rerank_score": round(float(score), 4)} for score, i in ranked]
+
+    def stats(self):
+        return {
+            "model": self.model_name,
+            "budget_ms": round(self.budget_seconds * 1000, 1),
+            "calls": self.calls,
+            "reranked": self.reranked,
+            "over_budget": self.over_budget,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0,
+        }
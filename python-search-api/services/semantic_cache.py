@@ -0,0 +1,94 @@
+import time
+import threading
+import numpy as np
+
+
+class SemanticCache:
+    """
+    In-process cache of AI search answers, looked up by query-embedding similarity.
+    Query vectors live in one preallocated float32 matrix, so a lookup is a single
+    matrix-vector product. A lookup hits when the best cosine similarity reaches
+    threshold; expired rows are skipped and reused, and when the matrix is full the
+    least recently used row is overwritten. An entry only matches lookups with the same key
+    (the request options the answer depends on, e.g. limit and speculative mode).
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=3600, threshold=0.92, dim=384):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._vectors = np.zeros((max(max_size, 0), dim), dtype=np.float32)
+        self._expires_at = np.zeros(max(max_size, 0), dtype=np.float64)  # 0 marks a free row
+        self._last_used = np.zeros(max(max_size, 0), dtype=np.float64)
+        self._entries = [None] * max(max_size, 0)  # row -> (query, answer)
+        self._key_ids = np.full(max(max_size, 0), -1, dtype=np.int64)  # row -> id of its key
+        self._keys = {}  # key -> id, so a lookup filters rows with one array comparison
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _key_id(self, key):
+        return self._keys.setdefault(key, len(self._keys))
+
+    def lookup(self, vector, key=None):
+        """Returns (cached query, answer, similarity) for the closest live entry of key above threshold, else None."""
+        if self.max_size <= 0:
+            return None
+        query = self._unit(vector)
+        now = time.monotonic()
+
+        with self._lock:
+            live = (self._expires_at > now) & (self._key_ids == self._key_id(key))
+            if not live.any():
+                self.misses += 1
+                return None
+
+            scores = self._vectors @ query
+            scores[~live] = -1.0
+            row = int(np.argmax(scores))
+            if scores[row] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._last_used[row] = now
+            self.hits += 1
+            cached_query, answer = self._entries[row]
+            return cached_query, answer, float(scores[row])
+
+    def store(self, query_text, vector, answer, key=None):
+        if self.max_size <= 0:
+            return
+        now = time.monotonic()
+
+        with self._lock:
+            free = np.flatnonzero(self._expires_at <= now)
+            if free.size:
+                row = int(free[0])
+                if self._entries[row] is not None:
+                    self.evictions += 1  # expired entry
+            else:
+                row = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._vectors[row] = self._unit(vector)
+            self._expires_at[row] = now + self.ttl_seconds
+            self._last_used[row] = now
+            self._entries[row] = (query_text, answer)
+            self._key_ids[row] = self._key_id(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": int((self._expires_at > time.monotonic()).sum()),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
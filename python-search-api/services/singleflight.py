@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import concurrent.futures
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the function,
+    callers arriving while it is in progress wait for and share its result (or exception).
+    Nothing is cached once the call completes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}  # key -> Future of the running call
+        self._inflight_async = {}  # key -> Task of the running coroutine (do_async)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def do_async(self, key, coro_fn):
+        """
+        do() for coroutines on one event loop: followers await the leader's task instead of
+        blocking a thread. A cancelled caller doesn't cancel the shared task the others await.
+        """
+        with self._lock:
+            self.calls += 1
+            task = self._inflight_async.get(key)
+            if task is None:
+                task = asyncio.ensure_future(coro_fn())
+                self._inflight_async[key] = task
+                task.add_done_callback(lambda _: self._inflight_async.pop(key, None))
+            else:
+                self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight) + len(self._inflight_async),
+            }
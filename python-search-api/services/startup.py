@@ -0,0 +1,72 @@
+import os
+import time
+import threading
+
+
+class Initializer:
+    """
+    Runs the startup steps (connect, load models, test inference...) once per process,
+    either inline or on a background thread, and records per-step state for /ready.
+    Failed steps are retried every retry_seconds until every required step is ready;
+    optional steps are reported but never hold readiness back.
+    """
+
+    def __init__(self, retry_seconds=15):
+        self.retry_seconds = retry_seconds
+        self._steps = []           # (name, fn, required)
+        self._state = {}           # name -> {"state", "error", "duration_ms"}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.started_at = None
+        self.ready_at = None
+
+    def add_step(self, name, fn, required=True):
+        self._steps.append((name, fn, required))
+        self._state[name] = {"state": "pending", "required": required, "error": None, "duration_ms": None}
+
+    @property
+    def ready(self):
+        return all(self._state[name]["state"] == "ready" for name, _, required in self._steps if required)
+
+    def run(self):
+        """Runs every step that is not ready yet, in order. Returns True once all required steps are ready."""
+        if self.started_at is None:
+            self.started_at = time.time()
+        for name, fn, required in self._steps:
+            state = self._state[name]
+            if state["state"] == "ready":
+                continue
+            state["state"] = "initializing"
+            started = time.perf_counter()
+            try:
+                fn()
+                state.update(state="ready", error=None)
+            except Exception as e:
+                state.update(state="failed", error=str(e))
+                print(f"Startup step '{name}' failed{'' if required else ' (optional)'}: {e}")
+            state["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if self.ready and self.ready_at is None:
+            self.ready_at = time.time()
+        return self.ready
+
+    def start(self):
+        """Runs the steps on a daemon thread (again in a forked child, threads don't survive fork)."""
+        with self._lock:
+            if self.ready or (self._thread is not None and self._pid == os.getpid()):
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run_until_ready, name="startup-init", daemon=True)
+            self._thread.start()
+
+    def _run_until_ready(self):
+        while not self.run():
+            time.sleep(self.retry_seconds)
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "init_seconds": round(self.ready_at - self.started_at, 1) if self.ready_at else None,
+            "dependencies": {name: dict(state) for name, state in self._state.items()},
+        }
@@ -0,0 +1,52 @@
+import os
+from opentelemetry import trace, propagate
+from opentelemetry.trace import SpanKind
+
+SERVICE_NAME = "postair-search-api"
+
+# Without setup_tracing() the API hands out no-op spans, so instrumentation costs next to nothing
+tracer = trace.get_tracer(SERVICE_NAME)
+
+
+def setup_tracing():
+    """
+    Installs the SDK tracer provider when tracing is configured:
+    OTEL_EXPORTER_OTLP_ENDPOINT (or PYTHON_OTEL_TRACING=1 for the default http://localhost:4318)
+    exports over OTLP/HTTP to a collector; PYTHON_OTEL_FILE appends one JSON span per line to a file.
+    Returns the provider, or None when tracing stays off.
+    """
+    otlp = bool(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")) or os.getenv("PYTHON_OTEL_TRACING", "0") == "1"
+    file_path = os.getenv("PYTHON_OTEL_FILE")
+    if not otlp and not file_path:
+        return None
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor, ConsoleSpanExporter
+
+    provider = TracerProvider(resource=Resource.create({
+        "service.name": os.getenv("OTEL_SERVICE_NAME", SERVICE_NAME),
+    }))
+    if otlp:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    if file_path:
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(
+            out=open(file_path, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )))
+    trace.set_tracer_provider(provider)
+    print(f"Tracing enabled (otlp={otlp}, file={file_path})")
+    return provider
+
+
+def start_server_span(name, headers):
+    """Server span continuing the caller's W3C trace context (traceparent/tracestate) when present."""
+    return tracer.start_span(name, context=propagate.extract(headers), kind=SpanKind.SERVER)
+
+
+def set_attributes(attributes):
+    """Sets {name: value} attributes on the current span, skipping None values."""
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({key: value for key, value in attributes.items() if value is not None})
@@ -0,0 +1,181 @@
+import os
+import time
+import threading
+import numpy as np
+from qdrant_client.models import Filter, FieldCondition, Range
+
+
+class VectorMirror:
+    """
+    Optional in-process read replica of the Qdrant collection.
+    Vectors live in one contiguous, unit-normalized float32 matrix next to a compact
+    uuid/title/description table, so a search is an exact matrix-vector product plus
+    a partial sort. Qdrant stays the source of truth: the mirror is bootstrapped with
+    a scroll, updated write-through by store_post(s), incrementally synced on the
+    `indexed_at` payload timestamp and periodically rebuilt to pick up deletions.
+    """
+
+    SCROLL_BATCH = 1024
+
+    def __init__(self, sync_interval_seconds=60, full_resync_seconds=3600, dim=384):
+        self.sync_interval_seconds = sync_interval_seconds
+        self.full_resync_seconds = full_resync_seconds
+        self.dim = dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self._rows = {}          # uuid -> row
+        self._uuids = []
+        self._titles = []
+        self._descriptions = []
+        self._pending_writes = None  # write-throughs received while a rebuild is scrolling
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        self._pid = None
+        self.ready = False
+        self.last_synced_at = 0.0       # newest indexed_at seen, in epoch seconds
+        self.last_full_sync = 0.0
+        self.local_searches = 0
+        self.fallbacks = 0
+
+    # --- Bootstrap and sync ---
+    def start(self, client, collection_name):
+        """Bootstraps in a background thread, then keeps syncing. Searches use Qdrant until ready."""
+        if self._sync_thread is not None and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._sync_thread = threading.Thread(
+            target=self._sync_loop, args=(client, collection_name), name="vector-mirror", daemon=True
+        )
+        self._sync_thread.start()
+
+    def _sync_loop(self, client, collection_name):
+        while True:
+            try:
+                if time.time() - self.last_full_sync >= self.full_resync_seconds:
+                    self.bootstrap(client, collection_name)
+                else:
+                    self.sync(client, collection_name)
+            except Exception as e:
+                print(f"Vector mirror sync failed (searches fall back to Qdrant): {e}")
+            time.sleep(self.sync_interval_seconds)
+
+    def _scroll(self, client, collection_name, scroll_filter=None):
+        offset = None
+        while True:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                limit=self.SCROLL_BATCH,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    def bootstrap(self, client, collection_name):
+        """Rebuilds the whole mirror from a Qdrant scroll and swaps it in atomically."""
+        started_at = time.time()
+        with self._lock:
+            self._pending_writes = []
+        fresh = VectorMirror(dim=self.dim)
+        for point in self._scroll(client, collection_name):
+            fresh._apply_point(point)
+
+        with self._lock:
+            # Replay writes that may have landed after the scroll passed them
+            for write in self._pending_writes:
+                fresh._upsert_row(*write)
+            self._pending_writes = None
+            self._matrix, self._size, self._rows = fresh._matrix, fresh._size, fresh._rows
+            self._uuids, self._titles, self._descriptions = fresh._uuids, fresh._titles, fresh._descriptions
+            self.last_synced_at = max(self.last_synced_at, fresh.last_synced_at)
+            self.last_full_sync = started_at
+            self.ready = True
+        print(f"Vector mirror: loaded {fresh._size} points in {round(time.time() - started_at, 2)}s")
+
+    def sync(self, client, collection_name):
+        """Pulls points written since the last sync (by any worker or service) from Qdrant."""
+        # Small overlap so writes landing while the previous scroll ran are not missed
+        since = self.last_synced_at - 5
+        scroll_filter = Filter(must=[FieldCondition(key="indexed_at", range=Range(gt=since))])
+        for point in self._scroll(client, collection_name, scroll_filter):
+            with self._lock:
+                self._apply_point(point)
+
+    def _apply_point(self, point):
+        payload = point.payload or {}
+        # Collections with named (e.g. sparse) vectors return a dict, "" is the default dense vector
+        vector = point.vector[""] if isinstance(point.vector, dict) else point.vector
+        self._upsert_row(str(point.id), payload.get("title"), payload.get("description"), vector)
+        self.last_synced_at = max(self.last_synced_at, payload.get("indexed_at") or 0)
+
+    # --- Writes ---
+    def upsert(self, post_uuid, title, description, vector):
+        """Write-through from store_post(s) so this worker sees its own writes immediately."""
+        with self._lock:
+            self._upsert_row(str(post_uuid), title, description, vector)
+            if self._pending_writes is not None:
+                self._pending_writes.append((str(post_uuid), title, description, vector))
+
+    def _upsert_row(self, post_uuid, title, description, vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        row = self._rows.get(post_uuid)
+        if row is None:
+            if self._size == self._matrix.shape[0]:
+                # Grow geometrically so bulk loads stay amortized O(n)
+                grown = np.zeros((max(1024, self._size * 2), self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+            row = self._size
+            self._size += 1
+            self._rows[post_uuid] = row
+            self._uuids.append(post_uuid)
+            self._titles.append(title)
+            self._descriptions.append(description)
+        else:
+            self._titles[row] = title
+            self._descriptions[row] = description
+        self._matrix[row] = vector
+
+    # --- Reads ---
+    def search(self, query_vector, limit):
+        """Exact cosine top-k over the local matrix, in the same shape as search_similar_post."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            size = self._size
+            if size == 0:
+                return []
+            scores = self._matrix[:size] @ query
+            k = min(limit, size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            results = [
+                {
+                    "uuid": self._uuids[row],
+                    "title": self._titles[row],
+                    "description": self._descriptions[row],
+                    "score": round(float(scores[row]), 4)
+                }
+                for row in top
+            ]
+        self.local_searches += 1
+        return results
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "size": self._size,
+            "last_synced_at": self.last_synced_at,
+            "local_searches": self.local_searches,
+            "fallbacks": self.fallbacks,
+        }
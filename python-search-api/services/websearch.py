@@ -1,7 +1,14 @@
 import os
+import time
 import asyncio
 import serpapi
 from urllib.parse import urlparse
+from services.websearch_cache import WebSearchCache
+from services.singleflight import SingleFlight
+from services.metrics import observe_dependency, count_cache_lookup
+from services.tracing import set_attributes
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "websearch.sqlite3")
 
 class WebSearchService:
     def __init__(self):
@@ -9,6 +16,24 @@ class WebSearchService:
         if not self.api_key:
             raise RuntimeError("SERPAPI_API_KEY environment variable is not set")
         self.client = serpapi.Client(api_key=self.api_key) 
+        self.gl = os.getenv("PYTHON_SERPAPI_GL", "us")
+        self.hl = os.getenv("PYTHON_SERPAPI_HL", "en")
+        # Disk cache shared across workers and restarts (TTL 0 disables)
+        self.cache = WebSearchCache(
+            path=os.getenv("PYTHON_WEBSEARCH_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl_seconds=float(os.getenv("PYTHON_WEBSEARCH_CACHE_TTL", "86400")),
+            max_entries=int(os.getenv("PYTHON_WEBSEARCH_CACHE_MAX_ENTRIES", "5000")),
+            empty_ttl_seconds=float(os.getenv("PYTHON_WEBSEARCH_CACHE_EMPTY_TTL", "60"))
+        )
+        # Concurrent identical searches share one upstream call: in this process through the
+        # single-flight, across workers through a claim in the cache file
+        self.flight = SingleFlight("websearch")
+        self.claim_lease_seconds = float(os.getenv("PYTHON_WEBSEARCH_CLAIM_LEASE", "15"))
+        self.claim_poll_seconds = 0.05
+
+    def reset_after_fork(self):
+        """gunicorn post_fork: a fresh HTTP session instead of the master's pooled connections."""
+        self.client = serpapi.Client(api_key=self.api_key)
 
     def _build_favicon(self, url: str) -> str:
         try:
@@ -24,14 +49,16 @@ class WebSearchService:
             "q": query,
             "num": limit,
             "google_domain": "google.com",
-            "gl": "us",
-            "hl": "en",
+            "gl": self.gl,
+            "hl": self.hl,
         }
 
-        results = self.client.search(params)
-
-        if "error" in results:
-            raise RuntimeError(f"SerpApi error: {results['error']}")
+        with observe_dependency("serpapi", "search"):
+            set_attributes({"search.query_length": len(query), "search.limit": limit})
+            results = self.client.search(params)
+            if "error" in results:
+                raise RuntimeError(f"SerpApi error: {results['error']}")
+            set_attributes({"search.result_count": len(results.get("organic_results", []))})
 
         return [
             {
@@ -43,12 +70,61 @@ class WebSearchService:
             for item in results.get("organic_results", [])[:limit]
         ]
 
+    def _search_cached(self, query: str, limit: int) -> list[dict]:
+        """
+        Serves from the disk cache, otherwise calls SerpApi once per key: concurrent identical
+        searches wait on the in-flight call instead of repeating it, in this worker or another.
+        """
+        key = self.cache.make_key(query, limit, self.gl, self.hl)
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            print(f"WebSearch cache read failed: {e}")
+            cached = None
+        count_cache_lookup("websearch", cached is not None)
+        if cached is not None:
+            return cached
+
+        return self.flight.do(key, lambda: self._search_and_store(key, query, limit))
+
+    def _claim(self, key: str) -> bool:
+        try:
+            return self.cache.claim(key, self.claim_lease_seconds)
+        except Exception as e:
+            print(f"WebSearch cache claim failed: {e}")
+            return True  # no coordination, just call upstream
+
+    def _search_and_store(self, key: str, query: str, limit: int) -> list[dict]:
+        # Another worker is calling SerpApi for this key: poll the cache for its result. A failed
+        # call (nothing stored) releases the claim, so the next iteration takes it over; a dead
+        # owner's claim expires after the lease
+        while not self._claim(key):
+            time.sleep(self.claim_poll_seconds)
+            try:
+                cached = self.cache.get(key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                return cached
+
+        try:
+            results = self._search_sync(query, limit)
+            try:
+                self.cache.set(key, results)
+            except Exception as e:
+                # The cache is an optimization: a locked or unwritable file must not fail the search
+                print(f"WebSearch cache write failed: {e}")
+            return results
+        finally:
+            try:
+                self.cache.release(key)
+            except Exception as e:
+                print(f"WebSearch cache release failed: {e}")
+
     async def search(self, query: str, limit: int = 5) -> list[dict]:
-        """Async wrapper — offloads blocking SDK call to a thread."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, self._search_sync, query, limit
-        )
+        """Async wrapper — offloads blocking SDK call (or cache read) to a thread."""
+        # to_thread (unlike run_in_executor) carries the current trace context into the thread
+        return await asyncio.to_thread(self._search_cached, query, limit)
 
 
 # web_search_service.py
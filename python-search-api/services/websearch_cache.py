@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+
+class WebSearchCache:
+    """
+    Disk-backed SerpAPI result cache in SQLite (WAL mode), so entries survive restarts
+    and are shared by every gunicorn worker on the host. Rows expire after ttl_seconds
+    (empty_ttl_seconds for an empty result list, often a transient upstream hiccup);
+    once max_entries is exceeded the oldest rows are deleted.
+
+    claim()/release() coordinate the workers: a pending row marks a key whose upstream
+    call is in flight in some process, so the others wait for its result instead of
+    repeating the call. A claim expires after its lease in case its owner died.
+    """
+
+    def __init__(self, path, ttl_seconds=86400, max_entries=5000, empty_ttl_seconds=60):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.empty_ttl_seconds = empty_ttl_seconds
+        # sqlite3 connections are bound to their creating thread, executor threads each get one
+        self._local = threading.local()
+
+    @property
+    def enabled(self):
+        return self.ttl_seconds > 0
+
+    @staticmethod
+    def make_key(query, limit, gl, hl):
+        normalized = " ".join(query.lower().split())
+        return json.dumps([normalized, limit, gl, hl])
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS websearch_cache ("
+                "key TEXT PRIMARY KEY, results TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_websearch_cache_created ON websearch_cache(created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS websearch_pending ("
+                "key TEXT PRIMARY KEY, owner INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Returns the cached result list, or None when missing or expired."""
+        if not self.enabled:
+            return None
+        row = self._connect().execute(
+            "SELECT results FROM websearch_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, results):
+        if not self.enabled:
+            return
+        now = time.time()
+        ttl_seconds = self.ttl_seconds if results else min(self.empty_ttl_seconds, self.ttl_seconds)
+        if ttl_seconds <= 0:
+            return
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO websearch_cache (key, results, created_at, expires_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(results), now, now + ttl_seconds)
+        )
+        # Size-based eviction: drop expired rows, then the oldest rows over the cap
+        conn.execute("DELETE FROM websearch_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM websearch_cache WHERE key IN ("
+            "SELECT key FROM websearch_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def claim(self, key, lease_seconds):
+        """True when this process now owns the upstream call for key, False while another one does."""
+        if not self.enabled:
+            return True
+        now = time.time()
+        conn = self._connect()
+        conn.execute("DELETE FROM websearch_pending WHERE key = ? AND expires_at <= ?", (key, now))
+        inserted = conn.execute(
+            "INSERT OR IGNORE INTO websearch_pending (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, os.getpid(), now + lease_seconds)
+        ).rowcount
+        return inserted == 1
+
+    def release(self, key):
+        if not self.enabled:
+            return
+        self._connect().execute("DELETE FROM websearch_pending WHERE key = ? AND owner = ?", (key, os.getpid()))
@@ -1,10 +1,12 @@
 import pytest
 import os
 import sys
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, AsyncMock
 
 # Add the parent directory to sys.path so we can import 'app'
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The tests patch the services, so don't let the app connect to Qdrant/Groq at import time
+os.environ.setdefault('PYTHON_EAGER_INIT', 'off')
 
 from app import app as flask_app
 
@@ -36,6 +38,10 @@ def auth_headers():
 def mock_embedding_svc(mocker):
     """Mocks the EmbeddingService on the app instance."""
     mock = MagicMock()
+    mock.reranker = None  # optional stage, off unless PYTHON_RERANKER=1
+    mock.async_enabled = False  # PYTHON_QDRANT_ASYNC
+    # The async search behaves like the sync one, so tests configure and assert search_similar_post
+    mock.search_similar_post_async = AsyncMock(side_effect=lambda *args, **kwargs: mock.search_similar_post(*args, **kwargs))
     mocker.patch('app.search_svc', mock)
     return mock
 
@@ -54,6 +60,14 @@ def mock_websearch_svc(mocker):
     mocker.patch('app.websearch_svc', mock)
     return mock
 
+@pytest.fixture(autouse=True)
+def mock_answer_cache(mocker):
+    """Mocks the semantic answer cache on the app instance (always a miss by default)."""
+    mock = MagicMock()
+    mock.lookup.return_value = None
+    mocker.patch('app.answer_cache', mock)
+    return mock
+
 # Shared Mock Data
 @pytest.fixture
 def fake_qdrant_docs():
@@ -0,0 +1,69 @@
+import json
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from qdrant_client import QdrantClient
+from services.embedding_service import EmbeddingService
+from seeders.bulk_seeder import read_posts, seed
+
+def posts(n):
+    return [{"title": f"Post {i}", "description": f"About topic {i}", "authorId": f"user-{i % 3}"} for i in range(n)]
+
+def seeder_service(monkeypatch):
+    """EmbeddingService on a local in-memory Qdrant with a stub model."""
+    monkeypatch.setenv("QDRANT_COLLECTION_NAME", "posts")
+    svc = EmbeddingService()
+    svc.mirror = None
+    svc.client = QdrantClient(":memory:")
+    svc.model = MagicMock()
+    svc.model.embed.side_effect = lambda texts, **kwargs: [np.ones(384, dtype=np.float32) for _ in texts]
+    return svc
+
+def test_read_posts_jsonl_resumes_from_offset(tmp_path):
+    path = tmp_path / "posts.jsonl"
+    path.write_text("".join(json.dumps(p) + "\n" for p in posts(3)) + "not json\n")
+
+    read = list(read_posts(str(path)))
+    assert [p["title"] for p, _ in read[:3]] == ["Post 0", "Post 1", "Post 2"]
+    assert read[3][0] is None
+    resumed = list(read_posts(str(path), offset=read[0][1]))
+    assert resumed[0][0]["title"] == "Post 1"
+
+def test_read_posts_json_array_skips_seen(tmp_path):
+    path = tmp_path / "posts.json"
+    path.write_text(json.dumps(posts(3), indent=2))
+
+    assert [p["title"] for p, _ in read_posts(str(path), skip=2)] == ["Post 2"]
+
+def test_seed_uploads_and_checkpoints(tmp_path, monkeypatch):
+    path = tmp_path / "posts.jsonl"
+    path.write_text("".join(json.dumps(p) + "\n" for p in posts(5)) + json.dumps({"foo": 1}) + "\n")
+    svc = seeder_service(monkeypatch)
+
+    checkpoint = seed(str(path), svc=svc, batch_size=2, window_size=2, workers=1)
+    assert checkpoint["done"] is True
+    assert checkpoint["uploaded"] == 5
+    assert checkpoint["invalid"] == 1
+    assert svc.client.count("posts").count == 5
+    assert json.loads((tmp_path / "posts.jsonl.checkpoint.json").read_text())["records"] == 6
+
+def test_seed_resumes_after_failed_upload(tmp_path, monkeypatch):
+    path = tmp_path / "posts.json"
+    path.write_text(json.dumps(posts(6)))
+    svc = seeder_service(monkeypatch)
+    upload_points = svc.client.upload_points
+    calls = []
+    def flaky_upload(**kwargs):
+        calls.append(len(kwargs["points"]))
+        if len(calls) == 2:
+            raise ConnectionError("qdrant went away")
+        return upload_points(**kwargs)
+    monkeypatch.setattr(svc.client, "upload_points", flaky_upload)
+
+    with pytest.raises(RuntimeError, match="re-run to resume"):
+        seed(str(path), svc=svc, window_size=2, workers=1)
+    assert svc.client.count("posts").count == 2
+
+    checkpoint = seed(str(path), svc=svc, window_size=2, workers=1)
+    assert checkpoint["records"] == 6
+    assert svc.client.count("posts").count == 6
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from qdrant_client import QdrantClient
+from services.embedding_service import EmbeddingService
+from seeders import migrate_collection
+from seeders.migrate_collection import migrate, next_version_name, CollectionMigration
+
+def migration_service(monkeypatch, client=None):
+    """EmbeddingService on a local in-memory Qdrant with a stub model."""
+    monkeypatch.setenv("QDRANT_COLLECTION_NAME", "posts")
+    monkeypatch.setenv("PYTHON_EMBED_BATCH_WINDOW_MS", "0")
+    svc = EmbeddingService()
+    svc.mirror = None
+    svc.client = client or QdrantClient(":memory:")
+    svc.model = MagicMock()
+    svc.model.embed.side_effect = lambda texts, **kwargs: [np.ones(384, dtype=np.float32) for _ in texts]
+    return svc
+
+def store(svc, n, start=0):
+    svc.store_posts([
+        {"postuuid": f"00000000-0000-0000-0000-{i:012d}", "title": f"Post {i}", "description": "d", "authorId": "a"}
+        for i in range(start, start + n)
+    ])
+
+def aliases(client):
+    return {a.alias_name: a.collection_name for a in client.get_aliases().aliases}
+
+def test_next_version_name():
+    assert next_version_name("posts", "posts") == "posts_v2"
+    assert next_version_name("posts", "posts_v2") == "posts_v3"
+
+def test_new_collection_is_versioned_behind_alias(monkeypatch):
+    svc = migration_service(monkeypatch)
+    svc._ensure_collection()
+    assert aliases(svc.client) == {"posts": "posts_v1"}
+    assert svc.resolve_collection() == "posts_v1"
+
+def test_migration_switches_alias_and_keeps_up_with_writes(monkeypatch):
+    svc = migration_service(monkeypatch)
+    svc._ensure_collection()
+    store(svc, 7)
+    monkeypatch.setattr(migrate_collection.time, "sleep", lambda seconds: None)
+
+    # An /embed write lands on the old collection while the first pass is copying
+    copy_records = CollectionMigration.copy_records
+    def copy_with_concurrent_write(self, records):
+        copy_records(self, records)
+        if not hasattr(self, "wrote"):
+            self.wrote = True
+            store(svc, 1, start=100)
+    monkeypatch.setattr(CollectionMigration, "copy_records", copy_with_concurrent_write)
+
+    assert migrate(svc, batch_size=3, max_lag=1) == "posts_v2"
+    assert aliases(svc.client) == {"posts": "posts_v2"}
+    assert svc.client.count("posts_v2").count == 8
+    assert svc.client.retrieve("posts", ids=["00000000-0000-0000-0000-000000000100"])
+    assert svc.client.collection_exists("posts_v1")  # kept for rollback
+
+def test_newer_target_point_is_not_overwritten(monkeypatch):
+    svc = migration_service(monkeypatch)
+    svc._ensure_collection()
+    store(svc, 1)
+    svc.create_collection("posts_v2")
+    migration = CollectionMigration(svc, "posts_v1", "posts_v2")
+    record = svc.client.scroll("posts_v1", with_payload=True)[0][0]
+    svc.client.upsert("posts_v2", points=[svc._build_point(record.id, "Edited", "d", [1.0] * 384)])
+
+    migration.copy_records([record])
+    assert migration.skipped == 1
+    assert svc.client.retrieve("posts_v2", ids=[record.id])[0].payload["title"] == "Edited"
+
+def test_plain_collection_needs_replace_legacy(monkeypatch):
+    svc = migration_service(monkeypatch)
+    svc.create_collection("posts")
+    store(svc, 3)
+
+    with pytest.raises(SystemExit):
+        migrate(svc)
+    migrate(svc, replace_legacy=True)
+    assert aliases(svc.client) == {"posts": "posts_v2"}
+    assert svc.client.count("posts").count == 3
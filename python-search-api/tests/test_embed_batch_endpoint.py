@@ -0,0 +1,62 @@
+import pytest
+
+def test_embed_batch_success(client, auth_headers, mock_embedding_svc):
+    """All posts stored -> 201, per-item results returned"""
+    posts = [
+        {"postuuid": "uuid-1", "title": "T1", "description": "D1"},
+        {"postuuid": "uuid-2", "title": "T2", "description": "D2"},
+    ]
+    mock_embedding_svc.store_posts.return_value = [
+        {"uuid": "uuid-1", "status": "success"},
+        {"uuid": "uuid-2", "status": "success"},
+    ]
+
+    response = client.post('/embed/batch', json={"posts": posts}, headers=auth_headers)
+    assert response.status_code == 201
+    data = response.get_json()
+    assert data['status'] == 'success'
+    assert data['count'] == 2
+    assert data['succeeded'] == 2
+    assert data['failed'] == 0
+
+    # Verify the whole list reaches the service in a single call
+    mock_embedding_svc.store_posts.assert_called_once_with(posts)
+
+def test_embed_batch_partial_failure(client, auth_headers, mock_embedding_svc):
+    """Some posts fail -> 207 with per-item error"""
+    mock_embedding_svc.store_posts.return_value = [
+        {"uuid": "uuid-1", "status": "success"},
+        {"uuid": None, "status": "error", "error": "Missing postuuid"},
+    ]
+
+    payload = {"posts": [{"postuuid": "uuid-1", "title": "T1"}, {"title": "No UUID"}]}
+    response = client.post('/embed/batch', json=payload, headers=auth_headers)
+    assert response.status_code == 207
+    data = response.get_json()
+    assert data['status'] == 'partial'
+    assert data['failed'] == 1
+    assert data['results'][1]['error'] == "Missing postuuid"
+
+def test_embed_batch_missing_posts(client, auth_headers):
+    """Body without a posts list -> 400"""
+    response = client.post('/embed/batch', json={"posts": []}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+def test_embed_batch_too_many_posts(client, auth_headers, mocker):
+    """More posts than the configured cap -> 413"""
+    mocker.patch('app.EMBED_BATCH_MAX_POSTS', 2)
+    posts = [{"postuuid": f"uuid-{i}"} for i in range(3)]
+    response = client.post('/embed/batch', json={"posts": posts}, headers=auth_headers)
+    assert response.status_code == 413
+
+def test_embed_batch_service_failure(client, auth_headers, mock_embedding_svc):
+    """Unexpected service error -> 500"""
+    mock_embedding_svc.store_posts.side_effect = Exception("Qdrant unavailable")
+    response = client.post('/embed/batch', json={"posts": [{"postuuid": "uuid-1"}]}, headers=auth_headers)
+    assert response.status_code == 500
+
+def test_embed_batch_no_auth(client):
+    """No auth -> 401"""
+    response = client.post('/embed/batch', json={"posts": [{"postuuid": "uuid-1"}]})
+    assert response.status_code == 401
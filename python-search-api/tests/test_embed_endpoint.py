@@ -35,3 +35,22 @@ def test_embed_wrong_key(client):
     payload = {"postuuid": "123", "title": "T", "description": "D"}
     response = client.post('/embed', json=payload, headers={"X-Internal-Key": "wrong-key"})
     assert response.status_code == 401
+
+def test_embed_forwards_metadata(client, auth_headers, mock_embedding_svc):
+    """Filterable metadata is normalized and passed to store_post"""
+    payload = {
+        "postuuid": "test-uuid-123", "title": "T", "description": "D",
+        "authorId": "user-1", "isPublic": True, "hashtags": ["#React"], "createdAt": "2026-01-01T00:00:00Z"
+    }
+    response = client.post('/embed', json=payload, headers=auth_headers)
+
+    assert response.status_code == 201
+    mock_embedding_svc.store_post.assert_called_once_with("test-uuid-123", "T", "D", metadata={
+        "authorId": "user-1", "isPublic": True, "hashtags": ["react"], "createdAt": 1767225600
+    })
+
+def test_embed_invalid_metadata(client, auth_headers):
+    """Unparseable createdAt -> 400"""
+    payload = {"postuuid": "123", "createdAt": "yesterday"}
+    response = client.post('/embed', json=payload, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+import pytest
+import threading
+import numpy as np
+from services.embedding_batcher import EmbeddingBatcher
+
+def run_concurrently(batcher, texts):
+    results = {}
+
+    def call(text):
+        results[text] = batcher.embed(text, timeout=5)
+
+    threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_concurrent_queries_share_one_model_call():
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        return [np.full(4, len(t), dtype=np.float32) for t in texts]
+
+    # A wide window so every thread lands in the first batch
+    batcher = EmbeddingBatcher(embed_fn, window_ms=200, max_batch_size=8)
+    results = run_concurrently(batcher, ["a", "bb", "ccc", "bb"])
+
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["a", "bb", "ccc"]   # duplicates embedded once
+    assert results["ccc"][0] == 3
+    assert results["ccc"].dtype == np.float32
+    assert batcher.stats()["max_batch_size"] == 4
+
+def test_batch_is_capped_at_max_size():
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(len(texts))
+        return [np.zeros(4) for _ in texts]
+
+    batcher = EmbeddingBatcher(embed_fn, window_ms=200, max_batch_size=2)
+    run_concurrently(batcher, ["a", "b", "c", "d"])
+
+    assert max(calls) <= 2
+    assert sum(calls) == 4
+
+def test_model_error_reaches_every_caller():
+    def embed_fn(texts):
+        raise RuntimeError("ONNX session failed")
+
+    batcher = EmbeddingBatcher(embed_fn, window_ms=1)
+    with pytest.raises(RuntimeError, match="ONNX session failed"):
+        batcher.embed("a", timeout=5)
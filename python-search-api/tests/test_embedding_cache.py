@@ -0,0 +1,44 @@
+import pytest
+import numpy as np
+from services.embedding_cache import EmbeddingCache
+
+def test_cache_hit_on_normalized_query():
+    """Case and whitespace variants of a query share one entry"""
+    cache = EmbeddingCache(max_size=4, ttl_seconds=60)
+    cache.put("React  State", [0.1, 0.2, 0.3])
+
+    vector = cache.get("  react state ")
+    assert vector is not None
+    assert vector.dtype == np.float32
+    assert cache.stats()["hits"] == 1
+
+def test_cache_miss_counts():
+    cache = EmbeddingCache(max_size=4, ttl_seconds=60)
+    assert cache.get("unknown") is None
+    assert cache.stats()["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_size=2, ttl_seconds=60)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")          # "b" is now the least recently used entry
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+def test_cache_expires_entries(mocker):
+    cache = EmbeddingCache(max_size=4, ttl_seconds=10)
+    clock = mocker.patch('services.embedding_cache.time.monotonic', return_value=100.0)
+    cache.put("a", [1.0])
+
+    clock.return_value = 111.0
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_disabled_with_zero_size():
+    cache = EmbeddingCache(max_size=0)
+    cache.put("a", [1.0])
+    assert cache.get("a") is None
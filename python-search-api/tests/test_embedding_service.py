@@ -0,0 +1,314 @@
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+from qdrant_client import QdrantClient
+from qdrant_client.models import ScalarQuantization, BinaryQuantization, BinaryQuantizationConfig, Disabled
+from services.embedding_service import EmbeddingService, build_search_filter, extract_post_metadata
+
+def make_service(monkeypatch, **env):
+    """A real EmbeddingService with a mocked Qdrant client and no model loaded."""
+    monkeypatch.setenv("QDRANT_COLLECTION_NAME", "posts")
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    svc = EmbeddingService()
+    svc.client = MagicMock()
+    return svc
+
+def existing_collection(svc, quantization_config):
+    collection = MagicMock()
+    collection.name = "posts"
+    svc.client.get_collections.return_value.collections = [collection]
+    svc.client.get_collection.return_value.config.quantization_config = quantization_config
+
+def test_new_collection_created_with_quantization(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="binary")
+    svc.client.get_collections.return_value.collections = []
+
+    svc._ensure_collection()
+    kwargs = svc.client.create_collection.call_args.kwargs
+    assert isinstance(kwargs["quantization_config"], BinaryQuantization)
+
+def test_existing_collection_is_migrated(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="scalar")
+    existing_collection(svc, None)
+
+    svc._ensure_collection()
+    kwargs = svc.client.update_collection.call_args.kwargs
+    assert isinstance(kwargs["quantization_config"], ScalarQuantization)
+
+def test_matching_quantization_is_left_alone(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="scalar")
+    existing_collection(svc, svc._quantization_config())
+
+    svc._ensure_collection()
+    svc.client.update_collection.assert_not_called()
+
+def test_none_disables_existing_quantization(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="none")
+    existing_collection(svc, BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)))
+
+    svc._ensure_collection()
+    assert svc.client.update_collection.call_args.kwargs["quantization_config"] == Disabled.DISABLED
+
+def test_alias_settings_are_managed_on_its_collection(monkeypatch):
+    """QDRANT_COLLECTION_NAME may be an alias, quantization is applied to the collection behind it"""
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="scalar")
+    alias = MagicMock(alias_name="posts", collection_name="posts_v2")
+    svc.client.get_aliases.return_value.aliases = [alias]
+    collection = MagicMock()
+    collection.name = "posts_v2"
+    svc.client.get_collections.return_value.collections = [collection]
+    svc.client.get_collection.return_value.config.quantization_config = None
+
+    svc._ensure_collection()
+    svc.client.create_collection.assert_not_called()
+    svc.client.get_collection.assert_called_once_with("posts_v2")
+    assert svc.client.update_collection.call_args.kwargs["collection_name"] == "posts_v2"
+
+def test_existing_v1_without_alias_is_repaired(monkeypatch):
+    """posts_v1 left without its alias (interrupted first start): kept with its points, alias added"""
+    from qdrant_client.models import VectorParams, Distance, PointStruct
+    svc = make_service(monkeypatch)
+    svc.client = QdrantClient(":memory:")
+    svc.client.create_collection("posts_v1", vectors_config=VectorParams(size=384, distance=Distance.COSINE))
+    svc.client.upsert("posts_v1", points=[PointStruct(id=1, vector=[1.0] * 384, payload={"title": "kept"})])
+
+    svc._ensure_collection()
+    assert svc.resolve_collection() == "posts_v1"
+    assert [c.name for c in svc.client.get_collections().collections] == ["posts_v1"]
+    assert svc.client.count("posts").count == 1
+
+def test_search_params_carry_rescore_and_oversampling(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_QDRANT_QUANTIZATION="binary",
+                       PYTHON_QDRANT_QUANTIZATION_RESCORE="1", PYTHON_QDRANT_QUANTIZATION_OVERSAMPLING="3.0")
+    params = svc._search_params()
+    assert params.quantization.rescore is True
+    assert params.quantization.oversampling == 3.0
+
+def test_unquantized_collection_has_no_search_params(monkeypatch):
+    svc = make_service(monkeypatch)
+    assert svc._search_params() is None
+
+def test_model_variant_resolves_to_fastembed_name(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_EMBED_MODEL_VARIANT="int8")
+    assert svc.model_name == "postair/bge-small-en-v1.5-int8"
+
+def test_default_model_variant_is_unchanged(monkeypatch):
+    svc = make_service(monkeypatch)
+    assert svc.model_name == "BAAI/bge-small-en-v1.5"
+
+def test_variant_parity_failure_falls_back_to_reference(monkeypatch, mocker):
+    """Checked by default at load; a drifting variant is replaced by the fp32 reference"""
+    svc = make_service(monkeypatch, PYTHON_EMBED_VARIANT_MIN_COSINE="0.99")
+    mocker.patch('services.embedding_service.check_variant_parity',
+                 return_value={"reference": "fp32", "min_cosine": 0.95, "mean_cosine": 0.97})
+    text_embedding = mocker.patch('services.embedding_service.TextEmbedding')
+    variant, reference = MagicMock(name="variant"), MagicMock(name="reference")
+    text_embedding.side_effect = [variant, reference]
+
+    svc.load_models()
+    assert svc.model is reference
+    assert svc.model_variant == "fp32" and svc.model_name == "postair/bge-small-en-v1.5-fp32"
+    assert svc.variant_check["passed"] is False and svc.variant_check["fallback"] == "fp32"
+
+def test_variant_parity_pass_keeps_the_variant(monkeypatch, mocker):
+    svc = make_service(monkeypatch)
+    mocker.patch('services.embedding_service.check_variant_parity',
+                 return_value={"reference": "fp32", "min_cosine": 0.995, "mean_cosine": 0.998})
+    variant = MagicMock(name="variant")
+    mocker.patch('services.embedding_service.TextEmbedding', return_value=variant)
+
+    svc.load_models()
+    assert svc.model is variant and svc.model_variant == "optimized"
+
+def test_variant_parity_check_error_fails_the_load(monkeypatch, mocker):
+    """The reference can't be loaded -> no model is published, /ready stays 503"""
+    svc = make_service(monkeypatch)
+    mocker.patch('services.embedding_service.check_variant_parity', side_effect=OSError("no network"))
+    mocker.patch('services.embedding_service.TextEmbedding')
+
+    with pytest.raises(RuntimeError):
+        svc.load_models()
+    assert svc.model is None
+
+class FakeSparse:
+    def __init__(self, indices, values):
+        self.indices = np.array(indices)
+        self.values = np.array(values)
+
+def hybrid_service(monkeypatch):
+    """Hybrid-enabled service on a local in-memory Qdrant with stub dense/sparse models."""
+    svc = make_service(monkeypatch, PYTHON_HYBRID_SEARCH="1", PYTHON_EMBED_BATCH_WINDOW_MS="0")
+    svc.client = QdrantClient(":memory:")
+    vocab = {"axios": 1, "econnreset": 2, "react": 3, "state": 4}
+
+    def dense(texts, **kwargs):
+        return [np.ones(384, dtype=np.float32) + (0.01 * i) for i, _ in enumerate(texts)]
+
+    def sparse(texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        for text in texts:
+            ids = sorted({vocab[w] for w in text.lower().replace(".", " ").split() if w in vocab})
+            yield FakeSparse(ids, [1.0] * len(ids))
+
+    svc.model = MagicMock()
+    svc.model.embed.side_effect = dense
+    svc.sparse_model = MagicMock()
+    svc.sparse_model.embed.side_effect = sparse
+    svc.sparse_model.query_embed.side_effect = sparse
+    svc._ensure_collection()
+    return svc
+
+def test_hybrid_collection_stores_sparse_vectors(monkeypatch):
+    svc = hybrid_service(monkeypatch)
+    svc.store_posts([{"postuuid": "00000000-0000-0000-0000-000000000001", "title": "axios", "description": "ECONNRESET"}])
+
+    record = svc.client.scroll("posts", with_vectors=True)[0][0]
+    assert svc.hybrid_available
+    assert record.vector["bm25"].indices == [1, 2]
+
+def test_hybrid_search_promotes_exact_term_match(monkeypatch):
+    svc = hybrid_service(monkeypatch)
+    svc.store_posts([
+        {"postuuid": "00000000-0000-0000-0000-000000000001", "title": "react", "description": "state"},
+        {"postuuid": "00000000-0000-0000-0000-000000000002", "title": "axios", "description": "ECONNRESET"},
+    ])
+
+    results = svc.search_similar_post("ECONNRESET", limit=2, mode="hybrid")
+    assert results[0]["uuid"] == "00000000-0000-0000-0000-000000000002"
+    svc.sparse_model.query_embed.assert_called_once()
+
+def test_hybrid_mode_falls_back_to_dense_without_sparse_vector(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_HYBRID_SEARCH="1")
+    svc.model = MagicMock()
+    svc.client.get_collections.return_value.collections = []
+    svc._query_similar = MagicMock(return_value=[])
+    svc.hybrid_available = False
+
+    svc.search_similar_post("axios", limit=2)
+    svc._query_similar.assert_called_once_with("axios", 2, "dense", None)
+
+def test_new_collection_gets_payload_indexes(monkeypatch):
+    svc = make_service(monkeypatch)
+    svc.client.get_collections.return_value.collections = []
+
+    svc._ensure_collection()
+    indexed = {c.kwargs["field_name"] for c in svc.client.create_payload_index.call_args_list}
+    assert indexed == {"authorId", "isPublic", "hashtags", "createdAt", "indexed_at"}
+
+def test_existing_payload_indexes_are_not_recreated(monkeypatch):
+    svc = make_service(monkeypatch)
+    existing_collection(svc, None)
+    svc.client.get_collection.return_value.payload_schema = {"authorId": MagicMock(), "indexed_at": MagicMock()}
+
+    svc._ensure_collection()
+    indexed = {c.kwargs["field_name"] for c in svc.client.create_payload_index.call_args_list}
+    assert indexed == {"isPublic", "hashtags", "createdAt"}
+
+def test_post_metadata_is_normalized():
+    metadata = extract_post_metadata({
+        "authorId": 42, "isPublic": "false", "hashtags": ["#React", "node"], "createdAt": "2026-01-01T00:00:00.000Z"
+    })
+    assert metadata == {"authorId": "42", "isPublic": False, "hashtags": ["react", "node"], "createdAt": 1767225600}
+    assert extract_post_metadata({"isPublic": True})["isPublic"] is True
+    assert extract_post_metadata({"createdAt": 1767225600000})["createdAt"] == 1767225600
+    for invalid in (1, "yes", []):
+        with pytest.raises(ValueError):
+            extract_post_metadata({"isPublic": invalid})
+
+def test_invalid_search_filter_is_rejected():
+    with pytest.raises(ValueError):
+        build_search_filter({"author": "1"})
+    with pytest.raises(ValueError):
+        build_search_filter({"isPublic": "yes"})
+    assert build_search_filter({}) is None
+
+@pytest.mark.parametrize("mode", ["dense", "hybrid"])
+def test_filtered_search_only_returns_matching_posts(monkeypatch, mode):
+    svc = hybrid_service(monkeypatch)
+    svc.store_posts([
+        {"postuuid": "00000000-0000-0000-0000-000000000001", "title": "axios", "description": "ECONNRESET",
+         "authorId": "alice", "isPublic": True, "hashtags": ["node"], "createdAt": 1700000000},
+        {"postuuid": "00000000-0000-0000-0000-000000000002", "title": "axios", "description": "ECONNRESET",
+         "authorId": "bob", "isPublic": False, "hashtags": ["node"], "createdAt": 1800000000},
+    ])
+
+    results = svc.search_similar_post("axios", limit=5, mode=mode, filter={"hashtags": ["#Node"], "isPublic": True})
+    assert [r["uuid"] for r in results] == ["00000000-0000-0000-0000-000000000001"]
+
+    results = svc.search_similar_post("axios", limit=5, mode=mode, filter={"createdAfter": "2027-01-01T00:00:00Z"})
+    assert [r["uuid"] for r in results] == ["00000000-0000-0000-0000-000000000002"]
+
+def test_filtered_search_bypasses_mirror(monkeypatch):
+    svc = hybrid_service(monkeypatch)
+    svc.mirror = MagicMock(ready=True)
+    svc.store_posts([{"postuuid": "00000000-0000-0000-0000-000000000001", "title": "a", "description": "b",
+                      "authorId": "alice"}])
+
+    results = svc.search_similar_post("a", limit=5, mode="dense", filter={"authorId": "bob"})
+    assert results == []
+    svc.mirror.search.assert_not_called()
+
+def test_reranker_scores_oversampled_candidates(monkeypatch):
+    svc = make_service(monkeypatch, PYTHON_RERANKER="1", PYTHON_RERANK_OVERSAMPLING="3")
+    candidates = [{"uuid": str(i), "title": f"t{i}", "description": "", "score": 0.9 - i / 10} for i in range(6)]
+    svc._retrieve = MagicMock(return_value=candidates)
+    svc.reranker.rerank = MagicMock(side_effect=lambda query, docs, text_fn: list(reversed(docs)))
+
+    results = svc._query_similar("q", 2)
+    svc._retrieve.assert_called_once_with("q", 6, "dense", None)
+    assert [r["uuid"] for r in results] == ["5", "4"]
+
+def test_reset_after_fork_keeps_single_threaded_model(monkeypatch):
+    """Preloaded weights stay shared with the master, the Qdrant client does not"""
+    svc = make_service(monkeypatch, PYTHON_EMBED_THREADS="1")
+    svc.model = MagicMock()
+
+    svc.reset_after_fork()
+    assert svc.client is None
+    assert svc.model is not None
+
+def test_reset_after_fork_reloads_multi_threaded_model(monkeypatch):
+    """ONNX intra-op thread pools don't survive fork"""
+    svc = make_service(monkeypatch, PYTHON_EMBED_THREADS="4")
+    svc.model = MagicMock()
+
+    svc.reset_after_fork()
+    assert svc.model is None
+
+def test_async_search_awaits_async_client(monkeypatch):
+    """Searches go through AsyncQdrantClient, identical concurrent ones share one query"""
+    import asyncio
+    from qdrant_client import AsyncQdrantClient
+    from qdrant_client.models import VectorParams, Distance, PointStruct
+
+    svc = make_service(monkeypatch, PYTHON_QDRANT_ASYNC="1", PYTHON_EMBED_BATCH_WINDOW_MS="0")
+    svc.model = MagicMock()
+    svc.model.embed.side_effect = lambda texts, **kwargs: [np.ones(384, dtype=np.float32) for _ in texts]
+
+    async def scenario():
+        async_client = AsyncQdrantClient(":memory:")
+        await async_client.create_collection("posts", vectors_config=VectorParams(size=384, distance=Distance.COSINE))
+        await async_client.upsert("posts", points=[
+            PointStruct(id=i, vector=[1.0] * 384, payload={"uuid": f"u{i}", "title": f"t{i}", "description": "d"})
+            for i in range(3)
+        ])
+        svc.async_client, svc._async_client_loop = async_client, asyncio.get_running_loop()
+        query_points = async_client.query_points
+        calls = []
+        async def counting_query_points(**kwargs):
+            calls.append(kwargs)
+            return await query_points(**kwargs)
+        async_client.query_points = counting_query_points
+
+        first, second = await asyncio.gather(
+            svc.search_similar_post_async("streams", limit=2), svc.search_similar_post_async("streams", limit=2)
+        )
+        return first, second, calls
+
+    first, second, calls = asyncio.run(scenario())
+    assert len(first) == 2 and first == second
+    assert len(calls) == 1
+    assert calls[0]["timeout"] == svc.search_timeout
+    svc.client.query_points.assert_not_called()
@@ -0,0 +1,96 @@
+import json
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from services.inference import InferenceService
+from services.llm_scheduler import LLMUnavailable
+
+class FakeStream:
+    """Async iterator of Groq-shaped completion chunks, optionally failing after the last one."""
+
+    def __init__(self, pieces, error=None):
+        self.pieces = pieces
+        self.error = error
+        self.closed = False
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)])
+        if self.error:
+            raise self.error
+
+    async def close(self):
+        self.closed = True
+
+class FakeRawResponse:
+    """What with_raw_response.create returns: rate-limit headers, then the parsed body."""
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {}
+
+    async def parse(self):
+        return self.body
+
+def make_service(monkeypatch, stream, headers=None):
+    monkeypatch.setenv("GROQ_API_KEY", "test-groq-key")
+    svc = InferenceService()
+    create = AsyncMock(return_value=FakeRawResponse(stream, headers))
+    svc.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create)
+    )))
+    return svc
+
+SOURCES = [{"source_name": "A", "source_url": "https://a.dev"}, {"source_name": "B", "source_url": "https://b.dev"}]
+WEB_RESULTS = [{"title": "A", "url": "https://a.dev", "description": "a", "favicon": ""}]
+
+def test_generate_relevant_sources_parses_streamed_completion(monkeypatch):
+    text = "```json\n" + json.dumps(SOURCES) + "\n```"
+    stream = FakeStream([text[i:i + 4] for i in range(0, len(text), 4)])
+    svc = make_service(monkeypatch, stream)
+
+    assert asyncio.run(svc.generate_relevant_sources("q", WEB_RESULTS)) == SOURCES
+    assert svc.client.chat.completions.with_raw_response.create.call_args.kwargs["stream"] is True
+    assert stream.closed
+
+def test_interrupted_stream_keeps_completed_sources(monkeypatch):
+    text = json.dumps(SOURCES)
+    stream = FakeStream([text[:text.index('"B"')]], error=ConnectionError("stream reset"))
+    svc = make_service(monkeypatch, stream)
+
+    assert asyncio.run(svc.generate_relevant_sources("q", WEB_RESULTS)) == SOURCES[:1]
+
+def test_no_web_results_skips_the_llm(monkeypatch):
+    svc = make_service(monkeypatch, FakeStream([]))
+    assert asyncio.run(svc.generate_relevant_sources("q", [])) == []
+    svc.client.chat.completions.with_raw_response.create.assert_not_called()
+
+def test_rate_limit_headers_sync_the_token_bucket(monkeypatch):
+    stream = FakeStream([json.dumps(SOURCES)])
+    svc = make_service(monkeypatch, stream, headers={"x-ratelimit-remaining-tokens": "150"})
+
+    assert asyncio.run(svc.generate_relevant_sources("q", WEB_RESULTS)) == SOURCES
+    assert svc.scheduler.tokens.level <= 151
+
+def test_expansion_falls_back_to_query_when_llm_unavailable(monkeypatch):
+    svc = make_service(monkeypatch, None)
+    svc.scheduler.run_held = AsyncMock(side_effect=LLMUnavailable("still rate limited"))
+    assert asyncio.run(svc.expand_query("kafka", [])) == "kafka"
+
+def test_streamed_completion_holds_its_slot_until_closed(monkeypatch):
+    text = json.dumps(SOURCES)
+    stream = FakeStream([text[:text.index('"B"')], text[text.index('"B"'):]])
+    svc = make_service(monkeypatch, stream)
+
+    async def scenario():
+        sources = svc.stream_relevant_sources("q", WEB_RESULTS)
+        first = await anext(sources)
+        active_while_streaming = svc.scheduler.stats()["active"]
+        rest = [source async for source in sources]
+        return [first, *rest], active_while_streaming
+
+    sources, active_while_streaming = asyncio.run(scenario())
+    assert sources == SOURCES
+    assert active_while_streaming == 1
+    assert stream.closed and svc.scheduler.stats()["active"] == 0
@@ -0,0 +1,44 @@
+import json
+import pytest
+from services.json_stream import JsonArrayStream
+
+SOURCES = [
+    {"source_name": "MDN [docs]", "source_url": "https://developer.mozilla.org", "source_small_headline": "Say \"hi\" {}"},
+    {"source_name": "Node.js", "source_url": "https://nodejs.org", "tags": ["a", {"b": 1}]},
+]
+
+def feed_in_chunks(text, size):
+    parser = JsonArrayStream()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_elements_parsed_regardless_of_chunking(size):
+    parser, items = feed_in_chunks(json.dumps(SOURCES), size)
+    assert items == SOURCES
+    assert parser.done
+
+def test_first_element_available_before_array_closes():
+    text = json.dumps(SOURCES)
+    parser = JsonArrayStream()
+    first_end = text.index("}, {") + 1
+    assert parser.feed(text[:first_end]) == [SOURCES[0]]
+    assert not parser.done
+
+def test_markdown_fences_and_trailing_text_ignored():
+    text = "Here you go:\n```json\n" + json.dumps(SOURCES) + "\n```\nHope this helps [1]"
+    _, items = feed_in_chunks(text, 5)
+    assert items == SOURCES
+
+def test_truncated_stream_keeps_complete_elements():
+    text = json.dumps(SOURCES)
+    _, items = feed_in_chunks(text[:text.index("Node.js")], 4)
+    assert items == [SOURCES[0]]
+
+def test_malformed_element_is_skipped():
+    text = '[{"a": 1}, {"b": oops}, {"c": 3}]'
+    parser, items = feed_in_chunks(text, 2)
+    assert items == [{"a": 1}, {"c": 3}]
+    assert parser.skipped == 1
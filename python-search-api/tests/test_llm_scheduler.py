@@ -0,0 +1,136 @@
+import time
+import asyncio
+import httpx
+import groq
+import pytest
+from types import SimpleNamespace
+from services.llm_scheduler import (
+    LLMScheduler, LLMUnavailable, TokenBucket, INTERACTIVE, BACKGROUND, parse_duration, retry_after
+)
+
+def rate_limit_error(headers):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    return groq.RateLimitError("rate limited", response=httpx.Response(429, headers=headers, request=request), body=None)
+
+def ok(value="ok", headers=None):
+    return SimpleNamespace(value=value, headers=headers or {})
+
+def test_token_bucket_refills_per_minute():
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0])
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] = 0.5
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    # Larger than the whole bucket: admitted once full, the debt delays the next caller
+    now[0] = 60.0
+    assert bucket.wait_time(100) == 0
+    bucket.take(100)
+    assert bucket.wait_time(1) == pytest.approx(41.0)
+
+def test_header_parsing():
+    assert parse_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_duration("120ms") == pytest.approx(0.12)
+    assert parse_duration(None) is None
+    assert retry_after({"retry-after": "3"}) == 3.0
+    assert retry_after({"retry-after-ms": "250"}) == 0.25
+    assert retry_after({}) is None
+
+def test_interactive_requests_go_ahead_of_background():
+    scheduler = LLMScheduler(max_concurrency=1, requests_per_minute=0, tokens_per_minute=0)
+    order = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+            return ok()
+
+        def record(name):
+            async def call():
+                order.append(name)
+                return ok()
+            return call
+
+        first = asyncio.create_task(scheduler.run(hold, 10))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(scheduler.run(record("background"), 10, priority=BACKGROUND)),
+            asyncio.create_task(scheduler.run(record("interactive"), 10, priority=INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 2
+        release.set()
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "background"]
+    assert scheduler.stats()["active"] == 0
+
+def test_rate_limit_waits_for_retry_after_then_succeeds():
+    scheduler = LLMScheduler(backoff_base=0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            raise rate_limit_error({"retry-after-ms": "100"})
+        return ok()
+
+    assert asyncio.run(scheduler.run(call, 10)).value == "ok"
+    assert attempts[1] - attempts[0] >= 0.1
+    assert scheduler.rate_limited == 1 and scheduler.retries == 1
+
+def test_gives_up_when_retry_after_passes_the_deadline():
+    scheduler = LLMScheduler(deadline_seconds=0.5)
+
+    async def call():
+        raise rate_limit_error({"retry-after": "5"})
+
+    started = time.perf_counter()
+    with pytest.raises(LLMUnavailable):
+        asyncio.run(scheduler.run(call, 10))
+    assert time.perf_counter() - started < 0.5
+    # The pause holds back the next requests instead of sending them into the limit
+    assert scheduler._paused_until > scheduler.clock() + 4
+
+def test_non_retryable_errors_propagate_and_free_the_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def call():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(call, 10))
+    assert scheduler.stats()["active"] == 0
+
+def test_requests_are_paced_at_the_quota():
+    """600 requests per minute with a burst of 600: once the burst is spent, 10 per second."""
+    scheduler = LLMScheduler(max_concurrency=50, requests_per_minute=600, tokens_per_minute=0)
+    scheduler.requests.level = 0.0
+
+    async def call():
+        return ok()
+
+    async def scenario():
+        started = time.perf_counter()
+        await asyncio.gather(*(scheduler.run(call, 10) for _ in range(5)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+    assert 0.4 <= elapsed < 1.0
+    assert scheduler.calls == 5
+
+def test_headers_cap_tokens_and_pause_on_exhausted_daily_requests():
+    scheduler = LLMScheduler(tokens_per_minute=12000)
+    scheduler.observe_headers({
+        "x-ratelimit-remaining-tokens": "500",
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "1m0s",
+    })
+    assert scheduler.tokens.level <= 501
+    assert scheduler._paused_until >= scheduler.clock() + 59
+
+    scheduler.record_usage(800, SimpleNamespace(total_tokens=300))
+    assert scheduler.tokens.level >= 999
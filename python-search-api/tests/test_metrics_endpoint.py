@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock
+from prometheus_client import REGISTRY
+from services.metrics import observe_dependency
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+def test_metrics_exposition(client):
+    """No auth needed, Prometheus text format"""
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain")
+    assert b"search_api_stage_duration_seconds" in response.data
+
+def test_request_latency_labelled_by_route(client, auth_headers, mock_embedding_svc, fake_qdrant_docs):
+    """Requests are counted per route pattern and status"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    before = sample("search_api_request_duration_seconds_count", endpoint="/search", method="POST", status="200")
+    stage_before = sample("search_api_stage_duration_seconds_count", endpoint="/search", stage="similarity_search")
+
+    client.post('/search', json={"query": "q"}, headers=auth_headers)
+
+    assert sample("search_api_request_duration_seconds_count", endpoint="/search", method="POST", status="200") == before + 1
+    assert sample("search_api_stage_duration_seconds_count", endpoint="/search", stage="similarity_search") == stage_before + 1
+    assert sample("search_api_requests_in_flight", endpoint="/search") == 0
+
+def test_ai_pipeline_stages_and_cache_misses(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                             mock_websearch_svc, fake_qdrant_docs, fake_web_results,
+                                             fake_structured_sources):
+    """Each /search/ai stage gets its own histogram series"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+    stages = ["embed", "semantic_cache", "similarity_search", "expand_query", "websearch", "structure_sources"]
+    before = {s: sample("search_api_stage_duration_seconds_count", endpoint="/search/ai", stage=s) for s in stages}
+    misses = sample("search_api_cache_lookups_total", cache="semantic_answer", result="miss")
+
+    client.post('/search/ai', json={"query": "metrics pipeline"}, headers=auth_headers)
+
+    for stage in stages:
+        assert sample("search_api_stage_duration_seconds_count", endpoint="/search/ai", stage=stage) == before[stage] + 1
+    assert sample("search_api_cache_lookups_total", cache="semantic_answer", result="miss") == misses + 1
+
+def test_dependency_errors_counted():
+    before = sample("search_api_upstream_errors_total", dependency="serpapi", operation="search")
+    with pytest.raises(RuntimeError):
+        with observe_dependency("serpapi", "search"):
+            raise RuntimeError("quota exceeded")
+    assert sample("search_api_upstream_errors_total", dependency="serpapi", operation="search") == before + 1
+
+def test_streamed_response_in_flight_until_closed(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                                  mock_websearch_svc, fake_qdrant_docs, fake_web_results):
+    """An SSE body still being sent counts as in flight"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=[])
+    before = sample("search_api_requests_in_flight", endpoint="/search/ai/stream")
+
+    response = client.post('/search/ai/stream', json={"query": "q"}, headers=auth_headers, buffered=False)
+    assert sample("search_api_requests_in_flight", endpoint="/search/ai/stream") == before + 1
+
+    response.get_data()
+    response.close()
+    assert sample("search_api_requests_in_flight", endpoint="/search/ai/stream") == before
@@ -15,3 +15,26 @@ def test_health_returns_200(client):
     data = response.get_json()
     assert data['status'] == 'OK'
     assert data['service'] == 'postair-search-api'
+
+def test_ready_returns_503_until_initialized(client, monkeypatch):
+    """GET /ready -> 503 while a required dependency is not ready, then 200"""
+    import app as app_module
+    from services.startup import Initializer
+
+    initializer = Initializer(retry_seconds=0)
+    failures = [RuntimeError("qdrant unreachable")]
+    def connect():
+        if failures:
+            raise failures.pop()
+    initializer.add_step("qdrant", connect)
+    monkeypatch.setattr(app_module, "initializer", initializer)
+
+    initializer.run()
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['dependencies']['qdrant']['error'] == "qdrant unreachable"
+
+    initializer.run()
+    response = client.get('/ready')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
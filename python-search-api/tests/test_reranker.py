@@ -0,0 +1,48 @@
+import time
+import pytest
+from services.reranker import Reranker
+
+class FakeCrossEncoder:
+    """Scores a document by how many query words it contains."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def rerank(self, query, documents, batch_size=64):
+        self.calls += 1
+        time.sleep(self.delay)
+        words = set(query.lower().split())
+        return [float(len(words & set(doc.lower().split()))) for doc in documents]
+
+DOCS = [
+    {"uuid": "1", "title": "react state"},
+    {"uuid": "2", "title": "node streams backpressure"},
+    {"uuid": "3", "title": "node streams"},
+]
+
+def make_reranker(delay=0.0, budget_ms=1000, batch_size=2):
+    reranker = Reranker(budget_ms=budget_ms, batch_size=batch_size)
+    reranker.model = FakeCrossEncoder(delay)
+    return reranker
+
+def test_docs_reordered_by_cross_encoder_score():
+    reranker = make_reranker()
+    ranked = reranker.rerank("node streams backpressure", DOCS, lambda d: d["title"])
+
+    assert [d["uuid"] for d in ranked] == ["2", "3", "1"]
+    assert ranked[0]["rerank_score"] == 3.0
+    assert reranker.model.calls == 2  # 3 docs in batches of 2
+    assert reranker.stats()["reranked"] == 1
+
+def test_over_budget_returns_input_order():
+    reranker = make_reranker(delay=0.02, budget_ms=10)
+    ranked = reranker.rerank("node streams backpressure", DOCS, lambda d: d["title"])
+
+    assert ranked == DOCS
+    assert reranker.model.calls == 1  # remaining batches are not scored once over budget
+    assert reranker.stats()["over_budget"] == 1
+
+def test_unloaded_model_is_a_no_op():
+    reranker = Reranker()
+    assert reranker.rerank("q", DOCS, lambda d: d["title"]) is DOCS
@@ -1,6 +1,6 @@
 import pytest
 import asyncio
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 def test_search_ai_success(client, auth_headers, mock_embedding_svc, mock_inference_svc, mock_websearch_svc, 
                            fake_qdrant_docs, fake_web_results, fake_structured_sources):
@@ -11,7 +11,7 @@ def test_search_ai_success(client, auth_headers, mock_embedding_svc, mock_infere
     # Setup Mocks
     mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
     
-    # expand_query and generate_relevant_sources are called via asyncio.run() 
+    # expand_query and generate_relevant_sources are awaited on the shared event loop
     # but since we patch the service instance, we can just set return_value for the mocked methods
     mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
     mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
@@ -68,3 +68,172 @@ def test_search_ai_websearch_failure(client, auth_headers, mock_embedding_svc, m
     
     response = client.post('/search/ai', json={"query": "fail"}, headers=auth_headers)
     assert response.status_code == 500
+
+def test_search_ai_speculative_merges_web_results(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                                  mock_websearch_svc, fake_qdrant_docs, fake_web_results,
+                                                  fake_structured_sources):
+    """speculative=true -> raw and expanded queries both searched, results merged without duplicate URLs"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+    raw_only = {"title": "Raw Hit", "url": "https://raw.example.com", "description": "raw", "favicon": ""}
+
+    async def fake_search(query, limit):
+        return fake_web_results if query == "expanded search string" else [fake_web_results[0], raw_only]
+
+    mock_websearch_svc.search = AsyncMock(side_effect=fake_search)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+
+    payload = {"query": "test ai query", "speculative": True}
+    response = client.post('/search/ai', json=payload, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert mock_websearch_svc.search.call_count == 2
+    mock_websearch_svc.search.assert_any_call("test ai query", limit=8)
+    mock_websearch_svc.search.assert_any_call("expanded search string", limit=8)
+
+    merged = mock_inference_svc.generate_relevant_sources.call_args.args[1]
+    assert [r["url"] for r in merged] == [
+        "https://ainews.com", "https://mlweekly.com", "https://raw.example.com", "https://paperswithcode.com"
+    ]
+
+@pytest.mark.parametrize("flag", ["false", False])
+def test_search_ai_speculative_false_string_opts_out(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                                     mock_websearch_svc, mocker, fake_qdrant_docs, fake_web_results,
+                                                     fake_structured_sources, flag):
+    """speculative="false" -> no raw-query web search, even when speculative is the default"""
+    mocker.patch('app.AI_SPECULATIVE_WEBSEARCH', True)
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+
+    response = client.post('/search/ai', json={"query": "test ai query", "speculative": flag}, headers=auth_headers)
+
+    assert response.status_code == 200
+    mock_websearch_svc.search.assert_called_once_with("expanded search string", limit=8)
+
+def test_search_ai_invalid_speculative_flag(client, auth_headers):
+    """speculative="maybe" -> 400"""
+    response = client.post('/search/ai', json={"query": "q", "speculative": "maybe"}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_search_ai_speculative_websearch_failure_is_not_fatal(client, auth_headers, mock_embedding_svc,
+                                                              mock_inference_svc, mock_websearch_svc,
+                                                              fake_qdrant_docs, fake_web_results):
+    """speculative raw-query search fails -> pipeline still answers from the expanded query"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+
+    async def fake_search(query, limit):
+        if query == "test ai query":
+            raise Exception("SerpAPI 429")
+        return fake_web_results
+
+    mock_websearch_svc.search = AsyncMock(side_effect=fake_search)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=[])
+
+    response = client.post('/search/ai', json={"query": "test ai query", "speculative": True}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert mock_inference_svc.generate_relevant_sources.call_args.args[1] == fake_web_results
+
+def test_search_ai_semantic_cache_hit(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                      mock_websearch_svc, mock_answer_cache, fake_qdrant_docs,
+                                      fake_structured_sources):
+    """Near-duplicate query -> cached expansion and sources, no LLM or SerpAPI calls"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_answer_cache.lookup.return_value = (
+        "react state management",
+        {"expanded_query": "react redux signals", "relevant_ext_docs": fake_structured_sources},
+        0.97,
+    )
+    mock_inference_svc.expand_query = AsyncMock()
+    mock_websearch_svc.search = AsyncMock()
+
+    response = client.post('/search/ai', json={"query": "react state mgmt"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['query'] == "react state mgmt"
+    assert data['expanded_query'] == "react redux signals"
+    assert len(data['similar_docs']) == 3
+    assert len(data['relevant_ext_docs']) == 2
+    assert data['cached_from'] == {"query": "react state management", "similarity": 0.97}
+    assert mock_answer_cache.lookup.call_args.kwargs["key"] == (5, False)
+    mock_inference_svc.expand_query.assert_not_called()
+    mock_websearch_svc.search.assert_not_called()
+    mock_answer_cache.store.assert_not_called()
+
+def test_search_ai_stores_answer_in_semantic_cache(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                                   mock_websearch_svc, mock_answer_cache, fake_qdrant_docs,
+                                                   fake_web_results, fake_structured_sources):
+    """Cache miss -> the finished answer is stored under the query embedding"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+
+    client.post('/search/ai', json={"query": "test ai query"}, headers=auth_headers)
+
+    mock_answer_cache.store.assert_called_once_with(
+        "test ai query",
+        mock_embedding_svc.embed_query.return_value,
+        {"expanded_query": "expanded search string", "relevant_ext_docs": fake_structured_sources},
+        key=(5, False),
+    )
+
+def test_search_ai_concurrent_identical_requests_are_coalesced(client, auth_headers, mock_embedding_svc,
+                                                              mock_inference_svc, mock_websearch_svc,
+                                                              fake_qdrant_docs, fake_web_results,
+                                                              fake_structured_sources):
+    """Identical concurrent requests -> one pipeline run, every caller gets the answer"""
+    import time
+    import threading
+    import app as app_module
+
+    release = threading.Event()
+
+    async def slow_expand(query, docs):
+        release.wait(2)
+        return "expanded search string"
+
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(side_effect=slow_expand)
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+
+    statuses = []
+
+    def call(query):
+        with app_module.app.test_client() as c:
+            statuses.append(c.post('/search/ai', json={"query": query}, headers=auth_headers).status_code)
+
+    coalesced_before = app_module.ai_flight.stats()["coalesced"]
+    threads = [threading.Thread(target=call, args=(q,)) for q in ["React state", "react  state", "react state"]]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2
+    while app_module.ai_flight.stats()["coalesced"] - coalesced_before < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert statuses == [200, 200, 200]
+    mock_inference_svc.expand_query.assert_called_once()
+
+def test_search_ai_reranks_web_results(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                       mock_websearch_svc, fake_qdrant_docs, fake_web_results, fake_structured_sources):
+    """With the reranker enabled the structuring LLM receives the reranked web results"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_embedding_svc.reranker = MagicMock()
+    mock_embedding_svc.reranker.rerank.side_effect = lambda query, docs, text_fn: list(reversed(docs))
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+
+    response = client.post('/search/ai', json={"query": "rerank me"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    query, web_results = mock_inference_svc.generate_relevant_sources.call_args.args
+    assert web_results[0]["url"] == "https://paperswithcode.com"
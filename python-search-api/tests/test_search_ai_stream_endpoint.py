@@ -0,0 +1,75 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+
+def parse_sse(body):
+    """Splits an SSE body into (event, data) pairs."""
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+async def stream_of(items):
+    for item in items:
+        yield item
+
+def test_search_ai_stream_emits_each_stage(client, auth_headers, mock_embedding_svc, mock_inference_svc,
+                                           mock_websearch_svc, fake_qdrant_docs, fake_web_results,
+                                           fake_structured_sources):
+    """Stages are streamed in pipeline order, followed by done"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded search string")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.stream_relevant_sources = lambda query, web_results: stream_of(fake_structured_sources)
+
+    response = client.post('/search/ai/stream', json={"query": "test ai query"}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = parse_sse(response.get_data(as_text=True))
+    assert [name for name, _ in events] == [
+        "similar_docs", "expanded_query", "web_results", "source", "source", "sources", "done"
+    ]
+    assert events[0][1][0]["uuid"] == "uuid-1"
+    assert events[1][1] == "expanded search string"
+    assert events[3][1]["source_name"] == "AI News"
+    assert events[5][1] == fake_structured_sources
+
+def test_search_ai_stream_error_after_partial_results(client, auth_headers, mock_embedding_svc,
+                                                      mock_inference_svc, fake_qdrant_docs):
+    """Internal results already sent are kept, the failure arrives as an error event"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(side_effect=Exception("Groq timeout"))
+
+    response = client.post('/search/ai/stream', json={"query": "fail"}, headers=auth_headers)
+
+    events = parse_sse(response.get_data(as_text=True))
+    assert [name for name, _ in events] == ["similar_docs", "error"]
+    assert events[1][1]["message"] == "Groq timeout"
+
+def test_search_ai_stream_semantic_cache_hit(client, auth_headers, mock_embedding_svc, mock_websearch_svc,
+                                             mock_answer_cache, fake_qdrant_docs, fake_structured_sources):
+    """A cached answer skips the web_results event"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_answer_cache.lookup.return_value = ("earlier query", {
+        "expanded_query": "cached expansion", "relevant_ext_docs": fake_structured_sources
+    }, 0.97)
+    mock_websearch_svc.search = AsyncMock()
+
+    response = client.post('/search/ai/stream', json={"query": "test ai query"}, headers=auth_headers)
+
+    events = parse_sse(response.get_data(as_text=True))
+    assert [name for name, _ in events] == ["cached_from", "similar_docs", "expanded_query", "sources", "done"]
+    assert events[0][1] == {"query": "earlier query", "similarity": 0.97}
+    mock_websearch_svc.search.assert_not_called()
+
+def test_search_ai_stream_missing_query(client, auth_headers):
+    """{} body -> 400"""
+    response = client.post('/search/ai/stream', json={}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_search_ai_stream_no_auth(client):
+    """No auth -> 401"""
+    response = client.post('/search/ai/stream', json={"query": "q"})
+    assert response.status_code == 401
@@ -33,3 +33,45 @@ def test_search_respects_limit(client, auth_headers, mock_embedding_svc, fake_qd
     client.post('/search', json=payload, headers=auth_headers)
     
     mock_embedding_svc.search_similar_post.assert_called_once_with("testing limit", limit=3)
+
+def test_search_forwards_hybrid_mode(client, auth_headers, mock_embedding_svc, fake_qdrant_docs):
+    """{ query, mode: hybrid } -> mode forwarded to the service"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+
+    payload = {"query": "ECONNRESET axios", "limit": 3, "mode": "hybrid"}
+    response = client.post('/search', json=payload, headers=auth_headers)
+
+    assert response.status_code == 200
+    mock_embedding_svc.search_similar_post.assert_called_once_with("ECONNRESET axios", limit=3, mode="hybrid")
+
+def test_search_invalid_mode(client, auth_headers):
+    """Unknown mode -> 400"""
+    response = client.post('/search', json={"query": "q", "mode": "keyword"}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_search_forwards_filter(client, auth_headers, mock_embedding_svc, fake_qdrant_docs):
+    """{ query, filter } -> filter forwarded to the service"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+
+    payload = {"query": "q", "limit": 3, "filter": {"authorId": "user-1", "hashtags": ["react"]}}
+    response = client.post('/search', json=payload, headers=auth_headers)
+
+    assert response.status_code == 200
+    mock_embedding_svc.search_similar_post.assert_called_once_with(
+        "q", limit=3, filter={"authorId": "user-1", "hashtags": ["react"]}
+    )
+
+def test_search_invalid_filter(client, auth_headers):
+    """Unknown filter key -> 400"""
+    response = client.post('/search', json={"query": "q", "filter": {"owner": "x"}}, headers=auth_headers)
+    assert response.status_code == 400
+
+def test_search_awaits_async_client(client, auth_headers, mock_embedding_svc, fake_qdrant_docs):
+    """PYTHON_QDRANT_ASYNC=1 -> the search runs on the shared loop via search_similar_post_async"""
+    mock_embedding_svc.async_enabled = True
+    mock_embedding_svc.search_timeout = 10
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+
+    response = client.post('/search', json={"query": "q", "limit": 3}, headers=auth_headers)
+    assert response.status_code == 200
+    mock_embedding_svc.search_similar_post_async.assert_awaited_once_with("q", limit=3)
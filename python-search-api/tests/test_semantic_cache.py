@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+from services.semantic_cache import SemanticCache
+
+ANSWER = {"expanded_query": "react redux signals", "relevant_ext_docs": [{"source_name": "React Docs"}]}
+
+def unit(*values):
+    vector = np.zeros(4, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector / np.linalg.norm(vector)
+
+def test_lookup_hits_above_threshold():
+    cache = SemanticCache(max_size=4, threshold=0.9, dim=4)
+    cache.store("react state management", unit(1.0, 0.1), ANSWER)
+
+    cached_query, answer, similarity = cache.lookup(unit(1.0, 0.15))
+    assert cached_query == "react state management"
+    assert answer == ANSWER
+    assert similarity >= 0.9
+
+def test_lookup_misses_below_threshold():
+    cache = SemanticCache(max_size=4, threshold=0.9, dim=4)
+    cache.store("react state management", unit(1.0), ANSWER)
+
+    assert cache.lookup(unit(0.0, 1.0)) is None
+    assert cache.stats()["misses"] == 1
+
+def test_expired_entries_are_skipped(mocker):
+    cache = SemanticCache(max_size=4, ttl_seconds=10, dim=4)
+    clock = mocker.patch('services.semantic_cache.time.monotonic', return_value=100.0)
+    cache.store("q", unit(1.0), ANSWER)
+
+    clock.return_value = 111.0
+    assert cache.lookup(unit(1.0)) is None
+
+def test_full_cache_overwrites_least_recently_used(mocker):
+    cache = SemanticCache(max_size=2, threshold=0.99, dim=4)
+    clock = mocker.patch('services.semantic_cache.time.monotonic', return_value=1.0)
+    cache.store("a", unit(1.0), ANSWER)
+    clock.return_value = 2.0
+    cache.store("b", unit(0.0, 1.0), ANSWER)
+    clock.return_value = 3.0
+    cache.lookup(unit(1.0))             # "b" is now the least recently used entry
+    clock.return_value = 4.0
+    cache.store("c", unit(0.0, 0.0, 1.0), ANSWER)
+
+    assert cache.lookup(unit(0.0, 1.0)) is None
+    assert cache.lookup(unit(1.0))[0] == "a"
+    assert cache.stats()["evictions"] == 1
+
+def test_entries_only_match_their_key():
+    cache = SemanticCache(max_size=4, threshold=0.9, dim=4)
+    cache.store("react state management", unit(1.0), ANSWER, key=(5, False))
+
+    assert cache.lookup(unit(1.0), key=(10, False)) is None
+    assert cache.lookup(unit(1.0), key=(5, True)) is None
+    assert cache.lookup(unit(1.0), key=(5, False))[0] == "react state management"
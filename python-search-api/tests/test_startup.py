@@ -0,0 +1,42 @@
+import pytest
+from unittest.mock import MagicMock
+from services.startup import Initializer
+
+def test_steps_run_in_order_once():
+    calls = []
+    initializer = Initializer()
+    initializer.add_step("qdrant", lambda: calls.append("qdrant"))
+    initializer.add_step("embedding_model", lambda: calls.append("embedding_model"))
+
+    assert initializer.run() is True
+    assert initializer.run() is True
+    assert calls == ["qdrant", "embedding_model"]
+    status = initializer.status()
+    assert status["ready"] is True
+    assert status["init_seconds"] is not None
+
+def test_failed_step_is_retried():
+    step = MagicMock(side_effect=[RuntimeError("connection refused"), None])
+    initializer = Initializer()
+    initializer.add_step("qdrant", step)
+
+    assert initializer.run() is False
+    assert initializer.status()["dependencies"]["qdrant"]["state"] == "failed"
+    assert initializer.run() is True
+    assert step.call_count == 2
+
+def test_optional_step_does_not_gate_readiness():
+    initializer = Initializer()
+    initializer.add_step("qdrant", lambda: None)
+    initializer.add_step("groq", MagicMock(side_effect=RuntimeError("401")), required=False)
+
+    assert initializer.run() is True
+    assert initializer.status()["dependencies"]["groq"]["error"] == "401"
+
+def test_background_start_reaches_ready():
+    initializer = Initializer(retry_seconds=0)
+    initializer.add_step("qdrant", MagicMock(side_effect=[RuntimeError("not yet"), None]))
+
+    initializer.start()
+    initializer._thread.join(timeout=5)
+    assert initializer.ready
@@ -0,0 +1,32 @@
+import pytest
+
+def test_stats_returns_counters(client, auth_headers, mock_embedding_svc, mock_answer_cache, mock_websearch_svc,
+                                mock_inference_svc):
+    """GET /stats -> 200 with cache and coalescing counters"""
+    mock_embedding_svc.query_cache.stats.return_value = {"hits": 3, "misses": 1, "evictions": 0}
+    mock_embedding_svc.mirror = None
+    mock_embedding_svc.model_variant = "optimized"
+    mock_embedding_svc.model_name = "BAAI/bge-small-en-v1.5"
+    mock_embedding_svc.variant_check = None
+    mock_embedding_svc.batcher.stats.return_value = {"batches": 2, "items": 6, "avg_batch_size": 3.0, "max_batch_size": 4}
+    mock_embedding_svc.search_flight.stats.return_value = {"calls": 10, "coalesced": 4, "in_flight": 0}
+    mock_answer_cache.stats.return_value = {"hits": 1, "misses": 2, "evictions": 0}
+    mock_websearch_svc.flight.stats.return_value = {"calls": 2, "coalesced": 1, "in_flight": 0}
+    mock_inference_svc.scheduler.stats.return_value = {"active": 1, "queued": 0, "rate_limited": 2}
+
+    response = client.get('/stats', headers=auth_headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['caches']['query_embedding']['hits'] == 3
+    assert data['caches']['semantic_answer']['misses'] == 2
+    assert data['coalescing']['similarity_search']['coalesced'] == 4
+    assert data['embedding_batches']['avg_batch_size'] == 3.0
+    assert data['embedding_model']['variant'] == "optimized"
+    assert data['coalescing']['websearch']['coalesced'] == 1
+    assert 'ai_pipeline' in data['coalescing']
+    assert data['llm_scheduler']['rate_limited'] == 2
+
+def test_stats_no_auth(client):
+    """No auth -> 401"""
+    response = client.get('/stats')
+    assert response.status_code == 401
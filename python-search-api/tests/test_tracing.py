@@ -0,0 +1,51 @@
+import json
+import pytest
+from unittest.mock import AsyncMock
+from services.tracing import setup_tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+NODE_SPAN_ID = "00f067aa0ba902b7"
+
+@pytest.fixture(scope="module")
+def span_file(tmp_path_factory):
+    """File exporter installed once: the global tracer provider can only be set once per process."""
+    path = tmp_path_factory.mktemp("traces") / "spans.jsonl"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("OTEL_EXPORTER_OTLP_ENDPOINT", raising=False)
+        mp.setenv("PYTHON_OTEL_FILE", str(path))
+        setup_tracing()
+    return path
+
+def read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+def test_ai_pipeline_spans_continue_incoming_trace(span_file, client, auth_headers, mock_embedding_svc,
+                                                   mock_inference_svc, mock_websearch_svc, fake_qdrant_docs,
+                                                   fake_web_results, fake_structured_sources):
+    """traceparent from node-backend is the parent of the request span, stages are its children"""
+    mock_embedding_svc.search_similar_post.return_value = fake_qdrant_docs
+    mock_inference_svc.expand_query = AsyncMock(return_value="expanded")
+    mock_websearch_svc.search = AsyncMock(return_value=fake_web_results)
+    mock_inference_svc.generate_relevant_sources = AsyncMock(return_value=fake_structured_sources)
+    headers = {**auth_headers, "traceparent": f"00-{TRACE_ID}-{NODE_SPAN_ID}-01"}
+
+    response = client.post('/search/ai', json={"query": "traced query"}, headers=headers)
+    assert response.status_code == 200
+
+    spans = {span["name"]: span for span in read_spans(span_file) if span["context"]["trace_id"] == f"0x{TRACE_ID}"}
+    server = spans["POST /search/ai"]
+    assert server["parent_id"] == f"0x{NODE_SPAN_ID}"
+    assert server["attributes"]["http.response.status_code"] == 200
+    assert server["attributes"]["search.query_length"] == len("traced query")
+    assert server["attributes"]["ai.sources.count"] == 2
+
+    # Stages run on the shared event loop thread and still attach to the request span
+    for stage in ("stage.embed", "stage.similarity_search", "stage.expand_query", "stage.websearch",
+                  "stage.structure_sources"):
+        assert spans[stage]["parent_id"] == server["context"]["span_id"]
+
+def test_request_without_traceparent_starts_new_trace(span_file, client):
+    client.get('/health')
+    server = [s for s in read_spans(span_file) if s["name"] == "GET /health"][-1]
+    assert server["parent_id"] is None
+    assert server["context"]["trace_id"] != f"0x{TRACE_ID}"
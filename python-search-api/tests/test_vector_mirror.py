@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams, PointStruct
+from services.vector_mirror import VectorMirror
+
+COLLECTION = "posts"
+UUIDS = [f"00000000-0000-0000-0000-00000000000{i}" for i in range(6)]
+
+def random_vectors(n, seed=7):
+    return np.random.default_rng(seed).standard_normal((n, 384)).astype(np.float32)
+
+@pytest.fixture
+def qdrant():
+    """Local in-memory Qdrant seeded with a few posts."""
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=384, distance=Distance.COSINE))
+    client.upsert(COLLECTION, points=[
+        PointStruct(id=UUIDS[i], vector=v.tolist(),
+                    payload={"uuid": UUIDS[i], "title": f"t{i}", "description": f"d{i}", "indexed_at": 100.0 + i})
+        for i, v in enumerate(random_vectors(4))
+    ])
+    return client
+
+def test_bootstrap_matches_qdrant_ranking(qdrant):
+    mirror = VectorMirror()
+    mirror.bootstrap(qdrant, COLLECTION)
+    query = random_vectors(1, seed=99)[0]
+
+    local = mirror.search(query, limit=3)
+    remote = qdrant.query_points(COLLECTION, query=query.tolist(), limit=3).points
+
+    assert mirror.ready
+    assert [r["uuid"] for r in local] == [str(p.id) for p in remote]
+    assert local[0]["score"] == pytest.approx(remote[0].score, abs=1e-3)
+
+def test_write_through_is_visible_immediately(qdrant):
+    mirror = VectorMirror()
+    mirror.bootstrap(qdrant, COLLECTION)
+    vector = random_vectors(1, seed=5)[0]
+
+    mirror.upsert(UUIDS[5], "fresh", "post", vector)
+    assert mirror.search(vector, limit=1)[0]["uuid"] == UUIDS[5]
+    assert mirror.stats()["size"] == 5
+
+def test_incremental_sync_pulls_new_points(qdrant):
+    mirror = VectorMirror()
+    mirror.bootstrap(qdrant, COLLECTION)
+    vector = random_vectors(1, seed=5)[0]
+    qdrant.upsert(COLLECTION, points=[PointStruct(
+        id=UUIDS[4], vector=vector.tolist(),
+        payload={"uuid": UUIDS[4], "title": "from another worker", "description": "", "indexed_at": 200.0}
+    )])
+
+    mirror.sync(qdrant, COLLECTION)
+    top = mirror.search(vector, limit=1)[0]
+    assert top["uuid"] == UUIDS[4]
+    assert top["title"] == "from another worker"
+    assert mirror.last_synced_at == 200.0
+
+def test_empty_mirror_returns_no_results():
+    assert VectorMirror().search(random_vectors(1)[0], limit=5) == []
@@ -0,0 +1,116 @@
+import pytest
+import time
+import threading
+from unittest.mock import MagicMock, patch
+from services.websearch import WebSearchService
+from services.websearch_cache import WebSearchCache
+
+RESULTS = [{"title": "AI News", "url": "https://ainews.com", "description": "Latest AI research", "favicon": ""}]
+
+@pytest.fixture
+def websearch(tmp_path, monkeypatch):
+    """A real WebSearchService with its SerpApi client mocked and the cache in a temp dir."""
+    monkeypatch.setenv("PYTHON_WEBSEARCH_CACHE_PATH", str(tmp_path / "websearch.sqlite3"))
+    svc = WebSearchService()
+    svc.client = MagicMock()
+    svc.client.search.return_value = {"organic_results": [{"title": "AI News", "link": "https://ainews.com", "snippet": "Latest AI research"}]}
+    return svc
+
+def test_repeated_search_served_from_cache(websearch):
+    first = websearch._search_cached("AI  news", 5)
+    second = websearch._search_cached("ai news", 5)
+
+    assert first == second
+    assert websearch.client.search.call_count == 1
+
+def test_cache_key_includes_limit(websearch):
+    websearch._search_cached("ai news", 5)
+    websearch._search_cached("ai news", 8)
+    assert websearch.client.search.call_count == 2
+
+def test_cache_survives_new_service_instance(websearch):
+    """A second instance on the same file (another worker, or a restart) reuses the entry"""
+    websearch._search_cached("ai news", 5)
+
+    other = WebSearchService()
+    other.client = MagicMock()
+    assert other._search_cached("ai news", 5)[0]["url"] == "https://ainews.com"
+    other.client.search.assert_not_called()
+
+def test_concurrent_identical_searches_call_upstream_once(websearch):
+    release = threading.Event()
+
+    def slow_search(params):
+        release.wait(2)
+        return {"organic_results": [{"title": "AI News", "link": "https://ainews.com", "snippet": "x"}]}
+
+    websearch.client.search.side_effect = slow_search
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(websearch._search_cached("ai news", 5))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while not websearch.flight.stats()["in_flight"]:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 5
+    assert websearch.client.search.call_count == 1
+
+def test_expired_entries_are_not_served(tmp_path, mocker):
+    cache = WebSearchCache(str(tmp_path / "c.sqlite3"), ttl_seconds=10)
+    clock = mocker.patch('services.websearch_cache.time.time', return_value=1000.0)
+    cache.set("k", RESULTS)
+    assert cache.get("k") == RESULTS
+
+    clock.return_value = 1011.0
+    assert cache.get("k") is None
+
+def test_oldest_entries_evicted_over_max(tmp_path, mocker):
+    cache = WebSearchCache(str(tmp_path / "c.sqlite3"), ttl_seconds=100, max_entries=2)
+    clock = mocker.patch('services.websearch_cache.time.time', return_value=1000.0)
+    for i, key in enumerate(["a", "b", "c"]):
+        clock.return_value = 1000.0 + i
+        cache.set(key, RESULTS)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == RESULTS
+    assert cache.get("c") == RESULTS
+
+def test_waits_for_another_workers_inflight_search(websearch):
+    """A key claimed by another process is not searched again: its result is picked up from the file"""
+    other_worker = WebSearchCache(websearch.cache.path)
+    key = websearch.cache.make_key("ai news", 5, websearch.gl, websearch.hl)
+    with patch('services.websearch_cache.os.getpid', return_value=999999):
+        assert other_worker.claim(key, lease_seconds=10)
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(websearch._search_cached("ai news", 5)))
+    waiter.start()
+    time.sleep(0.2)
+    assert not results
+    other_worker.set(key, RESULTS)
+    waiter.join(2)
+
+    assert results == [RESULTS]
+    websearch.client.search.assert_not_called()
+
+def test_expired_claim_is_taken_over(websearch):
+    """The owner died mid-call: once its lease runs out the search goes upstream"""
+    key = websearch.cache.make_key("ai news", 5, websearch.gl, websearch.hl)
+    with patch('services.websearch_cache.os.getpid', return_value=999999):
+        websearch.cache.claim(key, lease_seconds=0.2)
+
+    assert websearch._search_cached("ai news", 5)[0]["url"] == "https://ainews.com"
+    assert websearch.client.search.call_count == 1
+
+def test_empty_results_get_the_short_ttl(tmp_path, mocker):
+    cache = WebSearchCache(str(tmp_path / "c.sqlite3"), ttl_seconds=86400, empty_ttl_seconds=60)
+    clock = mocker.patch('services.websearch_cache.time.time', return_value=1000.0)
+    cache.set("empty", [])
+    cache.set("full", RESULTS)
+
+    clock.return_value = 1061.0
+    assert cache.get("empty") is None
+    assert cache.get("full") == RESULTS
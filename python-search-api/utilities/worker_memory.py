@@ -0,0 +1,61 @@
+"""
+Per-worker memory of a running gunicorn server, from /proc/<pid>/smaps_rollup (Linux).
+
+RSS counts shared pages in full for every process, so it overstates workers that share the
+preloaded model. Compare instead:
+  pss  proportional set size: shared pages split between the processes sharing them
+  uss  private memory (Private_Clean + Private_Dirty), what the worker costs on its own
+  shared  pages still shared with the master or other workers (the copy-on-write savings)
+
+Usage, from python-search-api/:
+    gunicorn app:app -w 4 -p /tmp/search-api.pid &                        # one copy per worker
+    PYTHON_PRELOAD_MODELS=1 gunicorn app:app -w 4 -p /tmp/search-api.pid &  # shared weights
+    curl -X POST localhost:8000/search ...   # serve a few requests first, arenas grow on first use
+    python utilities/worker_memory.py $(cat /tmp/search-api.pid)
+
+The total PSS is what the whole server really uses; with preloading it should grow by about
+one worker's uss per added worker rather than by a full model copy.
+"""
+import sys
+import json
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def process_memory(pid):
+    """{rss_mb, pss_mb, uss_mb, shared_mb} of one process."""
+    kb = dict.fromkeys(FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in kb:
+                kb[name] = int(value.split()[0])
+    to_mb = lambda value: round(value / 1024, 1)
+    return {
+        "rss_mb": to_mb(kb["Rss"]),
+        "pss_mb": to_mb(kb["Pss"]),
+        "uss_mb": to_mb(kb["Private_Clean"] + kb["Private_Dirty"]),
+        "shared_mb": to_mb(kb["Shared_Clean"] + kb["Shared_Dirty"]),
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def server_memory(master_pid):
+    """The master and every worker, with the server-wide PSS total."""
+    processes = {"master": {"pid": master_pid, **process_memory(master_pid)}}
+    for i, pid in enumerate(child_pids(master_pid)):
+        processes[f"worker_{i}"] = {"pid": pid, **process_memory(pid)}
+    return {
+        "processes": processes,
+        "total_pss_mb": round(sum(p["pss_mb"] for p in processes.values()), 1),
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"usage: {sys.argv[0]} <gunicorn master pid>")
+    print(json.dumps(server_memory(int(sys.argv[1])), indent=2))